@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Telecom X - ETL Benchmark Suite
+
+Measures the ETL hot paths on synthetic data
+(DataExtractor.generate_mock_data) at realistic scales:
+- transform: DataTransformer.apply_all_transformations
+- validate:  DataValidator.run_full_validation
+- save:      DataLoader.save_all_formats
+
+For every (rows, stage) pair it records the best wall time, throughput
+(rows/s and MB/s of input) and the peak RSS growth of the stage. Results
+are stored as JSON and compared against a saved baseline; the script exits
+with status 1 when a stage is slower or uses more memory than the baseline
+by more than the regression threshold.
+
+Each stage runs in a fresh process so that its peak memory is not hidden by
+the peak of an earlier stage or of data generation.
+
+Usage:
+    python scripts/benchmark_etl.py                      # 10k, 1M and 10M rows
+    python scripts/benchmark_etl.py --rows 10000 --save-baseline
+    python scripts/benchmark_etl.py --threshold 0.2
+
+Author: Elizabeth Díaz Familia
+Version: 1.0.0
+"""
+
+import sys
+import io
+import json
+import argparse
+import platform
+import tempfile
+import time
+import multiprocessing as mp
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+STAGES = ['transform', 'validate', 'save']
+# Excel is left out by default: at 10M rows it dominates the run by far
+DEFAULT_FORMATS = ['csv', 'parquet', 'metadata']
+DEFAULT_OUTPUT = 'reports/benchmarks/etl_benchmark.json'
+DEFAULT_BASELINE = 'reports/benchmarks/etl_baseline.json'
+DEFAULT_THRESHOLD = 0.15
+# Differences below these are treated as noise regardless of the ratio
+MIN_SECONDS_DELTA = 0.05
+MIN_MEMORY_DELTA = 16 * 1024**2
+
+
+def _read_status(field: str):
+    """Read a VmXXX field (in bytes) from /proc/self/status, None if unavailable"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter (Linux >= 4.0), True on success"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss() -> int:
+    """Peak RSS of the process in bytes"""
+    peak = _read_status('VmHWM')
+    if peak is not None:
+        return peak
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def _run_once(stage: str, df, output_dir: str, formats: list):
+    """Run a single stage on df and return its output"""
+    if stage == 'transform':
+        from src.etl.transformer import DataTransformer
+        return DataTransformer().apply_all_transformations(df)
+    if stage == 'validate':
+        from src.etl.validator import DataValidator
+        return DataValidator().run_full_validation(df)
+    if stage == 'save':
+        from src.etl.loader import DataLoader
+        return DataLoader(output_dir).save_all_formats(df, 'benchmark', formats=formats)
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def measure_stage(stage: str, input_path: str, output_dir: str,
+                  formats: list, repeat: int) -> dict:
+    """
+    Measure one stage (runs inside a fresh worker process)
+
+    Args:
+        stage: 'transform', 'validate' or 'save'
+        input_path: Parquet file with the stage input
+        output_dir: Directory for files written by the stage
+        formats: Formats for the save stage
+        repeat: Repetitions (best time and worst memory are kept)
+
+    Returns:
+        Dictionary with seconds, throughput and peak memory
+    """
+    import gc
+    import pandas as pd
+
+    df = pd.read_parquet(input_path)
+    input_bytes = int(df.memory_usage(index=True, deep=True).sum())
+    exact_peak = _reset_peak_rss()
+
+    seconds, peaks = [], []
+    for _ in range(repeat):
+        gc.collect()
+        _reset_peak_rss()
+        baseline = _read_status('VmRSS') if exact_peak else _peak_rss()
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            result = _run_once(stage, df, output_dir, formats)
+        seconds.append(time.perf_counter() - start)
+        peaks.append(max(_peak_rss() - baseline, 0))
+        del result
+
+    best = min(seconds)
+    return {
+        'rows': int(len(df)),
+        'input_bytes': input_bytes,
+        'seconds': round(best, 6),
+        'rows_per_second': round(len(df) / best, 1) if best else None,
+        'mb_per_second': round(input_bytes / 1024**2 / best, 2) if best else None,
+        'peak_rss_bytes': int(max(peaks)),
+        'peak_x_input': round(max(peaks) / input_bytes, 3) if input_bytes else None,
+        'exact_peak': exact_peak,
+        'repeat': repeat,
+    }
+
+
+def _prepare_inputs(n_records: int, workdir: Path) -> dict:
+    """Generate the mock dataset and the transformed one as Parquet inputs"""
+    from src.etl.extractor import DataExtractor
+    from src.etl.transformer import DataTransformer
+
+    with redirect_stdout(io.StringIO()):
+        raw = DataExtractor().generate_mock_data(n_records)
+        transformed = DataTransformer().apply_all_transformations(raw)
+
+    paths = {'raw': workdir / f'raw_{n_records}.parquet',
+             'transformed': workdir / f'transformed_{n_records}.parquet'}
+    raw.to_parquet(paths['raw'], index=False)
+    transformed.to_parquet(paths['transformed'], index=False)
+    return {'transform': str(paths['raw']),
+            'validate': str(paths['transformed']),
+            'save': str(paths['transformed'])}
+
+
+def run_suite(rows: list, stages: list, formats: list, repeat: int) -> dict:
+    """
+    Run the benchmark suite
+
+    Args:
+        rows: Dataset sizes
+        stages: Stages to measure
+        formats: Formats for the save stage
+        repeat: Repetitions per stage
+
+    Returns:
+        Results document (environment + results per size and stage)
+    """
+    import numpy as np
+    import pandas as pd
+
+    document = {
+        'created_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': mp.cpu_count(),
+        },
+        'settings': {'stages': stages, 'formats': formats, 'repeat': repeat},
+        'results': {},
+    }
+
+    ctx = mp.get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='etl_benchmark_') as tmp:
+        workdir = Path(tmp)
+        for n_records in rows:
+            inputs = _prepare_inputs(n_records, workdir)
+            size_results = {}
+            for stage in stages:
+                output_dir = workdir / f'out_{n_records}_{stage}'
+                with ctx.Pool(1) as pool:
+                    size_results[stage] = pool.apply(
+                        measure_stage,
+                        (stage, inputs[stage], str(output_dir), formats, repeat)
+                    )
+                r = size_results[stage]
+                print(f"{n_records:>12,} {stage:>10} {r['seconds']:>10.3f} "
+                      f"{r['rows_per_second']:>14,.0f} {r['peak_rss_bytes'] / 1024**2:>10.1f}")
+            document['results'][str(n_records)] = size_results
+    return document
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compare a results document against a baseline
+
+    Args:
+        current: Results of this run
+        baseline: Saved baseline results
+        threshold: Allowed relative slowdown / memory growth (0.15 = 15%)
+
+    Returns:
+        List of regressions (empty if none)
+    """
+    regressions = []
+    for rows, stages in current['results'].items():
+        for stage, result in stages.items():
+            base = baseline.get('results', {}).get(rows, {}).get(stage)
+            if base is None:
+                continue
+            checks = (('seconds', MIN_SECONDS_DELTA), ('peak_rss_bytes', MIN_MEMORY_DELTA))
+            for metric, min_delta in checks:
+                old, new = base[metric], result[metric]
+                if new - old > max(old * threshold, min_delta):
+                    regressions.append({
+                        'rows': int(rows),
+                        'stage': stage,
+                        'metric': metric,
+                        'baseline': old,
+                        'current': new,
+                        'change': round(new / old - 1, 4) if old else None,
+                    })
+    return regressions
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark the ETL hot paths and compare against a baseline'
+    )
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='Dataset sizes to benchmark')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help='Stages to benchmark')
+    parser.add_argument('--formats', nargs='+', default=DEFAULT_FORMATS,
+                        help='Formats written by the save stage')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Repetitions per stage')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help='JSON file for the results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed regression as a fraction (0.15 = 15%%)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store this run as the new baseline')
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'stage':>10} {'seconds':>10} {'rows/s':>14} {'peak MB':>10}")
+    document = run_suite(args.rows, args.stages, args.formats, args.repeat)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2), encoding='utf-8')
+    print(f"\n💾 Results saved: {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(document, indent=2), encoding='utf-8')
+        print(f"📌 Baseline saved: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"ℹ️ No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if baseline.get('environment') != document['environment']:
+        print("⚠️ Baseline was recorded in a different environment; comparison may be noisy")
+
+    regressions = compare(document, baseline, args.threshold)
+    if not regressions:
+        print(f"✅ No regressions above {args.threshold:.0%}")
+        return 0
+
+    print(f"❌ {len(regressions)} regression(s) above {args.threshold:.0%}:")
+    for r in regressions:
+        change = 'new' if r['change'] is None else f"{r['change']:+.1%}"
+        print(f"   {r['rows']:>12,} {r['stage']:>10} {r['metric']:>15}: "
+              f"{r['baseline']} -> {r['current']} ({change})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Telecom X - Transformation Benchmark
+
+Compares the sequential and fused execution modes of
+DataTransformer.apply_all_transformations:
+- Wall time
+- Peak traced memory (tracemalloc), as a multiple of the input size
+
+Author: Elizabeth Díaz Familia
+Version: 1.0.0
+"""
+
+import sys
+import io
+import argparse
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def measure(transformer, df, fused: bool) -> dict:
+    """
+    Run one transformation pass and measure it
+
+    Args:
+        transformer: DataTransformer instance
+        df: Input DataFrame
+        fused: Execution mode
+
+    Returns:
+        Dictionary with wall time and peak memory
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = transformer.apply_all_transformations(df, fused=fused)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds': elapsed,
+        'peak_bytes': peak,
+        'rows_out': len(result),
+    }
+
+
+def run_benchmark(n_records: int, repeat: int = 3) -> dict:
+    """
+    Benchmark both modes on a mock dataset
+
+    Args:
+        n_records: Number of mock records
+        repeat: Repetitions per mode (best time is kept)
+
+    Returns:
+        Dictionary with results per mode
+    """
+    from src.etl.extractor import DataExtractor
+    from src.etl.transformer import DataTransformer
+
+    with redirect_stdout(io.StringIO()):
+        df = DataExtractor().generate_mock_data(n_records)
+    input_bytes = int(df.memory_usage(deep=True).sum())
+
+    results = {'rows': n_records, 'input_bytes': input_bytes}
+    for mode, fused in (('sequential', False), ('fused', True)):
+        runs = [measure(DataTransformer(), df, fused) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r['seconds'])
+        best['peak_bytes'] = max(r['peak_bytes'] for r in runs)
+        best['peak_x_input'] = best['peak_bytes'] / input_bytes
+        results[mode] = best
+
+    return results
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark sequential vs fused DataTransformer execution'
+    )
+    parser.add_argument(
+        '--rows',
+        type=int,
+        nargs='+',
+        default=[10_000, 100_000, 1_000_000],
+        help='Dataset sizes to benchmark'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Repetitions per mode'
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'mode':>11} {'seconds':>9} {'peak MB':>9} {'peak/input':>11}")
+    for n_records in args.rows:
+        results = run_benchmark(n_records, args.repeat)
+        for mode in ('sequential', 'fused'):
+            r = results[mode]
+            print(f"{n_records:>10,} {mode:>11} {r['seconds']:>9.3f} "
+                  f"{r['peak_bytes'] / 1024**2:>9.1f} {r['peak_x_input']:>10.2f}x")
+        speedup = results['sequential']['seconds'] / results['fused']['seconds']
+        print(f"{'':>10} {'speedup':>11} {speedup:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
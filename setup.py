@@ -72,6 +72,7 @@ setup(
         "pandas>=2.2.0",
         "numpy>=1.26.0",
         "scipy>=1.11.0",
+        "pyarrow>=14.0.0",
         "plotly>=5.18.0",
         "matplotlib>=3.8.0",
         "seaborn>=0.13.0",
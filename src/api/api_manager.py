@@ -8,11 +8,22 @@ Autor: Elizabeth Díaz Familia
 """
 
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+import asyncio
+import functools
+import threading
 import time
 from datetime import datetime
 import json
 
+from .http_session import (ResilientSession, get_session, create_session, run_concurrent,
+                           DEFAULT_MAX_WORKERS, DEFAULT_POOL_SIZE)
+from .rate_limiter import RateLimiter, parse_retry_after, DEFAULT_RATE_PERIOD
+from .single_flight import SingleFlight
+from .resilience import (Resilience, RetryPolicy, DEFAULT_BACKOFF_BASE,
+                         DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT)
+from .response_cache import ResponseCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS
+
 
 class APIManager:
     """Gestor principal de APIs"""
@@ -26,9 +37,53 @@ class APIManager:
         """
         self.config = config or {}
         self.api_calls_count = 0
-        self.cache = {}
+        
+        # Caché de respuestas con TTL por endpoint, LRU y respaldo SQLite
+        # compartido entre procesos ('cache_path': None = solo memoria)
+        performance = self.config.get('performance', {})
+        self.cache = ResponseCache(
+            path=self.config.get('cache_path', DEFAULT_CACHE_PATH),
+            max_entries=int(self.config.get('cache_max_entries', DEFAULT_MAX_ENTRIES)),
+            default_ttl=self.config.get(
+                'cache_ttl_seconds', performance.get('cache_ttl_seconds', DEFAULT_TTL_SECONDS)
+            ),
+            endpoint_ttls=self.config.get('endpoint_ttls')
+        )
+        
+        # Peticiones idénticas concurrentes comparten una sola llamada
+        self.single_flight = SingleFlight()
         self.rate_limit = self.config.get('rate_limit', 100)
+        self.rate_limiter = RateLimiter(
+            rate_limit=self.rate_limit,
+            period=self.config.get('rate_period', DEFAULT_RATE_PERIOD),
+            burst=self.config.get('rate_burst'),
+            host_limits=self.config.get('host_rate_limits')
+        )
         self.timeout = self.config.get('timeout', 30)
+        self.max_workers = int(self.config.get('max_workers', DEFAULT_MAX_WORKERS))
+        self._lock = threading.Lock()
+        
+        # Sesión con keep-alive, reintentos y circuit breaker por host: la
+        # compartida del proceso, salvo que se pase una propia o se pida
+        # otro pool u otra política (retry_attempts también desde etl)
+        retry_attempts = self.config.get('retry_attempts',
+                                         self.config.get('etl', {}).get('retry_attempts'))
+        custom_keys = ('pool_size', 'retry_backoff', 'breaker_failures', 'breaker_reset_seconds')
+        if 'session' in self.config:
+            self.session = self.config['session']
+        elif retry_attempts is not None or any(key in self.config for key in custom_keys):
+            resilience = Resilience(
+                RetryPolicy(
+                    attempts=retry_attempts if retry_attempts is not None else RetryPolicy().attempts,
+                    backoff_base=self.config.get('retry_backoff', DEFAULT_BACKOFF_BASE)
+                ),
+                failure_threshold=self.config.get('breaker_failures', DEFAULT_FAILURE_THRESHOLD),
+                reset_timeout=self.config.get('breaker_reset_seconds', DEFAULT_RESET_TIMEOUT)
+            )
+            self.session = create_session(int(self.config.get('pool_size', DEFAULT_POOL_SIZE)),
+                                          resilience=resilience)
+        else:
+            self.session = get_session()
         
     def make_request(self, url: str, params: Optional[Dict] = None,
                     headers: Optional[Dict] = None, method: str = 'GET',
@@ -36,6 +91,44 @@ class APIManager:
         """
         Realizar petición HTTP con manejo de errores y rate limiting
         
+        Si el host no tiene cupo, el hilo espera solo lo necesario para
+        obtenerlo (token bucket por host, ver rate_limiter.py). Con caché,
+        las llamadas concurrentes con la misma clave url:params esperan la
+        respuesta de la primera en lugar de repetir la petición.
+        
+        Args:
+            url: URL de la API
+            params: Parámetros de la petición
+            headers: Headers HTTP
+            method: Método HTTP
+            use_cache: Usar caché
+            
+        Returns:
+            Respuesta de la API
+        """
+        cache_key = self._cache_key(url, params)
+        cached = self._cache_lookup(cache_key, url, use_cache)
+        if cached is not None:
+            return cached
+        
+        def fetch():
+            # Rate limiting
+            self.rate_limiter.acquire(url)
+            return self._send(url, params, headers, method, use_cache, cache_key)
+        
+        if not use_cache:
+            return fetch()
+        return self.single_flight.do(cache_key, fetch)
+    
+    async def make_request_async(self, url: str, params: Optional[Dict] = None,
+                                 headers: Optional[Dict] = None, method: str = 'GET',
+                                 use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Versión asyncio de make_request
+        
+        La espera de cupo se hace con await (no bloquea el event loop) y la
+        petición se ejecuta en el executor por defecto del loop.
+        
         Args:
             url: URL de la API
             params: Parámetros de la petición
@@ -46,32 +139,77 @@ class APIManager:
         Returns:
             Respuesta de la API
         """
-        # Check cache
-        cache_key = f"{url}:{json.dumps(params, sort_keys=True)}"
-        if use_cache and cache_key in self.cache:
+        cache_key = self._cache_key(url, params)
+        cached = self._cache_lookup(cache_key, url, use_cache)
+        if cached is not None:
+            return cached
+        
+        if use_cache:
+            future, leader = self.single_flight.begin(cache_key)
+            if not leader:
+                return await asyncio.wrap_future(future)
+        
+        try:
+            await self.rate_limiter.acquire_async(url)
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(
+                None, functools.partial(self._send, url, params, headers, method, use_cache, cache_key)
+            )
+        except BaseException as e:
+            if use_cache:
+                self.single_flight.finish(cache_key, future, error=e)
+            raise
+        if use_cache:
+            self.single_flight.finish(cache_key, future, data)
+        return data
+    
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict]) -> str:
+        """Clave de caché de una petición"""
+        return f"{url}:{json.dumps(params, sort_keys=True)}"
+    
+    def _cache_lookup(self, cache_key: str, url: str, use_cache: bool) -> Optional[Dict[str, Any]]:
+        """Respuesta vigente en caché, o None"""
+        if not use_cache:
+            return None
+        data = self.cache.get(cache_key)
+        if data is not None:
             print(f"✅ Cache hit: {url}")
-            return self.cache[cache_key]
+        return data
+    
+    def _send(self, url: str, params: Optional[Dict], headers: Optional[Dict],
+              method: str, use_cache: bool, cache_key: str) -> Dict[str, Any]:
+        """
+        Enviar la petición (ya con cupo) y guardar la respuesta
         
-        # Rate limiting
-        if self.api_calls_count >= self.rate_limit:
-            print("⚠️ Rate limit alcanzado, esperando...")
-            time.sleep(60)
-            self.api_calls_count = 0
+        Un 429/503 con Retry-After pausa el host en el rate limiter. Cada
+        reintento de la sesión pide su propio cupo.
         
+        Returns:
+            Respuesta de la API o {"error": ...}
+        """
+        kwargs = {'headers': headers, 'timeout': self.timeout}
+        if isinstance(self.session, ResilientSession):
+            kwargs['before_retry'] = lambda: self.rate_limiter.acquire(url)
         try:
             if method == 'GET':
-                response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+                response = self.session.get(url, params=params, **kwargs)
             else:
-                response = requests.post(url, json=params, headers=headers, timeout=self.timeout)
+                response = self.session.post(url, json=params, **kwargs)
+            
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None:
+                    self.rate_limiter.defer(url, retry_after)
             
             response.raise_for_status()
             data = response.json()
             
-            # Guardar en caché
-            if use_cache:
-                self.cache[cache_key] = data
-            
-            self.api_calls_count += 1
+            with self._lock:
+                # Guardar en caché
+                if use_cache:
+                    self.cache.set(cache_key, url, data)
+                self.api_calls_count += 1
             print(f"✅ API request successful: {url}")
             
             return data
@@ -86,12 +224,39 @@ class APIManager:
             print(f"❌ Error decodificando JSON")
             return {"error": "Invalid JSON"}
     
+    def fetch_many(self, requests_list: List[Dict[str, Any]],
+                   max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Realizar muchas peticiones concurrentes sobre la sesión compartida
+        
+        Args:
+            requests_list: Peticiones como diccionarios con los argumentos de
+                           make_request (url, params, headers, method, use_cache)
+            max_workers: Peticiones simultáneas (default: max_workers de la config)
+            
+        Returns:
+            Respuestas en el mismo orden que requests_list (los errores se
+            devuelven como {"error": ...}, igual que make_request)
+        """
+        max_workers = int(max_workers or self.max_workers)
+        results = run_concurrent(lambda kwargs: self.make_request(**kwargs),
+                                 requests_list, max_workers)
+        print(f"✅ {len(results)} peticiones completadas ({max_workers} concurrentes)")
+        return results
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Obtener estadísticas de uso de APIs"""
+        resilience = getattr(self.session, 'resilience', None)
         return {
             'total_calls': self.api_calls_count,
             'cache_size': len(self.cache),
-            'rate_limit': self.rate_limit
+            'cache': self.cache.get_statistics(),
+            'rate_limit': self.rate_limit,
+            'rate_limiter': self.rate_limiter.get_statistics(),
+            'coalesced_calls': self.single_flight.stats['coalesced'],
+            'single_flight': self.single_flight.get_statistics(),
+            'max_workers': self.max_workers,
+            'resilience': resilience.get_statistics() if isinstance(resilience, Resilience) else None
         }
 
 
@@ -10,13 +10,21 @@ Autor: Elizabeth Díaz Familia
 import requests
 from typing import Dict, List, Optional
 
+from .http_session import get_session, run_concurrent, DEFAULT_MAX_WORKERS
+
 
 class EconomicIndicatorsAPI:
     """API de indicadores económicos (World Bank)"""
     
-    def __init__(self):
-        """Inicializar API"""
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Inicializar API
+        
+        Args:
+            session: Sesión HTTP (default: la sesión compartida con keep-alive)
+        """
         self.base_url = "https://api.worldbank.org/v2"
+        self.session = session or get_session()
         
     def get_indicator(self, country: str, indicator: str, 
                      date_range: Optional[str] = None) -> Dict:
@@ -41,7 +49,7 @@ class EconomicIndicatorsAPI:
             if date_range:
                 params['date'] = date_range
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=15)
             response.raise_for_status()
             data = response.json()
             
@@ -55,6 +63,27 @@ class EconomicIndicatorsAPI:
             print(f"❌ Error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    def get_indicator_many(self, countries: List[str], indicator: str,
+                           date_range: Optional[str] = None,
+                           max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Dict]:
+        """
+        Obtener un indicador para muchos países de forma concurrente
+        
+        Args:
+            countries: Códigos de país
+            indicator: Código del indicador
+            date_range: Rango de fechas
+            max_workers: Peticiones simultáneas
+            
+        Returns:
+            Diccionario {país: resultado de get_indicator}
+        """
+        results = run_concurrent(
+            lambda country: self.get_indicator(country, indicator, date_range),
+            countries, max_workers
+        )
+        return dict(zip(countries, results))
+    
     def get_gdp(self, country: str) -> Optional[float]:
         """Obtener PIB de un país"""
         result = self.get_indicator(country, 'NY.GDP.MKTP.CD')
@@ -4,25 +4,136 @@
 
 API para obtener tasas de cambio de divisas.
 
+Las tablas de tasas se descargan una vez por moneda base y se reutilizan
+durante su TTL; si la API no responde se usa la tabla vencida o la
+instantánea local data/api_data/exchange_rates.json, sin volver a la API
+hasta offline_retry_seconds después. Las conversiones de columnas completas
+(convert_series / convert_frame) se resuelven con un único gather de NumPy.
+
 Autor: Elizabeth Díaz Familia
 """
 
 import requests
-from typing import Dict, Optional
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, List, Union
+
+from .http_session import get_session
+from .single_flight import SingleFlight
+
+
+# Instantánea local usada cuando la API no está disponible
+DEFAULT_SNAPSHOT_PATH = 'data/api_data/exchange_rates.json'
+
+# Vida de una tabla de tasas descargada (segundos)
+DEFAULT_RATE_TTL = 12 * 3600
+
+# Segundos entre reintentos a la API mientras se usan tasas de respaldo
+DEFAULT_OFFLINE_RETRY = 300
+
+
+class RateTable:
+    """
+    Tabla de tasas de cambio respecto a una moneda base
+    """
+    
+    def __init__(self, base: str, rates: Dict[str, float], date: Optional[str] = None,
+                 source: str = 'api'):
+        """
+        Inicializar la tabla
+        
+        Args:
+            base: Moneda base
+            rates: Unidades de cada moneda por 1 unidad de base
+            date: Fecha de las tasas
+            source: Origen ('api' o 'snapshot')
+        """
+        self.base = base
+        self.rates = {**rates, base: 1.0}
+        self.date = date
+        self.source = source
+        self.fetched_at = time.time()
+        self.currencies = sorted(self.rates)
+        self.values = np.array([self.rates[c] for c in self.currencies], dtype='float64')
+        self._index = {currency: i for i, currency in enumerate(self.currencies)}
+    
+    def rebase(self, base: str) -> 'RateTable':
+        """
+        Expresar la tabla respecto a otra moneda base (tasas cruzadas)
+        
+        Args:
+            base: Nueva moneda base (debe estar en la tabla)
+        
+        Returns:
+            Nueva tabla
+        """
+        pivot = self.rates[base]
+        rates = {currency: rate / pivot for currency, rate in self.rates.items()}
+        return RateTable(base, rates, self.date, self.source)
+    
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """
+        Tasa de from_currency a to_currency
+        
+        Returns:
+            Tasa, o None si alguna moneda no está en la tabla
+        """
+        if from_currency not in self.rates or to_currency not in self.rates:
+            return None
+        return self.rates[to_currency] / self.rates[from_currency]
+    
+    def index_of(self, currency: str) -> int:
+        """Posición de la moneda en self.currencies (-1 si no está)"""
+        return self._index.get(currency, -1)
+    
+    def factors_to(self, to_currency: str) -> np.ndarray:
+        """
+        Factores de conversión de cada moneda de la tabla hacia to_currency
+        
+        Returns:
+            Array alineado con self.currencies
+        """
+        if to_currency not in self._index:
+            raise ValueError(f"Moneda no encontrada: {to_currency}")
+        return self.values[self._index[to_currency]] / self.values
+    
+    def age_seconds(self) -> float:
+        """Segundos desde que se obtuvo la tabla"""
+        return time.time() - self.fetched_at
 
 
 class ExchangeRatesAPI:
     """API de tasas de cambio"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 ttl: float = DEFAULT_RATE_TTL,
+                 snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH,
+                 offline_retry_seconds: float = DEFAULT_OFFLINE_RETRY):
         """
         Inicializar API
         
         Args:
             api_key: Clave de API (opcional para ExchangeRate-API)
+            session: Sesión HTTP (default: la sesión compartida con keep-alive)
+            ttl: Segundos de vida de cada tabla de tasas
+            snapshot_path: Instantánea JSON de respaldo (None = sin respaldo)
+            offline_retry_seconds: Segundos durante los que se sirve el respaldo
+                                   tras un fallo de la API (como máximo ttl)
         """
         self.base_url = "https://api.exchangerate-api.com/v4/latest"
+        self.session = session or get_session()
         self.api_key = api_key
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.offline_retry = min(offline_retry_seconds, ttl)
+        self.rate_tables: Dict[str, RateTable] = {}
+        self.failed_at: Dict[str, float] = {}
+        self.single_flight = SingleFlight()
+        self._lock = threading.Lock()
         
     def get_rates(self, base_currency: str = 'USD') -> Dict:
         """
@@ -36,7 +147,7 @@ class ExchangeRatesAPI:
         """
         try:
             url = f"{self.base_url}/{base_currency}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -47,6 +158,86 @@ class ExchangeRatesAPI:
             print(f"❌ Error obteniendo tasas: {str(e)}")
             return {"error": str(e)}
     
+    def load_snapshot(self, base_currency: str = 'USD') -> Optional[RateTable]:
+        """
+        Cargar la instantánea local de tasas
+        
+        Args:
+            base_currency: Moneda base deseada (se recalcula con tasas cruzadas)
+        
+        Returns:
+            Tabla de tasas, o None si no hay instantánea o no incluye la base
+        """
+        if not self.snapshot_path:
+            return None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            table = RateTable(data['base'], data['rates'], data.get('date'), source='snapshot')
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Error leyendo instantánea de tasas: {str(e)}")
+            return None
+        if base_currency not in table.rates:
+            return None
+        return table if table.base == base_currency else table.rebase(base_currency)
+    
+    def get_rate_table(self, base_currency: str = 'USD') -> Optional[RateTable]:
+        """
+        Obtener la tabla de tasas de una moneda base (una descarga por TTL)
+        
+        Args:
+            base_currency: Moneda base
+        
+        Returns:
+            Tabla de tasas (de la API o de la instantánea), o None
+        """
+        table = self._fresh_table(base_currency)
+        if table is not None:
+            return table
+        # Una descarga por base; los demás hilos que piden esa base la esperan
+        return self.single_flight.do(base_currency, lambda: self._refresh_table(base_currency))
+    
+    def _fresh_table(self, base_currency: str) -> Optional[RateTable]:
+        """Tabla vigente para la base (de la API o de respaldo tras un fallo), o None"""
+        with self._lock:
+            table = self.rate_tables.get(base_currency)
+            failed_at = self.failed_at.get(base_currency)
+        if table is None:
+            return None
+        if table.source == 'api' and table.age_seconds() < self.ttl:
+            return table
+        # Tras un fallo, el respaldo se sirve sin volver a la API hasta offline_retry
+        if failed_at is not None and time.time() - failed_at < self.offline_retry:
+            return table
+        return None
+    
+    def _refresh_table(self, base_currency: str) -> Optional[RateTable]:
+        """Descargar la tabla de una base (sin retener el lock durante la petición)"""
+        table = self._fresh_table(base_currency)
+        if table is not None:
+            return table
+        
+        data = self.get_rates(base_currency)
+        with self._lock:
+            table = self.rate_tables.get(base_currency)
+        if 'rates' in data:
+            table = RateTable(data.get('base', base_currency), data['rates'], data.get('date'))
+            with self._lock:
+                self.failed_at.pop(base_currency, None)
+        else:
+            with self._lock:
+                self.failed_at[base_currency] = time.time()
+            # Una tabla vieja de la API es mejor que la instantánea
+            table = table if table is not None and table.source == 'api' else None
+            table = table or self.load_snapshot(base_currency)
+            if table is not None:
+                print(f"⚠️ Usando tasas {table.source} del {table.date} para {base_currency}")
+        
+        if table is not None:
+            with self._lock:
+                self.rate_tables[base_currency] = table
+        return table
+    
     def convert(self, amount: float, from_currency: str, to_currency: str) -> Optional[float]:
         """
         Convertir entre monedas
@@ -59,19 +250,81 @@ class ExchangeRatesAPI:
         Returns:
             Cantidad convertida
         """
-        rates_data = self.get_rates(from_currency)
+        table = self.get_rate_table(from_currency)
         
-        if 'error' in rates_data:
+        if table is None:
             return None
         
-        if to_currency in rates_data.get('rates', {}):
-            rate = rates_data['rates'][to_currency]
+        rate = table.rate(from_currency, to_currency)
+        if rate is not None:
             converted = amount * rate
             print(f"✅ Conversión: {amount} {from_currency} = {converted:.2f} {to_currency}")
             return converted
         else:
             print(f"❌ Moneda no encontrada: {to_currency}")
             return None
+    
+    def convert_series(self, amounts: pd.Series, from_currency: Union[str, pd.Series],
+                       to_currency: str) -> pd.Series:
+        """
+        Convertir una columna de importes, con una o varias monedas de origen
+        
+        Se usa una sola tabla (base = to_currency): cada moneda se mapea a su
+        índice en la tabla y los factores se obtienen con un gather de NumPy.
+        Las monedas desconocidas dan NaN.
+        
+        Args:
+            amounts: Importes
+            from_currency: Moneda de origen común o Serie con la moneda de cada fila
+            to_currency: Moneda destino
+        
+        Returns:
+            Serie con los importes convertidos (mismo índice)
+        """
+        table = self.get_rate_table(to_currency)
+        if table is None:
+            raise ValueError(f"No hay tasas disponibles para {to_currency}")
+        
+        values = pd.to_numeric(amounts, errors='coerce').to_numpy(dtype='float64')
+        # El último elemento (NaN) recibe las monedas desconocidas (código -1)
+        factors = np.append(table.factors_to(to_currency), np.nan)
+        
+        if isinstance(from_currency, str):
+            currencies = np.array([from_currency], dtype=object)
+            codes = np.full(len(values), table.index_of(from_currency))
+        else:
+            currencies = np.asarray(from_currency, dtype=object)
+            codes = pd.Categorical(currencies, categories=table.currencies).codes
+        
+        if (codes == -1).any():
+            missing = sorted(set(map(str, currencies)) - set(table.currencies))
+            print(f"⚠️ Monedas sin tasa: {missing}")
+        
+        return pd.Series(values * factors[codes], index=amounts.index, name=amounts.name)
+    
+    def convert_frame(self, df: pd.DataFrame, columns: List[str],
+                      from_currency: str, to_currency: str,
+                      suffix: Optional[str] = None) -> pd.DataFrame:
+        """
+        Convertir varias columnas de importes de un DataFrame
+        
+        Args:
+            df: DataFrame con los importes
+            columns: Columnas a convertir (p. ej. MonthlyCharges, TotalCharges)
+            from_currency: Código de moneda o nombre de la columna con la moneda de cada fila
+            to_currency: Moneda destino
+            suffix: Sufijo de las columnas nuevas (default: '_<to_currency>';
+                    '' reemplaza las columnas originales)
+        
+        Returns:
+            Copia del DataFrame con las columnas convertidas
+        """
+        source = df[from_currency] if from_currency in df.columns else from_currency
+        suffix = f'_{to_currency}' if suffix is None else suffix
+        converted = {f'{col}{suffix}': self.convert_series(df[col], source, to_currency)
+                     for col in columns}
+        print(f"✅ {len(columns)} columnas convertidas a {to_currency}: {len(df):,} registros")
+        return df.assign(**converted)
 
 
 if __name__ == "__main__":
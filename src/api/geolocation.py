@@ -4,93 +4,320 @@
 
 API para servicios de geolocalización.
 
+- Geocodificación por lotes: direcciones deduplicadas, repetidas servidas
+  desde la caché persistente (SQLite compartido, ver response_cache.py)
+  y peticiones a Nominatim limitadas a 1 por segundo (política de uso)
+- Índice espacial local (KD-tree): la geocodificación inversa de
+  coordenadas ya vistas se responde sin llamar a la red
+
 Autor: Elizabeth Díaz Familia
 """
 
+import threading
 import requests
-from typing import Dict, Optional, Tuple
+import numpy as np
+from scipy.spatial import cKDTree
+from typing import Dict, Optional, Tuple, List, Iterable, Any
+
+from .http_session import ResilientSession, get_session
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache, DEFAULT_CACHE_PATH
+
+
+# Política de uso de Nominatim: como máximo 1 petición por segundo
+DEFAULT_GEOCODE_RATE = 1.0
+
+# Distancia (km) a la que una coordenada ya vista responde la geocodificación inversa
+DEFAULT_INDEX_RADIUS_KM = 0.05
+
+# Radio medio de la Tierra (km)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def normalize_address(address: str) -> str:
+    """Forma canónica de una dirección para deduplicar (espacios y mayúsculas)"""
+    return ' '.join(str(address).split()).casefold()
+
+
+class SpatialIndex:
+    """
+    Índice de puntos (lat, lon) con dirección, sobre un KD-tree
+    """
+
+    def __init__(self):
+        """Inicializar el índice vacío"""
+        self.points: List[Tuple[float, float]] = []
+        self.labels: List[str] = []
+        self._tree: Optional[cKDTree] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_xyz(coords: np.ndarray) -> np.ndarray:
+        """Coordenadas (lat, lon) en grados a vectores unitarios 3D"""
+        lat, lon = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+        return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+    def add(self, lat: float, lon: float, label: str) -> None:
+        """
+        Añadir un punto (el árbol se reconstruye en la siguiente consulta)
+
+        Args:
+            lat: Latitud
+            lon: Longitud
+            label: Dirección del punto
+        """
+        with self._lock:
+            self.points.append((float(lat), float(lon)))
+            self.labels.append(label)
+            self._tree = None
+
+    def nearest_many(self, coords: Iterable[Tuple[float, float]],
+                     max_km: float = DEFAULT_INDEX_RADIUS_KM) -> List[Optional[str]]:
+        """
+        Dirección del punto conocido más cercano a cada coordenada
+
+        La distancia euclídea entre vectores unitarios (cuerda) es monótona
+        con la distancia sobre la esfera, así que basta un KD-tree 3D.
+
+        Args:
+            coords: Coordenadas (lat, lon)
+            max_km: Distancia máxima aceptada
+
+        Returns:
+            Dirección o None (más lejos que max_km) para cada coordenada
+        """
+        query = np.asarray(list(coords), dtype='float64').reshape(-1, 2)
+        with self._lock:
+            if not self.points or len(query) == 0:
+                return [None] * len(query)
+            if self._tree is None:
+                self._tree = cKDTree(self._to_xyz(np.asarray(self.points)))
+            tree, labels = self._tree, list(self.labels)
+
+        chord = 2 * np.sin(min(max_km / EARTH_RADIUS_KM, np.pi) / 2)
+        distances, indices = tree.query(self._to_xyz(query), distance_upper_bound=chord)
+        return [labels[i] if np.isfinite(d) else None for d, i in zip(distances, indices)]
+
+    def nearest(self, lat: float, lon: float,
+                max_km: float = DEFAULT_INDEX_RADIUS_KM) -> Optional[str]:
+        """Dirección del punto conocido más cercano, o None"""
+        return self.nearest_many([(lat, lon)], max_km)[0]
+
+    def __len__(self) -> int:
+        """Puntos indexados"""
+        return len(self.points)
 
 
 class GeolocationAPI:
     """API de geolocalización"""
-    
-    def __init__(self):
-        """Inicializar API"""
-        self.base_url = "https://nominatim.openstreetmap.org"
-        
-    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 rate_limit: float = DEFAULT_GEOCODE_RATE,
+                 index_radius_km: float = DEFAULT_INDEX_RADIUS_KM):
         """
-        Convertir dirección a coordenadas
-        
+        Inicializar API
+
         Args:
-            address: Dirección a geocodificar
-            
+            session: Sesión HTTP (default: la sesión compartida con keep-alive)
+            cache_path: Archivo SQLite de la caché persistente (None = solo memoria)
+            rate_limit: Peticiones por segundo a Nominatim
+            index_radius_km: Distancia máxima para responder desde el índice local
+        """
+        self.base_url = "https://nominatim.openstreetmap.org"
+        self.session = session or get_session()
+        self.cache = ResponseCache(path=cache_path)
+        self.rate_limiter = RateLimiter(rate_limit=rate_limit, period=1.0, burst=1)
+        self.index_radius_km = index_radius_km
+        self.index = SpatialIndex()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'index_hits': 0, 'deduplicated': 0}
+        self._lock = threading.Lock()
+
+        # El índice se reconstruye con lo ya geocodificado en la caché
+        for _, place in self.cache.scan('geocode:') + self.cache.scan('reverse:'):
+            self._index_place(place)
+
+    def _index_place(self, place: Dict[str, Any]) -> None:
+        """Añadir al índice un resultado con lat, lon y display_name"""
+        if place.get('display_name') and 'lat' in place and 'lon' in place:
+            self.index.add(place['lat'], place['lon'], place['display_name'])
+
+    def _count(self, key: str, n: int = 1) -> None:
+        """Incrementar un contador"""
+        with self._lock:
+            self.stats[key] += n
+
+    def _request(self, path: str, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        Petición a Nominatim respetando el límite de uso
+
         Returns:
-            (latitud, longitud) o None
+            JSON de la respuesta, o None si hubo un error
         """
         try:
-            url = f"{self.base_url}/search"
-            params = {
-                'q': address,
-                'format': 'json',
-                'limit': 1
-            }
+            url = f"{self.base_url}/{path}"
             headers = {
                 'User-Agent': 'TelecomX-Analysis/1.0'
             }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            kwargs = {'headers': headers, 'timeout': 10}
+            if isinstance(self.session, ResilientSession):
+                # Los reintentos también respetan el límite de Nominatim
+                kwargs['before_retry'] = lambda: self.rate_limiter.acquire(url)
+
+            self.rate_limiter.acquire(url)
+            self._count('requests')
+            response = self.session.get(url, params={**params, 'format': 'json'}, **kwargs)
             response.raise_for_status()
-            data = response.json()
-            
-            if data:
-                lat = float(data[0]['lat'])
-                lon = float(data[0]['lon'])
-                print(f"✅ Geocodificado: {address} -> ({lat}, {lon})")
-                return (lat, lon)
-            else:
-                print(f"⚠️ No se encontraron coordenadas")
-                return None
-                
+            return response.json()
+
         except Exception as e:
             print(f"❌ Error: {str(e)}")
             return None
-    
+
+    def _search(self, address: str) -> Optional[Dict[str, Any]]:
+        """
+        Geocodificar una dirección (caché y, si no está, Nominatim)
+
+        Returns:
+            {'lat', 'lon', 'display_name'}, {} si no existe, o None si hubo un error
+        """
+        key = f"geocode:{normalize_address(address)}"
+        place = self.cache.get(key)
+        if place is not None:
+            self._count('cache_hits')
+            return place
+
+        data = self._request('search', {'q': address, 'limit': 1})
+        if data is None:
+            return None
+
+        place = {}
+        if data:
+            place = {'lat': float(data[0]['lat']), 'lon': float(data[0]['lon']),
+                     'display_name': data[0].get('display_name', address)}
+            self._index_place(place)
+        self.cache.set(key, f"{self.base_url}/search", place)
+        return place
+
+    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        """
+        Convertir dirección a coordenadas
+
+        Args:
+            address: Dirección a geocodificar
+
+        Returns:
+            (latitud, longitud) o None
+        """
+        place = self._search(address)
+
+        if place:
+            lat, lon = place['lat'], place['lon']
+            print(f"✅ Geocodificado: {address} -> ({lat}, {lon})")
+            return (lat, lon)
+        elif place is not None:
+            print(f"⚠️ No se encontraron coordenadas")
+        return None
+
+    def geocode_many(self, addresses: Iterable[str]) -> List[Optional[Tuple[float, float]]]:
+        """
+        Geocodificar un lote de direcciones
+
+        Cada dirección distinta (sin contar espacios ni mayúsculas) se
+        resuelve una sola vez; las ya conocidas salen de la caché y el
+        resto va a Nominatim al ritmo permitido.
+
+        Args:
+            addresses: Direcciones a geocodificar
+
+        Returns:
+            (latitud, longitud) o None para cada dirección, en el mismo orden
+        """
+        addresses = list(addresses)
+        unique = {}
+        for address in addresses:
+            unique.setdefault(normalize_address(address), address)
+        self._count('deduplicated', len(addresses) - len(unique))
+
+        places = {key: self._search(address) for key, address in unique.items()}
+        results = [
+            (place['lat'], place['lon']) if place else None
+            for place in (places[normalize_address(address)] for address in addresses)
+        ]
+        found = sum(1 for place in places.values() if place)
+        print(f"✅ Geocodificadas {found}/{len(unique)} direcciones únicas ({len(addresses)} en total)")
+        return results
+
     def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
         """
         Convertir coordenadas a dirección
-        
+
         Args:
             lat: Latitud
             lon: Longitud
-            
+
         Returns:
             Dirección o None
         """
-        try:
-            url = f"{self.base_url}/reverse"
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'format': 'json'
-            }
-            headers = {
-                'User-Agent': 'TelecomX-Analysis/1.0'
-            }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            address = data.get('display_name')
-            if address:
-                print(f"✅ Geocodificación inversa: ({lat}, {lon}) -> {address}")
+        return self.reverse_geocode_many([(lat, lon)])[0]
+
+    def reverse_geocode_many(self, coords: Iterable[Tuple[float, float]]) -> List[Optional[str]]:
+        """
+        Convertir un lote de coordenadas a direcciones
+
+        Las coordenadas a menos de index_radius_km de un punto ya conocido
+        se responden desde el índice local, sin llamar a la red.
+
+        Args:
+            coords: Coordenadas (lat, lon)
+
+        Returns:
+            Dirección o None para cada coordenada, en el mismo orden
+        """
+        coords = [(float(lat), float(lon)) for lat, lon in coords]
+        results = self.index.nearest_many(coords, self.index_radius_km)
+        self._count('index_hits', sum(1 for address in results if address is not None))
+
+        resolved: Dict[Tuple[float, float], Optional[str]] = {}
+        for i, (lat, lon) in enumerate(coords):
+            if results[i] is not None:
+                continue
+            point = (round(lat, 6), round(lon, 6))
+            if point not in resolved:
+                resolved[point] = self._reverse(*point)
+            results[i] = resolved[point]
+        return results
+
+    def _reverse(self, lat: float, lon: float) -> Optional[str]:
+        """Geocodificación inversa de una coordenada fuera del índice"""
+        key = f"reverse:{lat},{lon}"
+        place = self.cache.get(key)
+        if place is not None:
+            self._count('cache_hits')
+        else:
+            # Un punto cercano pudo indexarse en este mismo lote
+            address = self.index.nearest(lat, lon, self.index_radius_km)
+            if address is not None:
+                self._count('index_hits')
                 return address
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+
+            data = self._request('reverse', {'lat': lat, 'lon': lon})
+            if data is None:
+                return None
+            place = {'lat': lat, 'lon': lon, 'display_name': data.get('display_name')}
+            self.cache.set(key, f"{self.base_url}/reverse", place)
+            self._index_place(place)
+
+        address = place.get('display_name')
+        if address:
+            print(f"✅ Geocodificación inversa: ({lat}, {lon}) -> {address}")
+        return address
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Peticiones a Nominatim, aciertos de caché e índice"""
+        with self._lock:
+            return {**self.stats, 'indexed_points': len(self.index),
+                    'rate_limiter': self.rate_limiter.get_statistics()}
 
 
 if __name__ == "__main__":
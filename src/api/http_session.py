@@ -0,0 +1,131 @@
+"""
+🔌 HTTP Session Pool
+====================
+
+Capa HTTP compartida por las APIs externas:
+- Una requests.Session por proceso con keep-alive y pool de conexiones,
+  en lugar de abrir una conexión TCP/TLS nueva en cada requests.get
+- Reintentos con backoff y circuit breaker por host (ver resilience.py)
+- Ejecución concurrente acotada de muchas peticiones (pool de hilos)
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .resilience import Resilience
+
+
+# Conexiones mantenidas por host en el pool
+DEFAULT_POOL_SIZE = 20
+
+# Hilos por defecto de las peticiones concurrentes
+DEFAULT_MAX_WORKERS = 8
+
+DEFAULT_HEADERS = {'User-Agent': 'TelecomX-Analysis/1.0'}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class ResilientSession(requests.Session):
+    """
+    Sesión que envía cada petición a través de una capa Resilience
+    """
+
+    def __init__(self, resilience: Optional[Resilience] = None):
+        """
+        Inicializar la sesión
+
+        Args:
+            resilience: Reintentos y circuit breakers (default: Resilience())
+        """
+        super().__init__()
+        self.resilience = resilience or Resilience()
+
+    def request(self, method, url, *args, before_retry=None, **kwargs):
+        """
+        Enviar la petición con circuit breaker y reintentos
+
+        Args:
+            before_retry: Función llamada antes de cada reintento (p. ej.
+                          pedir cupo al rate limiter del llamador)
+        """
+        send = lambda: super(ResilientSession, self).request(method, url, *args, **kwargs)
+        return self.resilience.call(method, url, send, before_retry)
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE,
+                   headers: Optional[Dict[str, str]] = None,
+                   resilience: Optional[Resilience] = None) -> requests.Session:
+    """
+    Crear una sesión HTTP con pool de conexiones
+
+    Args:
+        pool_size: Conexiones reutilizables por host (debe cubrir los hilos
+                   concurrentes, si no las conexiones extra se descartan)
+        headers: Headers por defecto de la sesión
+        resilience: Reintentos y circuit breakers (default: Resilience())
+
+    Returns:
+        Sesión configurada para http y https
+    """
+    session = ResilientSession(resilience)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(headers or DEFAULT_HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Obtener la sesión compartida del proceso (se crea en el primer uso)
+
+    Returns:
+        Sesión HTTP compartida
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session() -> None:
+    """Cerrar la sesión compartida y sus conexiones"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def run_concurrent(function: Callable[[Any], Any], items: Iterable[Any],
+                   max_workers: int = DEFAULT_MAX_WORKERS) -> List[Any]:
+    """
+    Aplicar function a cada elemento en un pool de hilos acotado
+
+    Las peticiones HTTP liberan el GIL mientras esperan la red, así que
+    max_workers peticiones avanzan a la vez sobre la sesión compartida.
+
+    Args:
+        function: Función a aplicar (p. ej. una petición)
+        items: Elementos de entrada
+        max_workers: Hilos máximos
+
+    Returns:
+        Resultados en el mismo orden que items
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(function, items))
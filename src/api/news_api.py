@@ -11,18 +11,23 @@ import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from .http_session import get_session
+
 
 class NewsAPI:
     """API de noticias"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
         """
         Inicializar API
         
         Args:
             api_key: Clave de NewsAPI.org
+            session: Sesión HTTP (default: la sesión compartida con keep-alive)
         """
         self.base_url = "https://newsapi.org/v2"
+        self.session = session or get_session()
         self.api_key = api_key or "demo"
         
     def get_news(self, query: str = 'telecommunications', 
@@ -47,7 +52,7 @@ class NewsAPI:
                 'apiKey': self.api_key
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=15)
             response.raise_for_status()
             data = response.json()
             
@@ -69,7 +74,7 @@ class NewsAPI:
                 'apiKey': self.api_key
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=15)
             response.raise_for_status()
             return response.json()
             
@@ -0,0 +1,221 @@
+"""
+⏱️ Rate Limiter
+===============
+
+Limitador de peticiones por host para las APIs externas:
+- Token bucket por host (ráfaga + tasa sostenida), seguro entre hilos
+- Reserva sin bloqueo: cada llamada obtiene el tiempo exacto que debe
+  esperar, y espera con time.sleep o con await asyncio.sleep
+- Respeta Retry-After: el host queda en pausa el tiempo indicado
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+
+# Peticiones permitidas por periodo (etl/api rate_limit)
+DEFAULT_RATE_LIMIT = 100
+
+# Periodo de rate_limit en segundos
+DEFAULT_RATE_PERIOD = 60.0
+
+
+def host_of(url: str) -> str:
+    """Host de una URL (o el propio valor si ya es un host)"""
+    return urlsplit(url).netloc or url
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interpretar un header Retry-After
+
+    Args:
+        value: Segundos ('120') o fecha HTTP ('Wed, 21 Oct 2015 07:28:00 GMT')
+
+    Returns:
+        Segundos a esperar, o None si el valor no es válido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """
+    Token bucket con reservas: los tokens pueden quedar en negativo y el
+    déficit se traduce en el tiempo de espera de quien reservó
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Inicializar el bucket
+
+        Args:
+            rate: Tokens repuestos por segundo
+            capacity: Tokens máximos acumulados (tamaño de ráfaga)
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"rate y capacity inválidos: {rate}, {capacity}")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Reponer los tokens acumulados desde la última actualización"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Reservar tokens sin bloquear
+
+        Args:
+            tokens: Tokens a consumir
+
+        Returns:
+            Segundos que el llamador debe esperar antes de usar la reserva
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now, 0.0)
+
+    def defer(self, seconds: float) -> None:
+        """
+        Pausar el bucket (p. ej. por Retry-After) y descartar la ráfaga acumulada
+
+        Args:
+            seconds: Segundos de pausa desde ahora
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimiter:
+    """
+    Rate limiter con un token bucket por host
+    """
+
+    def __init__(self, rate_limit: float = DEFAULT_RATE_LIMIT,
+                 period: float = DEFAULT_RATE_PERIOD,
+                 burst: Optional[float] = None,
+                 host_limits: Optional[Dict[str, float]] = None):
+        """
+        Inicializar el limitador
+
+        Args:
+            rate_limit: Peticiones por periodo para cada host
+            period: Periodo en segundos
+            burst: Peticiones seguidas permitidas (default: rate_limit)
+            host_limits: Peticiones por periodo para hosts concretos
+        """
+        self.rate_limit = float(rate_limit)
+        self.period = float(period)
+        self.burst = burst
+        self.host_limits = dict(host_limits or {})
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.stats = {'acquired': 0, 'delayed': 0, 'wait_seconds': 0.0, 'deferrals': 0}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """
+        Obtener (o crear) el bucket del host de una URL
+
+        Args:
+            url: URL o host
+
+        Returns:
+            Token bucket del host
+        """
+        host = host_of(url)
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                limit = float(self.host_limits.get(host, self.rate_limit))
+                burst = self.burst if self.burst is not None else limit
+                bucket = TokenBucket(limit / self.period, max(burst, 1.0))
+                self.buckets[host] = bucket
+            return bucket
+
+    def _record(self, wait: float) -> None:
+        """Acumular la espera de una reserva en las estadísticas"""
+        with self._lock:
+            self.stats['acquired'] += 1
+            if wait > 0:
+                self.stats['delayed'] += 1
+                self.stats['wait_seconds'] += wait
+
+    def acquire(self, url: str) -> float:
+        """
+        Esperar (en este hilo) hasta que haya cupo para el host
+
+        Args:
+            url: URL de la petición
+
+        Returns:
+            Segundos esperados
+        """
+        wait = self.bucket(url).reserve()
+        self._record(wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """
+        Esperar cupo sin bloquear el event loop
+
+        Args:
+            url: URL de la petición
+
+        Returns:
+            Segundos esperados
+        """
+        wait = self.bucket(url).reserve()
+        self._record(wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def defer(self, url: str, seconds: float) -> None:
+        """
+        Pausar un host (Retry-After)
+
+        Args:
+            url: URL o host
+            seconds: Segundos de pausa
+        """
+        self.bucket(url).defer(seconds)
+        with self._lock:
+            self.stats['deferrals'] += 1
+        print(f"⏸️ {host_of(url)} en pausa {seconds:.1f}s (Retry-After)")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Estadísticas de esperas del limitador"""
+        with self._lock:
+            return {**self.stats, 'wait_seconds': round(self.stats['wait_seconds'], 3),
+                    'hosts': len(self.buckets)}
@@ -0,0 +1,272 @@
+"""
+🛡️ API Resilience
+=================
+
+Capa de resiliencia compartida por las APIs externas:
+- Reintentos acotados con backoff exponencial y jitter para métodos
+  idempotentes (GET, HEAD, OPTIONS)
+- Circuit breaker por host: tras varios fallos seguidos el host se da
+  por caído y las llamadas fallan al instante, sin ocupar un hilo
+  durante timeout segundos; pasado un tiempo se prueba con una llamada
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import requests
+
+from .rate_limiter import host_of, parse_retry_after
+
+
+# etl.retry_attempts en config/settings.json (intentos totales)
+DEFAULT_RETRY_ATTEMPTS = 3
+
+# Backoff: base * 2**intento, como máximo DEFAULT_BACKOFF_MAX segundos
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+# Fallos seguidos que abren el circuito y segundos hasta probar de nuevo
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+# Respuestas que vale la pena reintentar
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Errores de red transitorios que vale la pena reintentar
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """El circuito del host está abierto: la petición no se envía"""
+
+
+class RetryPolicy:
+    """
+    Política de reintentos con backoff exponencial y jitter completo
+    """
+
+    def __init__(self, attempts: int = DEFAULT_RETRY_ATTEMPTS,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX):
+        """
+        Inicializar la política
+
+        Args:
+            attempts: Intentos totales por petición (1 = sin reintentos)
+            backoff_base: Segundos del primer backoff
+            backoff_max: Backoff máximo en segundos
+        """
+        self.attempts = max(int(attempts), 1)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Espera antes del siguiente intento
+
+        El jitter reparte los reintentos de muchos hilos en el tiempo en
+        lugar de repetirlos todos a la vez. Un Retry-After del servidor se
+        respeta completo (Resilience.call no reintenta si supera backoff_max).
+
+        Args:
+            attempt: Intento que acaba de fallar (0 = el primero)
+            retry_after: Segundos pedidos por el servidor (Retry-After)
+
+        Returns:
+            Segundos a esperar
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de un host (closed → open → half-open → closed)
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Inicializar el breaker
+
+        Args:
+            failure_threshold: Fallos seguidos que abren el circuito
+            reset_timeout: Segundos abierto antes de permitir una prueba
+        """
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_timeout = float(reset_timeout)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Decidir si una llamada puede salir
+
+        Returns:
+            True si se permite (en half-open solo una llamada de prueba)
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Registrar un éxito (cierra el circuito)"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Liberar la llamada de prueba sin registrar resultado (p. ej. una interrupción)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Registrar un fallo (abre el circuito al llegar al umbral o si falla la prueba)"""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class Resilience:
+    """
+    Reintentos y circuit breakers por host para una sesión HTTP
+    """
+
+    def __init__(self, retry_policy: Optional[RetryPolicy] = None,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Inicializar la capa de resiliencia
+
+        Args:
+            retry_policy: Política de reintentos (default: RetryPolicy())
+            failure_threshold: Fallos seguidos que abren el circuito de un host
+            reset_timeout: Segundos abierto antes de probar el host de nuevo
+        """
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = {'retries': 0, 'failures': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Obtener (o crear) el breaker del host de una URL"""
+        host = host_of(url)
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self.breakers[host] = breaker
+            return breaker
+
+    def _count(self, key: str) -> None:
+        """Incrementar un contador"""
+        with self._lock:
+            self.stats[key] += 1
+
+    def call(self, method: str, url: str, send, before_retry=None) -> requests.Response:
+        """
+        Ejecutar una petición con circuit breaker y reintentos
+
+        Cualquier RequestException y las respuestas 429/5xx cuentan como
+        fallo; solo los errores de red transitorios y esas respuestas se
+        reintentan, y solo en métodos idempotentes. Un 429 no abre el
+        circuito (el host responde, solo pide bajar el ritmo). Si el
+        servidor pide esperar más que backoff_max (Retry-After) no se
+        reintenta: se devuelve la respuesta para que el llamador pause el
+        host en su rate limiter.
+
+        Args:
+            method: Método HTTP
+            url: URL de la petición
+            send: Función sin argumentos que envía la petición una vez
+            before_retry: Función sin argumentos llamada antes de cada
+                          reintento (p. ej. pedir cupo al rate limiter)
+
+        Returns:
+            Última respuesta obtenida
+
+        Raises:
+            CircuitOpenError: Si el circuito del host está abierto
+            requests.exceptions.RequestException: Si fallan todos los intentos
+        """
+        breaker = self.breaker(url)
+        attempts = self.retry_policy.attempts if method.upper() in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(attempts):
+            if attempt and before_retry is not None:
+                before_retry()
+            if not breaker.allow():
+                self._count('rejected')
+                raise CircuitOpenError(f"Circuito abierto para {host_of(url)}")
+
+            retry_after = None
+            try:
+                response = send()
+            except RETRY_EXCEPTIONS:
+                breaker.record_failure()
+                self._count('failures')
+                if attempt == attempts - 1:
+                    raise
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                self._count('failures')
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+                if response.status_code == 429:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                self._count('failures')
+                if attempt == attempts - 1:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > self.retry_policy.backoff_max:
+                    return response
+                response.close()
+
+            self._count('retries')
+            time.sleep(self.retry_policy.delay(attempt, retry_after))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Reintentos, fallos, rechazos y estado de cada circuito"""
+        with self._lock:
+            return {
+                **self.stats,
+                'open_circuits': sorted(host for host, breaker in self.breakers.items()
+                                        if breaker.state != CircuitBreaker.CLOSED),
+            }
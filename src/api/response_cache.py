@@ -0,0 +1,247 @@
+"""
+🗄️ API Response Cache
+=====================
+
+Caché de respuestas de las APIs externas:
+- TTL por endpoint (host o host/ruta) con un TTL por defecto
+  (performance.cache_ttl_seconds)
+- Tamaño acotado con desalojo LRU, en memoria y en disco
+- Respaldo en SQLite (modo WAL) compartido entre procesos: un reinicio
+  en caliente no vuelve a consultar las APIs
+- Contadores de aciertos, fallos, expiraciones y desalojos
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+DEFAULT_CACHE_PATH = 'data/cache/api_responses.sqlite'
+DEFAULT_MAX_ENTRIES = 10_000
+
+# performance.cache_ttl_seconds en config/settings.json
+DEFAULT_TTL_SECONDS = 3600
+
+# TTL por endpoint (prefijo host o host/ruta)
+DEFAULT_ENDPOINT_TTLS: Dict[str, float] = {
+    'api.exchangerate-api.com': 12 * 3600,
+    'api.worldbank.org': 7 * 24 * 3600,
+    'api.openweathermap.org': 3 * 3600,
+    'newsapi.org': 24 * 3600,
+    'nominatim.openstreetmap.org': 30 * 24 * 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+class ResponseCache:
+    """
+    Caché LRU con TTL de respuestas JSON, con memoria y SQLite
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 default_ttl: float = DEFAULT_TTL_SECONDS,
+                 endpoint_ttls: Optional[Dict[str, float]] = None):
+        """
+        Inicializar la caché
+
+        Args:
+            path: Archivo SQLite compartido (None = solo memoria)
+            max_entries: Entradas máximas antes de desalojar (LRU)
+            default_ttl: Segundos de vida de una respuesta sin TTL propio
+            endpoint_ttls: TTL por prefijo 'host' o 'host/ruta' (el prefijo
+                           más largo gana); se combinan con los de por defecto
+        """
+        if max_entries <= 0:
+            raise ValueError(f"max_entries debe ser positivo: {max_entries}")
+        self.max_entries = int(max_entries)
+        self.default_ttl = float(default_ttl)
+        self.endpoint_ttls = {**DEFAULT_ENDPOINT_TTLS, **(endpoint_ttls or {})}
+        self.memory: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self._lock = threading.RLock()
+
+        self.path = Path(path) if path else None
+        self._db = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                       isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(_SCHEMA)
+
+    def ttl_for(self, url: str) -> float:
+        """
+        TTL aplicable a una URL
+
+        Args:
+            url: URL de la petición
+
+        Returns:
+            Segundos de vida
+        """
+        parts = urlsplit(url)
+        target = f"{parts.netloc}{parts.path}" if parts.netloc else url
+        matches = [prefix for prefix in self.endpoint_ttls if target.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return float(self.endpoint_ttls[max(matches, key=len)])
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Obtener una respuesta vigente
+
+        Args:
+            key: Clave de la petición
+
+        Returns:
+            Respuesta, o None si no está o expiró
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                expires, data = entry
+                if expires > now:
+                    self.memory.move_to_end(key)
+                    self.stats['hits'] += 1
+                    if self._db is not None:
+                        self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                    return data
+                del self.memory[key]
+                self.stats['expired'] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT body, expires FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        data = json.loads(row[0])
+                        self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                        self._remember(key, row[1], data)
+                        self.stats['hits'] += 1
+                        self.stats['disk_hits'] += 1
+                        return data
+                    self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self.stats['expired'] += 1
+
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key: str, url: str, data: Any, ttl: Optional[float] = None) -> None:
+        """
+        Guardar una respuesta
+
+        Args:
+            key: Clave de la petición
+            url: URL (para elegir el TTL)
+            data: Respuesta serializable a JSON
+            ttl: Segundos de vida (default: el del endpoint)
+        """
+        now = time.time()
+        expires = now + (self.ttl_for(url) if ttl is None else float(ttl))
+        with self._lock:
+            self._remember(key, expires, data)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO responses (key, url, body, created, expires, accessed) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, url, json.dumps(data), now, expires, now)
+                )
+                self._evict_disk(now)
+
+    def _remember(self, key: str, expires: float, data: Any) -> None:
+        """Guardar en memoria y desalojar la entrada menos usada si sobra"""
+        self.memory[key] = (expires, data)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            if self._db is None:
+                self.stats['evictions'] += 1
+
+    def _evict_disk(self, now: float) -> None:
+        """Borrar expiradas y, si sobran entradas, las menos usadas en disco"""
+        self._db.execute('DELETE FROM responses WHERE expires <= ?', (now,))
+        excess = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY accessed LIMIT ?)', (excess,)
+            )
+            self.stats['evictions'] += excess
+
+    def scan(self, prefix: str) -> List[Tuple[str, Any]]:
+        """
+        Entradas vigentes cuya clave empieza por prefix (no cuenta como acceso)
+
+        Args:
+            prefix: Prefijo de la clave
+
+        Returns:
+            Lista de (clave, respuesta)
+        """
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                rows = self._db.execute(
+                    'SELECT key, body FROM responses WHERE substr(key, 1, ?) = ? AND expires > ?',
+                    (len(prefix), prefix, now)
+                ).fetchall()
+                return [(key, json.loads(body)) for key, body in rows]
+            return [(key, data) for key, (expires, data) in self.memory.items()
+                    if key.startswith(prefix) and expires > now]
+
+    def clear(self) -> None:
+        """Vaciar la caché (memoria y disco)"""
+        with self._lock:
+            self.memory.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        """Cerrar la conexión SQLite"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        """Entradas vigentes"""
+        with self._lock:
+            if self._db is not None:
+                return self._db.execute(
+                    'SELECT COUNT(*) FROM responses WHERE expires > ?', (time.time(),)
+                ).fetchone()[0]
+            return len(self.memory)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Contadores de la caché"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': len(self),
+                'max_entries': self.max_entries,
+                'path': str(self.path) if self.path else None,
+            }
@@ -0,0 +1,95 @@
+"""
+🛬 Single-Flight
+================
+
+Deduplicación de peticiones idénticas en vuelo:
+- La primera llamada con una clave ejecuta la petición (líder)
+- Las llamadas concurrentes con la misma clave esperan su resultado
+  en lugar de repetir la petición al upstream
+- Funciona entre hilos y con asyncio (asyncio.wrap_future)
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, Tuple
+
+
+class SingleFlight:
+    """
+    Grupo de llamadas en vuelo indexadas por clave
+    """
+
+    def __init__(self):
+        """Inicializar el grupo"""
+        self.in_flight: Dict[str, Future] = {}
+        self.stats = {'executed': 0, 'coalesced': 0}
+        self._lock = threading.Lock()
+
+    def begin(self, key: str) -> Tuple[Future, bool]:
+        """
+        Registrar una llamada
+
+        Args:
+            key: Clave de la petición
+
+        Returns:
+            (future con el resultado, True si el llamador es el líder y
+            debe ejecutar la petición y llamar a finish)
+        """
+        with self._lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self.in_flight[key] = future
+            self.stats['executed'] += 1
+            return future, True
+
+    def finish(self, key: str, future: Future, result: Any = None,
+               error: BaseException = None) -> None:
+        """
+        Publicar el resultado del líder y liberar la clave
+
+        Args:
+            key: Clave de la petición
+            future: Future devuelto por begin
+            result: Resultado de la petición
+            error: Excepción de la petición (se propaga a todos)
+        """
+        with self._lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, function: Callable[[], Any]) -> Any:
+        """
+        Ejecutar function una sola vez para las llamadas concurrentes con la misma clave
+
+        Args:
+            key: Clave de la petición
+            function: Petición a ejecutar (solo la ejecuta el líder)
+
+        Returns:
+            Resultado compartido
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result()
+        try:
+            result = function()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Llamadas ejecutadas y agrupadas"""
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self.in_flight)}
@@ -4,29 +4,100 @@
 
 API para obtener datos meteorológicos (OpenWeatherMap).
 
+- Caché por franjas de tiempo: el clima actual se reutiliza dentro de la
+  misma franja de 10 minutos y el pronóstico dentro de la misma hora
+- get_weather_many: varias ciudades en paralelo sobre la sesión compartida,
+  devueltas como un DataFrame listo para unir por región
+
 Autor: Elizabeth Díaz Familia
 """
 
 import requests
-from typing import Dict, Optional
+import time
+import pandas as pd
+from typing import Dict, Optional, Callable, Iterable, List, Any
+
+from .http_session import get_session, run_concurrent, DEFAULT_MAX_WORKERS
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+
+
+# Franjas de caché (segundos): clima actual y pronóstico
+DEFAULT_CURRENT_BUCKET = 600
+DEFAULT_FORECAST_BUCKET = 3600
+
+# Columnas del DataFrame de get_weather_many (además de la columna de región)
+WEATHER_COLUMNS = ['temp', 'feels_like', 'humidity', 'pressure', 'wind_speed',
+                   'weather', 'description', 'observed_at', 'error']
 
 
 class WeatherAPI:
     """API de datos meteorológicos"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 current_bucket: float = DEFAULT_CURRENT_BUCKET,
+                 forecast_bucket: float = DEFAULT_FORECAST_BUCKET,
+                 cache_path: Optional[str] = None):
         """
         Inicializar API
         
         Args:
             api_key: Clave de OpenWeatherMap API
+            session: Sesión HTTP (default: la sesión compartida con keep-alive)
+            max_workers: Ciudades consultadas a la vez en get_weather_many
+            current_bucket: Segundos de cada franja de caché del clima actual
+            forecast_bucket: Segundos de cada franja de caché del pronóstico
+            cache_path: Archivo SQLite de la caché (default: solo memoria)
         """
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.session = session or get_session()
         self.api_key = api_key or "demo"  # Demo key
+        self.max_workers = max_workers
+        self.current_bucket = current_bucket
+        self.forecast_bucket = forecast_bucket
+        self.cache = ResponseCache(path=cache_path)
+        self.single_flight = SingleFlight()
+    
+    def _cached(self, endpoint: str, params: Dict[str, Any], bucket: float,
+                fetch: Callable[[], Dict]) -> Dict:
+        """
+        Respuesta de la franja de tiempo actual, o fetch() si aún no existe
+        
+        La clave incluye el número de franja y la entrada vence al final de
+        la franja, así todas las llamadas de una misma franja comparten la
+        respuesta. Las llamadas concurrentes con la misma clave esperan a
+        la primera; los errores no se guardan.
+        
+        Args:
+            endpoint: Endpoint de la API (weather, forecast)
+            params: Parámetros que identifican la petición (sin appid)
+            bucket: Segundos de la franja
+            fetch: Petición a ejecutar si no hay respuesta en caché
+        
+        Returns:
+            Respuesta de la API o {"error": ...}
+        """
+        now = time.time()
+        slot = int(now // bucket)
+        key = f"{endpoint}:{sorted(params.items())}:{slot}"
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        
+        def fetch_and_store():
+            data = fetch()
+            if 'error' not in data:
+                self.cache.set(key, f"{self.base_url}/{endpoint}", data,
+                               ttl=(slot + 1) * bucket - time.time())
+            return data
+        
+        return self.single_flight.do(key, fetch_and_store)
         
     def get_weather(self, city: str, units: str = 'metric') -> Dict:
         """
-        Obtener clima actual
+        Obtener clima actual (se reutiliza dentro de la misma franja de 10 minutos)
         
         Args:
             city: Nombre de la ciudad
@@ -35,6 +106,11 @@ class WeatherAPI:
         Returns:
             Datos del clima
         """
+        return self._cached('weather', {'q': city, 'units': units}, self.current_bucket,
+                            lambda: self._fetch_weather(city, units))
+    
+    def _fetch_weather(self, city: str, units: str) -> Dict:
+        """Descargar el clima actual (sin caché)"""
         try:
             url = f"{self.base_url}/weather"
             params = {
@@ -43,7 +119,7 @@ class WeatherAPI:
                 'units': units
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -55,7 +131,12 @@ class WeatherAPI:
             return {"error": str(e)}
     
     def get_forecast(self, city: str, days: int = 5) -> Dict:
-        """Obtener pronóstico"""
+        """Obtener pronóstico (se reutiliza dentro de la misma hora)"""
+        return self._cached('forecast', {'q': city, 'cnt': days * 8}, self.forecast_bucket,
+                            lambda: self._fetch_forecast(city, days))
+    
+    def _fetch_forecast(self, city: str, days: int) -> Dict:
+        """Descargar el pronóstico (sin caché)"""
         try:
             url = f"{self.base_url}/forecast"
             params = {
@@ -64,13 +145,59 @@ class WeatherAPI:
                 'cnt': days * 8  # 8 mediciones por día
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
             
         except Exception as e:
             return {"error": str(e)}
 
+    def get_weather_many(self, cities: Iterable[str], units: str = 'metric',
+                         max_workers: Optional[int] = None,
+                         key: str = 'region') -> pd.DataFrame:
+        """
+        Obtener el clima actual de varias ciudades en paralelo
+        
+        Las ciudades repetidas se consultan una vez. El resultado tiene una
+        fila por ciudad, así que se une al DataFrame de clientes con un solo
+        merge: df.merge(weather, on='region', how='left').
+        
+        Args:
+            cities: Ciudades o regiones (p. ej. df['region'].unique())
+            units: Unidades (metric/imperial)
+            max_workers: Peticiones simultáneas (default: max_workers de la instancia)
+            key: Nombre de la columna con la ciudad
+        
+        Returns:
+            DataFrame con la columna key y WEATHER_COLUMNS (error no nulo si
+            la ciudad falló)
+        """
+        unique = list(dict.fromkeys(city for city in cities if pd.notna(city)))
+        results = run_concurrent(lambda city: self.get_weather(city, units), unique,
+                                 int(max_workers or self.max_workers))
+        
+        weather = pd.DataFrame([self._weather_row(data) for data in results],
+                               columns=WEATHER_COLUMNS)
+        weather.insert(0, key, unique)
+        weather['observed_at'] = pd.to_datetime(weather['observed_at'], unit='s', utc=True)
+        
+        failed = int(weather['error'].notna().sum())
+        print(f"✅ Clima obtenido para {len(unique) - failed}/{len(unique)} ciudades")
+        return weather
+    
+    @staticmethod
+    def _weather_row(data: Dict) -> List[Any]:
+        """Aplanar una respuesta de /weather en los valores de WEATHER_COLUMNS"""
+        if 'error' in data:
+            return [None] * (len(WEATHER_COLUMNS) - 1) + [data['error']]
+        main = data.get('main', {})
+        conditions = (data.get('weather') or [{}])[0]
+        return [
+            main.get('temp'), main.get('feels_like'), main.get('humidity'), main.get('pressure'),
+            data.get('wind', {}).get('speed'), conditions.get('main'), conditions.get('description'),
+            data.get('dt'), None
+        ]
+
 
 if __name__ == "__main__":
     api = WeatherAPI()
@@ -0,0 +1,275 @@
+"""
+🗃️ Pipeline Cache Module
+========================
+
+Caché de resultados por etapa para ETLPipeline:
+- Clave de cada etapa = hash(clave de la etapa anterior + su configuración)
+- Huella del archivo de entrada por contenido (BLAKE2b)
+- DataFrames en Parquet y resultados en JSON bajo data/cache/pipeline/
+- Tamaño acotado con desalojo LRU
+
+Como cada clave incluye la de la etapa anterior, un cambio de
+configuración solo invalida esa etapa y las siguientes.
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import pandas as pd
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+
+# Cambiar al modificar el formato de las entradas o la lógica de las etapas
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = 'data/cache/pipeline'
+DEFAULT_MAX_ENTRIES = 32
+
+
+def file_fingerprint(filepath: str, block_size: int = 1 << 20) -> str:
+    """
+    Calcular la huella de contenido de un archivo
+
+    Args:
+        filepath: Ruta del archivo
+        block_size: Bytes leídos por iteración
+
+    Returns:
+        Digest hexadecimal BLAKE2b
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def output_fingerprint(path: str) -> Optional[str]:
+    """
+    Huella barata de un archivo o directorio de salida (tamaño y mtime)
+
+    Sirve para comprobar que una salida sigue siendo la que escribió la
+    ejecución cacheada y no la de otra ejecución con el mismo nombre.
+
+    Args:
+        path: Ruta del archivo o directorio (p. ej. un dataset Parquet)
+
+    Returns:
+        Digest hexadecimal, o None si la ruta no existe
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+    digest = hashlib.blake2b(digest_size=16)
+    for file in files:
+        stat = file.stat()
+        digest.update(f"{file.relative_to(path) if path.is_dir() else ''}:"
+                      f"{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+class PipelineCache:
+    """
+    Caché LRU de resultados por etapa del pipeline
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Inicializar la caché
+
+        Args:
+            cache_dir: Directorio de la caché
+            max_entries: Entradas máximas antes de desalojar (LRU)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.index_path = self.cache_dir / 'index.json'
+        self.index = self._read_index()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _read_index(self) -> Dict[str, Any]:
+        """Leer el índice de entradas (vacío si no existe o está dañado)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == CACHE_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'version': CACHE_VERSION, 'entries': {}, 'fingerprints': {}}
+
+    def _write_index(self) -> None:
+        """Guardar el índice de forma atómica"""
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        tmp_path.replace(self.index_path)
+
+    def fingerprint(self, filepath: str) -> str:
+        """
+        Huella de contenido de un archivo, memorizada por tamaño y mtime
+
+        Args:
+            filepath: Ruta del archivo
+
+        Returns:
+            Digest hexadecimal
+        """
+        path = Path(filepath).resolve()
+        stat = path.stat()
+        known = self.index['fingerprints'].get(str(path))
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['digest']
+
+        digest = file_fingerprint(str(path))
+        self.index['fingerprints'][str(path)] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest
+        }
+        self._write_index()
+        return digest
+
+    @staticmethod
+    def stage_key(parent: Optional[str], stage: str, settings: Dict[str, Any]) -> str:
+        """
+        Calcular la clave de una etapa
+
+        Args:
+            parent: Clave de la etapa anterior (None en la primera)
+            stage: Nombre de la etapa
+            settings: Configuración que afecta al resultado de la etapa
+
+        Returns:
+            Clave hexadecimal
+        """
+        payload = json.dumps(
+            {'version': CACHE_VERSION, 'parent': parent, 'stage': stage, 'settings': settings},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _hit(self, key: str) -> bool:
+        """Registrar un acceso y actualizar la posición LRU"""
+        entry = self.index['entries'].get(key)
+        if entry is None or not self._entry_dir(key).exists():
+            self.stats['misses'] += 1
+            return False
+        entry['last_access'] = time.time()
+        self.stats['hits'] += 1
+        self._write_index()
+        return True
+
+    def _store(self, key: str, stage: str) -> None:
+        """Registrar una entrada nueva y desalojar las menos usadas"""
+        entry_dir = self._entry_dir(key)
+        size = sum(f.stat().st_size for f in entry_dir.iterdir())
+        self.index['entries'][key] = {'stage': stage, 'last_access': time.time(), 'bytes': size}
+
+        entries = self.index['entries']
+        while len(entries) > self.max_entries:
+            oldest = min(entries, key=lambda k: entries[k]['last_access'])
+            shutil.rmtree(self._entry_dir(oldest), ignore_errors=True)
+            del entries[oldest]
+            self.stats['evictions'] += 1
+        self._write_index()
+
+    def get_frame(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Leer un DataFrame cacheado
+
+        Args:
+            key: Clave de la etapa
+
+        Returns:
+            (DataFrame, metadata) o None si no está en caché
+        """
+        if not self._hit(key):
+            return None
+        entry_dir = self._entry_dir(key)
+        df = pd.read_parquet(entry_dir / 'data.parquet')
+        with open(entry_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return df, meta
+
+    def put_frame(self, key: str, stage: str, df: pd.DataFrame,
+                  meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Guardar un DataFrame en caché
+
+        Args:
+            key: Clave de la etapa
+            stage: Nombre de la etapa
+            df: DataFrame resultado
+            meta: Metadata adicional (JSON)
+        """
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(entry_dir / 'data.parquet', index=False)
+        with open(entry_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta or {}, f, ensure_ascii=False, default=str)
+        self._store(key, stage)
+
+    def get_json(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Leer un resultado JSON cacheado
+
+        Args:
+            key: Clave de la etapa
+
+        Returns:
+            Resultado o None si no está en caché
+        """
+        if not self._hit(key):
+            return None
+        with open(self._entry_dir(key) / 'result.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put_json(self, key: str, stage: str, data: Dict[str, Any]) -> None:
+        """
+        Guardar un resultado JSON en caché
+
+        Args:
+            key: Clave de la etapa
+            stage: Nombre de la etapa
+            data: Resultado serializable
+        """
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        with open(entry_dir / 'result.json', 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        self._store(key, stage)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Eliminar una entrada
+
+        Args:
+            key: Clave de la etapa
+        """
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+        if self.index['entries'].pop(key, None) is not None:
+            self._write_index()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Estadísticas de la caché
+
+        Returns:
+            Aciertos, fallos, desalojos, entradas y bytes
+        """
+        entries = self.index['entries']
+        return {
+            **self.stats,
+            'entries': len(entries),
+            'bytes': sum(entry['bytes'] for entry in entries.values()),
+            'max_entries': self.max_entries,
+        }
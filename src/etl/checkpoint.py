@@ -0,0 +1,149 @@
+"""
+📌 Checkpoint Module
+====================
+
+Checkpoints por etapa para reanudar ejecuciones largas de ETLPipeline:
+- DataFrames en Arrow IPC/Feather sin compresión (lectura con memory map)
+- Resultados (validación, metadata) en JSON
+- Manifest con la firma de la ejecución: solo se reanuda si la fuente
+  y la configuración coinciden
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import pandas as pd
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+
+DEFAULT_CHECKPOINT_DIR = 'data/checkpoints'
+
+
+class CheckpointStore:
+    """
+    Checkpoints de las etapas completadas de una ejecución
+    """
+
+    def __init__(self, run_name: str, signature: str,
+                 checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR):
+        """
+        Inicializar el almacén de checkpoints
+
+        Args:
+            run_name: Nombre de la ejecución (base_filename del pipeline)
+            signature: Firma de fuente + configuración de la ejecución
+            checkpoint_dir: Directorio raíz de checkpoints
+        """
+        self.run_dir = Path(checkpoint_dir) / run_name
+        self.signature = signature
+        self.manifest_path = self.run_dir / 'manifest.json'
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        """Leer el manifest (vacío si no existe o es de otra ejecución)"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {'signature': self.signature, 'stages': {}}
+
+        if manifest.get('signature') != self.signature:
+            print(f"⚠️ Checkpoints de {self.run_dir.name} son de otra fuente/configuración: se ignoran")
+            return {'signature': self.signature, 'stages': {}}
+        return manifest
+
+    def _write_manifest(self) -> None:
+        """Guardar el manifest de forma atómica"""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False, default=str)
+        tmp_path.replace(self.manifest_path)
+
+    def completed_stages(self) -> list:
+        """Etapas con checkpoint, en orden de finalización"""
+        return list(self.manifest['stages'])
+
+    def save_frame(self, stage: str, df: pd.DataFrame,
+                   meta: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Guardar el DataFrame de una etapa completada
+
+        Args:
+            stage: Nombre de la etapa
+            df: DataFrame resultado
+            meta: Metadata adicional (JSON)
+
+        Returns:
+            Ruta del checkpoint
+        """
+        import pyarrow.feather as feather
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        path = self.run_dir / f'{stage}.arrow'
+        tmp_path = path.with_suffix('.tmp')
+        # Sin compresión para poder leerlo con memory map
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+        tmp_path.replace(path)
+
+        self.manifest['stages'][stage] = {
+            'path': str(path),
+            'rows': int(len(df)),
+            'meta': meta or {},
+            'completed_at': datetime.now().isoformat(),
+        }
+        self._write_manifest()
+        return str(path)
+
+    def load_frame(self, stage: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Cargar el DataFrame de una etapa
+
+        Args:
+            stage: Nombre de la etapa
+
+        Returns:
+            (DataFrame, metadata) o None si no hay checkpoint
+        """
+        import pyarrow.feather as feather
+
+        entry = self.manifest['stages'].get(stage)
+        if entry is None or 'path' not in entry or not Path(entry['path']).exists():
+            return None
+        table = feather.read_table(entry['path'], memory_map=True)
+        return table.to_pandas(), entry['meta']
+
+    def save_result(self, stage: str, data: Dict[str, Any]) -> None:
+        """
+        Guardar el resultado JSON de una etapa completada
+
+        Args:
+            stage: Nombre de la etapa
+            data: Resultado serializable
+        """
+        self.manifest['stages'][stage] = {
+            'result': data,
+            'completed_at': datetime.now().isoformat(),
+        }
+        self._write_manifest()
+
+    def load_result(self, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        Cargar el resultado JSON de una etapa
+
+        Args:
+            stage: Nombre de la etapa
+
+        Returns:
+            Resultado o None si no hay checkpoint
+        """
+        entry = self.manifest['stages'].get(stage)
+        return None if entry is None else entry.get('result')
+
+    def clear(self) -> None:
+        """Eliminar los checkpoints de la ejecución"""
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+        self.manifest = {'signature': self.signature, 'stages': {}}
@@ -15,10 +15,17 @@ Autor: Elizabeth Díaz Familia
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List
 import requests
 import json
 
+from . import schema as telecom_schema
+from .mock_data import MockDataGenerator, DEFAULT_SEED, DEFAULT_SHARD_SIZE, to_plain_types
+
+
+# Tamaño de bloque por defecto (etl.batch_size en config/settings.json)
+DEFAULT_BATCH_SIZE = 1000
+
 
 class DataExtractor:
     """
@@ -34,7 +41,51 @@ class DataExtractor:
         """
         self.config = config or {}
         self.data = None
+        self.batch_size = int(self.config.get('batch_size', DEFAULT_BATCH_SIZE))
+        self.stream_stats = {}
+        self.dataset_stats = {}
+        
+        # Esquema Telecom X aplicado al extraer (ver schema.py)
+        self.use_schema = self.config.get('schema', True)
+        self.float_dtype = self.config.get('float_dtype', 'float64')
+        self.flag_dtype = self.config.get('flag_dtype', 'category')
+        self.schema_report = None
+        
+    def _read_csv_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Agregar los tipos del esquema a los argumentos de pd.read_csv
+        
+        Args:
+            kwargs: Argumentos del usuario (sus dtype tienen prioridad)
+            
+        Returns:
+            Argumentos para pd.read_csv
+        """
+        if not self.use_schema:
+            return kwargs
+        user_dtypes = kwargs.get('dtype') or {}
+        if not isinstance(user_dtypes, dict):
+            return kwargs
+        return {**kwargs, 'dtype': {**telecom_schema.get_read_dtypes(), **user_dtypes}}
+    
+    def apply_schema(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplicar el esquema Telecom X (tipos compactos) al DataFrame
+        
+        Args:
+            df: DataFrame extraído (se modifica in-place)
+            
+        Returns:
+            DataFrame con tipos compactos
+        """
+        report = telecom_schema.apply_schema(df, self.float_dtype, self.flag_dtype)
+        self.schema_report = report
         
+        if report['columns_converted']:
+            print(f"   🗜️ Esquema aplicado: {len(report['columns_converted'])} columnas, "
+                  f"{report['bytes_saved'] / 1024**2:.2f} MB ahorrados")
+        return df
+    
     def extract_from_csv(self, filepath: str, **kwargs) -> pd.DataFrame:
         """
         Extraer datos desde archivo CSV
@@ -47,14 +98,97 @@ class DataExtractor:
             DataFrame con los datos extraídos
         """
         try:
-            df = pd.read_csv(filepath, **kwargs)
+            df = pd.read_csv(filepath, **self._read_csv_kwargs(kwargs))
             print(f"✅ Datos extraídos desde CSV: {len(df):,} registros")
+            if self.use_schema:
+                self.apply_schema(df)
             self.data = df
             return df
         except Exception as e:
             print(f"❌ Error al extraer CSV: {str(e)}")
             raise
     
+    def extract_from_csv_chunks(self, filepath: str, chunksize: Optional[int] = None,
+                                **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Extraer datos desde archivo CSV en bloques (modo streaming)
+        
+        A diferencia de extract_from_csv, el dataset completo nunca se guarda
+        en self.data: cada bloque se entrega y se libera, de modo que la
+        memoria máxima depende de chunksize y no del tamaño del archivo.
+        Los tipos del primer bloque se fijan para el resto, así todos los
+        bloques comparten el mismo esquema.
+        
+        Args:
+            filepath: Ruta al archivo CSV
+            chunksize: Registros por bloque (default: batch_size de la config)
+            **kwargs: Argumentos adicionales para pd.read_csv
+            
+        Yields:
+            DataFrame con cada bloque de datos
+        """
+        chunksize = int(chunksize) if chunksize is not None else self.batch_size
+        if chunksize <= 0:
+            raise ValueError(f"chunksize debe ser positivo: {chunksize}")
+        
+        self.data = None
+        self.stream_stats = {'filepath': str(filepath), 'chunksize': chunksize,
+                             'chunks': 0, 'rows': 0}
+        if self.use_schema:
+            self.stream_stats['bytes_saved'] = 0
+        dtypes = None
+        
+        try:
+            with pd.read_csv(filepath, chunksize=chunksize,
+                             **self._read_csv_kwargs(kwargs)) as reader:
+                for chunk in reader:
+                    if self.use_schema:
+                        self.apply_schema(chunk)
+                        self.stream_stats['bytes_saved'] += self.schema_report['bytes_saved']
+                    
+                    if dtypes is None:
+                        dtypes = chunk.dtypes
+                    else:
+                        chunk = self._align_chunk_dtypes(chunk, dtypes)
+                    
+                    self.stream_stats['chunks'] += 1
+                    self.stream_stats['rows'] += len(chunk)
+                    yield chunk
+        except Exception as e:
+            print(f"❌ Error al extraer CSV por bloques: {str(e)}")
+            raise
+        
+        print(f"✅ Datos extraídos desde CSV (streaming): "
+              f"{self.stream_stats['rows']:,} registros en "
+              f"{self.stream_stats['chunks']:,} bloques")
+    
+    @staticmethod
+    def _align_chunk_dtypes(chunk: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+        """
+        Convertir un bloque a los tipos del primer bloque leído
+        
+        Args:
+            chunk: Bloque a alinear
+            dtypes: Tipos de referencia por columna
+            
+        Returns:
+            Bloque con los tipos alineados (cuando la conversión es posible)
+        """
+        for col, dtype in dtypes.items():
+            if col in chunk.columns and chunk[col].dtype != dtype:
+                if isinstance(dtype, pd.CategoricalDtype) and \
+                        isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                    # Categorías nuevas en este bloque: se agregan sin perder valores
+                    extra = [c for c in chunk[col].cat.categories if c not in dtype.categories]
+                    chunk[col] = chunk[col].cat.set_categories(list(dtype.categories) + extra)
+                    continue
+                try:
+                    chunk[col] = chunk[col].astype(dtype)
+                except (ValueError, TypeError):
+                    # p.ej. int64 con nulos en este bloque: se conserva float64
+                    print(f"⚠️ {col}: tipo {chunk[col].dtype} en bloque, esperado {dtype}")
+        return chunk
+    
     def extract_from_excel(self, filepath: str, sheet_name: str = 0, **kwargs) -> pd.DataFrame:
         """
         Extraer datos desde archivo Excel
@@ -70,13 +204,71 @@ class DataExtractor:
         try:
             df = pd.read_excel(filepath, sheet_name=sheet_name, **kwargs)
             print(f"✅ Datos extraídos desde Excel: {len(df):,} registros")
+            if self.use_schema:
+                self.apply_schema(df)
             self.data = df
             return df
         except Exception as e:
             print(f"❌ Error al extraer Excel: {str(e)}")
             raise
     
-    def extract_from_api(self, url: str, params: Optional[Dict] = None, 
+    def extract_from_parquet_dataset(self, path: str,
+                                     columns: Optional[List[str]] = None,
+                                     filters: Optional[Any] = None) -> pd.DataFrame:
+        """
+        Extraer datos desde un dataset Parquet particionado (estilo Hive)
+
+        Los filtros sobre claves de partición descartan directorios sin
+        abrirlos y los filtros sobre otras columnas usan las estadísticas
+        min/max para saltar row groups; solo se leen las columnas pedidas.
+
+        Args:
+            path: Directorio del dataset (DataLoader.save_parquet_dataset)
+            columns: Columnas a leer (None = todas)
+            filters: Filtros en formato pyarrow/pandas, p. ej.
+                     [('Contract', '==', 'Month-to-month'), ('tenure', '>', 12)],
+                     o una lista de listas (OR de ANDs), o una expresión pyarrow
+
+        Returns:
+            DataFrame con los datos extraídos
+        """
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        try:
+            dataset = ds.dataset(
+                path, format='parquet',
+                partitioning=ds.HivePartitioning.discover(infer_dictionary=True)
+            )
+            expression = None
+            if filters is not None:
+                expression = filters if isinstance(filters, ds.Expression) else pq.filters_to_expression(filters)
+
+            fragments = list(dataset.get_fragments(filter=expression))
+            row_groups = sum(
+                len(fragment.split_by_row_group(expression, schema=dataset.schema))
+                for fragment in fragments
+            )
+            self.dataset_stats = {
+                'files_total': len(dataset.files),
+                'files_read': len(fragments),
+                'row_groups_read': row_groups,
+            }
+
+            table = dataset.to_table(columns=columns, filter=expression)
+            df = table.to_pandas()
+            print(f"✅ Datos extraídos desde dataset Parquet: {len(df):,} registros")
+            print(f"   📂 Archivos leídos: {len(fragments)}/{len(dataset.files)}, "
+                  f"row groups: {row_groups}")
+            if self.use_schema:
+                self.apply_schema(df)
+            self.data = df
+            return df
+        except Exception as e:
+            print(f"❌ Error al extraer dataset Parquet: {str(e)}")
+            raise
+
+    def extract_from_api(self, url: str, params: Optional[Dict] = None,
                          headers: Optional[Dict] = None) -> Dict:
         """
         Extraer datos desde API REST
@@ -99,68 +291,39 @@ class DataExtractor:
             print(f"❌ Error al extraer desde API: {str(e)}")
             raise
     
-    def generate_mock_data(self, n_records: int = 1000) -> pd.DataFrame:
+    def generate_mock_data(self, n_records: int = 1000, seed: Optional[int] = None,
+                           workers: Optional[int] = None) -> pd.DataFrame:
         """
         Generar datos mock para demostración
         
+        Los datos se generan por shards con streams aleatorios independientes
+        (ver mock_data.py): la misma semilla produce el mismo dataset sin
+        importar el número de procesos, y no se modifica el estado global
+        de np.random.
+        
         Args:
             n_records: Número de registros a generar
+            seed: Semilla (default: mock_seed de la config o 42)
+            workers: Procesos para generar shards (default: mock_workers o 1)
             
         Returns:
             DataFrame con datos mock
         """
-        np.random.seed(42)
-        
-        data = {
-            'CustomerID': [f'CUST{i:05d}' for i in range(1, n_records + 1)],
-            'Gender': np.random.choice(['Male', 'Female'], n_records),
-            'SeniorCitizen': np.random.choice([0, 1], n_records, p=[0.84, 0.16]),
-            'Partner': np.random.choice(['Yes', 'No'], n_records, p=[0.48, 0.52]),
-            'Dependents': np.random.choice(['Yes', 'No'], n_records, p=[0.30, 0.70]),
-            'tenure': np.random.randint(1, 73, n_records),
-            'PhoneService': np.random.choice(['Yes', 'No'], n_records, p=[0.90, 0.10]),
-            'MultipleLines': np.random.choice(['Yes', 'No', 'No phone service'], n_records),
-            'InternetService': np.random.choice(['DSL', 'Fiber optic', 'No'], n_records, p=[0.34, 0.44, 0.22]),
-            'OnlineSecurity': np.random.choice(['Yes', 'No', 'No internet service'], n_records),
-            'OnlineBackup': np.random.choice(['Yes', 'No', 'No internet service'], n_records),
-            'DeviceProtection': np.random.choice(['Yes', 'No', 'No internet service'], n_records),
-            'TechSupport': np.random.choice(['Yes', 'No', 'No internet service'], n_records),
-            'StreamingTV': np.random.choice(['Yes', 'No', 'No internet service'], n_records),
-            'StreamingMovies': np.random.choice(['Yes', 'No', 'No internet service'], n_records),
-            'Contract': np.random.choice(['Month-to-month', 'One year', 'Two year'], n_records, p=[0.55, 0.21, 0.24]),
-            'PaperlessBilling': np.random.choice(['Yes', 'No'], n_records, p=[0.59, 0.41]),
-            'PaymentMethod': np.random.choice(
-                ['Electronic check', 'Mailed check', 'Bank transfer (automatic)', 'Credit card (automatic)'],
-                n_records,
-                p=[0.34, 0.23, 0.22, 0.21]
-            ),
-            'MonthlyCharges': np.random.uniform(18.0, 120.0, n_records),
-        }
-        
-        df = pd.DataFrame(data)
-        
-        # TotalCharges basado en tenure y MonthlyCharges
-        df['TotalCharges'] = df['tenure'] * df['MonthlyCharges'] + np.random.uniform(-50, 50, n_records)
-        df['TotalCharges'] = df['TotalCharges'].clip(lower=0).round(2)
-        df['MonthlyCharges'] = df['MonthlyCharges'].round(2)
-        
-        # Generar Churn con lógica realista
-        churn_prob = 0.27  # probabilidad base
-        
-        # Factores que afectan churn
-        churn_factors = np.zeros(n_records)
-        churn_factors += (df['Contract'] == 'Month-to-month').astype(int) * 0.3
-        churn_factors += (df['tenure'] < 12).astype(int) * 0.2
-        churn_factors += (df['InternetService'] == 'Fiber optic').astype(int) * 0.1
-        churn_factors += (df['SeniorCitizen'] == 1).astype(int) * 0.1
-        churn_factors += (df['PaperlessBilling'] == 'Yes').astype(int) * 0.05
-        
-        df['Churn'] = np.random.random(n_records) < (churn_prob + churn_factors * 0.5)
-        df['Churn'] = df['Churn'].map({True: 'Yes', False: 'No'})
+        generator = MockDataGenerator(
+            seed=self.config.get('mock_seed', DEFAULT_SEED) if seed is None else seed,
+            shard_size=self.config.get('mock_shard_size', DEFAULT_SHARD_SIZE),
+            workers=self.config.get('mock_workers', 1) if workers is None else workers
+        )
+        df = generator.generate(n_records)
         
         print(f"✅ Datos mock generados: {len(df):,} registros")
         print(f"   📊 Tasa de Churn: {(df['Churn'] == 'Yes').mean():.2%}")
         
+        if self.use_schema:
+            # Ya trae los tipos del esquema; se aplica por las opciones float/flag
+            self.apply_schema(df)
+        else:
+            df = to_plain_types(df)
         self.data = df
         return df
     
@@ -191,9 +354,11 @@ class DataExtractor:
             Diccionario con información del dataset
         """
         if self.data is None:
+            if self.stream_stats:
+                return {'mode': 'streaming', **self.stream_stats}
             return {"error": "No hay datos cargados"}
         
-        return {
+        info = {
             'rows': len(self.data),
             'columns': len(self.data.columns),
             'column_names': list(self.data.columns),
@@ -201,6 +366,13 @@ class DataExtractor:
             'null_values': self.data.isnull().sum().sum(),
             'duplicates': self.data.duplicated().sum()
         }
+        
+        if self.schema_report is not None:
+            info['schema_memory_before'] = f"{self.schema_report['memory_before_bytes'] / 1024**2:.2f} MB"
+            info['schema_bytes_saved'] = self.schema_report['bytes_saved']
+            info['schema_dtypes'] = self.schema_report['columns_converted']
+        
+        return info
 
 
 if __name__ == "__main__":
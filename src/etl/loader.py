@@ -14,11 +14,176 @@ Autor: Elizabeth Díaz Familia
 
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 import json
+import shutil
+import time
 from datetime import datetime
 
 
+# Formatos de save_all_formats, en orden de reporte
+ALL_FORMATS = ['csv', 'excel', 'parquet', 'parquet_dataset', 'metadata']
+
+# Formatos generados si no se indica otra cosa
+DEFAULT_FORMATS = ['csv', 'excel', 'parquet', 'metadata']
+
+# Claves de partición por defecto del dataset Parquet (las que existan)
+DEFAULT_PARTITION_COLUMNS = ['Contract', 'InternetService', 'TenureGroup', 'ProcessingDate']
+
+# Filas por row group en el dataset Parquet
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+# Límite de filas por hoja de Excel (incluye la fila de encabezado)
+EXCEL_MAX_ROWS = 1_048_576
+
+# Desde este tamaño save_to_excel usa el writer en streaming
+EXCEL_STREAM_MIN_ROWS = 50_000
+
+# Filas convertidas por lote al escribir un DataFrame en streaming
+EXCEL_STREAM_CHUNKSIZE = 10_000
+
+
+class ExcelStreamWriter:
+    """
+    Writer de Excel en streaming con memoria constante
+    
+    Usa hojas write-only de openpyxl: cada fila se serializa a disco al
+    agregarla, en lugar de construir el libro entero en memoria. Al llegar
+    al límite de filas de Excel se abre una hoja nueva (Data, Data_2, ...)
+    con el mismo encabezado.
+    """
+    
+    def __init__(self, filepath: str, sheet_name: str = 'Data',
+                 max_rows: int = EXCEL_MAX_ROWS):
+        """
+        Inicializar el writer
+        
+        Args:
+            filepath: Ruta del archivo .xlsx
+            sheet_name: Nombre base de las hojas
+            max_rows: Filas por hoja, incluido el encabezado
+        """
+        from openpyxl import Workbook
+        
+        if max_rows < 2:
+            raise ValueError("max_rows debe permitir al menos una fila de datos")
+        
+        self.filepath = str(filepath)
+        self.sheet_name = sheet_name
+        self.max_rows = max_rows
+        self.workbook = Workbook(write_only=True)
+        self.sheets: List[str] = []
+        self.total_records = 0
+        self._header: Optional[List[str]] = None
+        self._sheet = None
+        self._sheet_rows = 0
+        self.closed = False
+    
+    def _new_sheet(self) -> None:
+        """Abrir una hoja nueva con el encabezado"""
+        name = self.sheet_name if not self.sheets else f'{self.sheet_name}_{len(self.sheets) + 1}'
+        self._sheet = self.workbook.create_sheet(name)
+        self._sheet.append(self._header)
+        self._sheet_rows = 1
+        self.sheets.append(name)
+    
+    @staticmethod
+    def _rows(chunk: pd.DataFrame) -> List[tuple]:
+        """Convertir un bloque a filas de valores Python (nulos → celdas vacías)"""
+        values = chunk.astype(object)
+        values = values.where(chunk.notna(), None)
+        return list(values.itertuples(index=False, name=None))
+    
+    def append(self, chunk: pd.DataFrame) -> None:
+        """
+        Agregar un bloque de filas
+        
+        Args:
+            chunk: DataFrame con las mismas columnas que el primer bloque
+        """
+        if self._header is None:
+            self._header = [str(col) for col in chunk.columns]
+        
+        rows = self._rows(chunk)
+        start = 0
+        while start < len(rows):
+            if self._sheet is None or self._sheet_rows == self.max_rows:
+                self._new_sheet()
+            stop = start + min(self.max_rows - self._sheet_rows, len(rows) - start)
+            for row in rows[start:stop]:
+                self._sheet.append(row)
+            self._sheet_rows += stop - start
+            start = stop
+        
+        self.total_records += len(rows)
+    
+    def close(self) -> Dict[str, Any]:
+        """
+        Guardar el libro
+        
+        Returns:
+            Diccionario con ruta, hojas y registros escritos
+        """
+        if self._sheet is None:
+            # Sin filas: una hoja con el encabezado (si lo hay)
+            self._header = self._header or []
+            self._new_sheet()
+        self.workbook.save(self.filepath)
+        self.closed = True
+        return {'path': self.filepath, 'sheets': self.sheets, 'total_records': self.total_records}
+    
+    def abort(self) -> None:
+        """Descartar el libro: soltar la referencia y borrar el archivo parcial"""
+        if self.closed:
+            return
+        self.closed = True
+        self.workbook = None
+        self._sheet = None
+        Path(self.filepath).unlink(missing_ok=True)
+
+
+def iter_frame_chunks(df: pd.DataFrame,
+                      chunksize: int = EXCEL_STREAM_CHUNKSIZE) -> Iterable[pd.DataFrame]:
+    """
+    Recorrer un DataFrame en bloques de filas
+    
+    Args:
+        df: DataFrame
+        chunksize: Filas por bloque
+        
+    Yields:
+        Bloques del DataFrame (el primero aunque esté vacío)
+    """
+    yield df.iloc[:chunksize]
+    for start in range(chunksize, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def write_excel_chunks(chunks: Iterable[pd.DataFrame], filepath: str,
+                       sheet_name: str = 'Data',
+                       max_rows: int = EXCEL_MAX_ROWS) -> Dict[str, Any]:
+    """
+    Escribir un flujo de bloques en un Excel con memoria constante
+    
+    Args:
+        chunks: Iterable de DataFrames con el mismo esquema
+        filepath: Ruta del archivo .xlsx
+        sheet_name: Nombre base de las hojas
+        max_rows: Filas por hoja, incluido el encabezado
+        
+    Returns:
+        Diccionario con ruta, hojas y registros escritos
+    """
+    writer = ExcelStreamWriter(filepath, sheet_name, max_rows)
+    try:
+        for chunk in chunks:
+            writer.append(chunk)
+        return writer.close()
+    finally:
+        writer.abort()
+
+
 class DataLoader:
     """
     Clase para cargar datos procesados
@@ -34,6 +199,9 @@ class DataLoader:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.loaded_files = []
+        self.deferred: Dict[str, Future] = {}
+        self.last_timings: Dict[str, float] = {}
+        self.last_deferred: List[str] = []
         
     def save_to_csv(self, df: pd.DataFrame, filename: str, **kwargs) -> str:
         """
@@ -56,25 +224,63 @@ class DataLoader:
         return str(filepath)
     
     def save_to_excel(self, df: pd.DataFrame, filename: str, 
-                      sheet_name: str = 'Data', **kwargs) -> str:
+                      sheet_name: str = 'Data', streaming: Optional[bool] = None,
+                      **kwargs) -> str:
         """
         Guardar DataFrame en Excel
         
+        En modo streaming las filas se escriben por bloques con hojas
+        write-only (memoria constante) y se reparten en varias hojas si
+        superan el límite de Excel.
+        
         Args:
             df: DataFrame a guardar
             filename: Nombre del archivo
             sheet_name: Nombre de la hoja
+            streaming: Usar el writer en streaming (default: automático
+                       desde EXCEL_STREAM_MIN_ROWS filas, sin kwargs)
             **kwargs: Argumentos adicionales para to_excel
             
         Returns:
             Ruta del archivo guardado
         """
+        if streaming is None:
+            streaming = not kwargs and len(df) >= EXCEL_STREAM_MIN_ROWS
+        if streaming and kwargs:
+            raise ValueError("El modo streaming no admite argumentos de to_excel")
+        
         filepath = self.output_dir / filename
-        df.to_excel(filepath, sheet_name=sheet_name, index=False, **kwargs)
+        if streaming:
+            result = write_excel_chunks(iter_frame_chunks(df), str(filepath), sheet_name)
+        else:
+            df.to_excel(filepath, sheet_name=sheet_name, index=False, **kwargs)
         
         self.loaded_files.append(str(filepath))
         print(f"✅ Excel guardado: {filepath}")
         print(f"   📊 Registros: {len(df):,}")
+        if streaming and len(result['sheets']) > 1:
+            print(f"   📑 Hojas: {len(result['sheets'])}")
+        return str(filepath)
+    
+    def save_excel_chunks(self, chunks: Iterable[pd.DataFrame], filename: str,
+                          sheet_name: str = 'Data') -> str:
+        """
+        Guardar un flujo de bloques en Excel con memoria constante
+        
+        Args:
+            chunks: Iterable de DataFrames con el mismo esquema
+            filename: Nombre del archivo
+            sheet_name: Nombre base de las hojas
+            
+        Returns:
+            Ruta del archivo guardado
+        """
+        filepath = self.output_dir / filename
+        result = write_excel_chunks(chunks, str(filepath), sheet_name)
+        
+        self.loaded_files.append(str(filepath))
+        print(f"✅ Excel guardado: {filepath}")
+        print(f"   📊 Registros: {result['total_records']:,} en {len(result['sheets'])} hoja(s)")
         return str(filepath)
     
     def save_to_parquet(self, df: pd.DataFrame, filename: str, **kwargs) -> str:
@@ -97,6 +303,95 @@ class DataLoader:
         print(f"   📊 Registros: {len(df):,}")
         return str(filepath)
     
+    def save_parquet_dataset(self, df: pd.DataFrame, dataset_name: str,
+                             partition_cols: Optional[List[str]] = None,
+                             processing_date: Optional[str] = None,
+                             row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                             sort_by: Optional[List[str]] = None) -> str:
+        """
+        Guardar DataFrame como dataset Parquet particionado (estilo Hive)
+        
+        Cada combinación de claves queda en su propio directorio
+        (Contract=.../InternetService=.../...), y cada archivo guarda
+        estadísticas min/max por row group, así los lectores con filtros
+        (DataExtractor.extract_from_parquet_dataset) saltan particiones y
+        row groups completos. Re-ejecutar el mismo día borra antes todas
+        las particiones ProcessingDate=<fecha> (también las combinaciones
+        que ya no aparecen) sin tocar las demás fechas; sin ProcessingDate
+        entre las claves solo se reemplazan las particiones que se escriben.
+        
+        Args:
+            df: DataFrame a guardar
+            dataset_name: Nombre del directorio del dataset
+            partition_cols: Claves de partición (default: Contract,
+                            InternetService, TenureGroup, ProcessingDate)
+            processing_date: Fecha de proceso YYYY-MM-DD (default: hoy)
+            row_group_size: Filas máximas por row group
+            sort_by: Columnas para ordenar antes de escribir (estadísticas
+                     de row group más selectivas)
+            
+        Returns:
+            Ruta del directorio del dataset
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        
+        if partition_cols is None:
+            partition_cols = [col for col in DEFAULT_PARTITION_COLUMNS
+                              if col in df.columns or col == 'ProcessingDate']
+        
+        if 'ProcessingDate' in partition_cols and 'ProcessingDate' not in df.columns:
+            df = df.assign(ProcessingDate=processing_date or datetime.now().strftime('%Y-%m-%d'))
+        missing = set(partition_cols) - set(df.columns)
+        if missing:
+            raise ValueError(f"Columnas de partición inexistentes: {sorted(missing)}")
+        
+        if sort_by:
+            df = df.sort_values(sort_by, kind='stable')
+        
+        dataset_path = self.output_dir / dataset_name
+        if 'ProcessingDate' in partition_cols and dataset_path.exists():
+            self._drop_date_partitions(dataset_path, df['ProcessingDate'].astype(str).unique())
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        file_format = ds.ParquetFileFormat()
+        
+        ds.write_dataset(
+            table,
+            dataset_path,
+            format=file_format,
+            partitioning=partition_cols,
+            partitioning_flavor='hive',
+            file_options=file_format.make_write_options(compression='snappy', write_statistics=True),
+            max_rows_per_group=row_group_size,
+            min_rows_per_group=row_group_size,
+            max_rows_per_file=max(row_group_size * 10, row_group_size),
+            basename_template='part-{i}.parquet',
+            existing_data_behavior='delete_matching'
+        )
+        
+        n_partitions = len({path.parent for path in dataset_path.rglob('*.parquet')})
+        self.loaded_files.append(str(dataset_path))
+        print(f"✅ Dataset Parquet guardado: {dataset_path}")
+        print(f"   📊 Registros: {len(df):,} en {n_partitions} particiones ({', '.join(partition_cols)})")
+        return str(dataset_path)
+    
+    @staticmethod
+    def _drop_date_partitions(dataset_path: Path, dates: Iterable[str]) -> None:
+        """
+        Borrar las particiones de unas fechas de proceso y los directorios vacíos
+        
+        Args:
+            dataset_path: Directorio del dataset
+            dates: Fechas de proceso (YYYY-MM-DD)
+        """
+        for date in dates:
+            for partition in list(dataset_path.rglob(f'ProcessingDate={date}')):
+                shutil.rmtree(partition, ignore_errors=True)
+        
+        for directory in sorted(dataset_path.rglob('*'), key=lambda p: len(p.parts), reverse=True):
+            if directory.is_dir() and not any(directory.iterdir()):
+                directory.rmdir()
+    
     def save_to_json(self, data: Dict, filename: str) -> str:
         """
         Guardar diccionario en JSON
@@ -147,32 +442,197 @@ class DataLoader:
         filepath = self.save_to_json(metadata, filename)
         return filepath
     
-    def save_all_formats(self, df: pd.DataFrame, base_filename: str) -> Dict[str, str]:
+    @staticmethod
+    def _timed(writer: Callable[[], str]) -> Tuple[str, float]:
+        """Ejecutar un writer y medir su duración en segundos"""
+        start = time.perf_counter()
+        path = writer()
+        return path, round(time.perf_counter() - start, 4)
+    
+    def save_all_formats(self, df: pd.DataFrame, base_filename: str,
+                         formats: Optional[List[str]] = None,
+                         skip: Optional[List[str]] = None,
+                         defer: Optional[List[str]] = None,
+                         max_workers: Optional[int] = None) -> Dict[str, str]:
         """
-        Guardar DataFrame en todos los formatos
+        Guardar DataFrame en todos los formatos de forma concurrente
+        
+        Cada formato se escribe en su propio hilo (CSV, Parquet y metadata
+        son de I/O o liberan el GIL); Excel usa el writer en streaming para
+        no construir el libro entero en memoria. Los formatos diferidos
+        siguen escribiéndose en segundo plano y se recogen con
+        wait_deferred(). Los segundos por formato quedan en last_timings y
+        los formatos pendientes en last_deferred.
         
         Args:
             df: DataFrame a guardar
             base_filename: Nombre base del archivo (sin extensión)
+            formats: Formatos a generar (default: csv, excel, parquet, metadata;
+                     también 'parquet_dataset')
+            skip: Formatos a omitir
+            defer: Formatos que no se esperan antes de retornar
+            max_workers: Hilos de escritura (default: uno por formato)
             
         Returns:
             Diccionario con rutas de archivos guardados
         """
+        formats = [fmt for fmt in (formats or DEFAULT_FORMATS) if fmt not in (skip or [])]
+        unknown = set(formats) - set(ALL_FORMATS)
+        if unknown:
+            raise ValueError(f"Formatos no soportados: {sorted(unknown)}")
+        defer = [fmt for fmt in (defer or []) if fmt in formats]
+        
         print("\n💾 Guardando en múltiples formatos...")
         print("=" * 60)
         
-        paths = {
-            'csv': self.save_to_csv(df, f'{base_filename}.csv'),
-            'excel': self.save_to_excel(df, f'{base_filename}.xlsx'),
-            'parquet': self.save_to_parquet(df, f'{base_filename}.parquet'),
-            'metadata': self.save_metadata(df, f'{base_filename}_metadata.json')
+        writers = {
+            'csv': lambda: self.save_to_csv(df, f'{base_filename}.csv'),
+            'excel': lambda: self.save_to_excel(df, f'{base_filename}.xlsx', streaming=True),
+            'parquet': lambda: self.save_to_parquet(df, f'{base_filename}.parquet'),
+            'parquet_dataset': lambda: self.save_parquet_dataset(df, f'{base_filename}_dataset'),
+            'metadata': lambda: self.save_metadata(df, f'{base_filename}_metadata.json'),
         }
         
+        executor = ThreadPoolExecutor(max_workers=max_workers or max(len(formats), 1))
+        futures = {fmt: executor.submit(self._timed, writers[fmt]) for fmt in formats}
+        self.deferred.update({fmt: futures[fmt] for fmt in defer})
+        pending = [futures[fmt] for fmt in formats if fmt not in defer]
+        
+        paths = {}
+        timings = {}
+        try:
+            for fmt in formats:
+                if fmt not in defer:
+                    paths[fmt], timings[fmt] = futures[fmt].result()
+        except BaseException:
+            # No dejar escritores corriendo en segundo plano tras el error
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            raise
+        finally:
+            executor.shutdown(wait=False)
+        
+        self.last_timings = timings
+        self.last_deferred = defer
+        
         print("=" * 60)
+        for fmt, seconds in timings.items():
+            print(f"   ⏱️ {fmt}: {seconds:.3f}s")
+        if defer:
+            print(f"⏳ Formatos diferidos: {', '.join(defer)}")
         print("✅ Datos guardados en todos los formatos")
         
         return paths
     
+    def wait_deferred(self, timeout: Optional[float] = None) -> Dict[str, str]:
+        """
+        Esperar los formatos diferidos por save_all_formats
+        
+        Los segundos por formato quedan en last_timings.
+        
+        Args:
+            timeout: Segundos máximos de espera por formato
+            
+        Returns:
+            Diccionario con rutas de los formatos diferidos
+        """
+        paths = {}
+        timings = {}
+        for fmt in list(self.deferred):
+            paths[fmt], timings[fmt] = self.deferred.pop(fmt).result(timeout=timeout)
+        self.last_timings = timings
+        return paths
+    
+    def save_chunks(self, chunks: Iterable[pd.DataFrame], base_filename: str,
+                    formats: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Guardar un flujo de bloques de forma incremental (modo streaming)
+        
+        Cada bloque se escribe y se libera antes de leer el siguiente, así
+        la memoria depende del tamaño del bloque y no del dataset completo.
+        Excel usa ExcelStreamWriter (hojas write-only).
+        
+        Args:
+            chunks: Iterable de DataFrames con el mismo esquema
+            base_filename: Nombre base del archivo (sin extensión)
+            formats: Formatos a generar ('csv', 'parquet', 'excel');
+                     default csv y parquet
+            
+        Returns:
+            Diccionario con rutas de archivos guardados
+        """
+        formats = list(formats or ['csv', 'parquet'])
+        unsupported = set(formats) - {'csv', 'parquet', 'excel'}
+        if unsupported:
+            raise ValueError(f"Formatos no soportados en streaming: {sorted(unsupported)}")
+        
+        print("\n💾 Guardando bloques en streaming...")
+        print("=" * 60)
+        
+        paths = {}
+        csv_file = None
+        parquet_writer = None
+        parquet_schema = None
+        excel_writer = None
+        metadata = {'total_records': 0, 'null_values': 0, 'chunks': 0}
+        
+        try:
+            if 'csv' in formats:
+                paths['csv'] = str(self.output_dir / f'{base_filename}.csv')
+                csv_file = open(paths['csv'], 'w', encoding='utf-8', newline='')
+            if 'excel' in formats:
+                paths['excel'] = str(self.output_dir / f'{base_filename}.xlsx')
+                excel_writer = ExcelStreamWriter(paths['excel'])
+            
+            for chunk in chunks:
+                if csv_file is not None:
+                    chunk.to_csv(csv_file, index=False, header=metadata['chunks'] == 0)
+                
+                if 'parquet' in formats:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    
+                    if parquet_writer is None:
+                        paths['parquet'] = str(self.output_dir / f'{base_filename}.parquet')
+                        parquet_schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                        parquet_writer = pq.ParquetWriter(paths['parquet'], parquet_schema)
+                    table = pa.Table.from_pandas(chunk, schema=parquet_schema, preserve_index=False)
+                    parquet_writer.write_table(table)
+                
+                if excel_writer is not None:
+                    excel_writer.append(chunk)
+                
+                if metadata['chunks'] == 0:
+                    metadata['columns'] = list(chunk.columns)
+                    metadata['dtypes'] = {col: str(dtype) for col, dtype in chunk.dtypes.items()}
+                metadata['chunks'] += 1
+                metadata['total_records'] += int(len(chunk))
+                metadata['null_values'] += int(chunk.isnull().sum().sum())
+            
+            if excel_writer is not None:
+                metadata['excel_sheets'] = excel_writer.close()['sheets']
+        finally:
+            if csv_file is not None:
+                csv_file.close()
+            if parquet_writer is not None:
+                parquet_writer.close()
+            if excel_writer is not None:
+                # Sin efecto si ya se guardó; si falló un bloque no deja .xlsx a medias
+                excel_writer.abort()
+        
+        for format_type, path in paths.items():
+            self.loaded_files.append(path)
+            print(f"✅ {format_type.upper()} guardado: {path}")
+        print(f"   📊 Registros: {metadata['total_records']:,} en {metadata['chunks']:,} bloques")
+        
+        metadata['processed_at'] = datetime.now().isoformat()
+        metadata['total_columns'] = len(metadata.get('columns', []))
+        paths['metadata'] = self.save_to_json(metadata, f'{base_filename}_metadata.json')
+        
+        print("=" * 60)
+        return paths
+    
     def get_loaded_files(self) -> list:
         """
         Obtener lista de archivos guardados
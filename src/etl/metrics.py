@@ -0,0 +1,287 @@
+"""
+📈 Metrics Module
+=================
+
+Métricas estructuradas por etapa del pipeline y por método del
+transformador:
+- Tiempo de pared y tiempo de CPU
+- Filas y bytes de entrada/salida
+- Delta del pico de RSS del proceso
+- Pico de bytes asignados (tracemalloc, opcional por su costo)
+
+Las métricas se exponen en ETLPipeline.get_execution_summary, se
+escriben en <base>_pipeline_log.json y pueden exportarse en formato de
+texto de Prometheus (textfile collector de node_exporter).
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import pandas as pd
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+
+# Métricas exportadas a Prometheus: campo del registro → (nombre, ayuda)
+PROMETHEUS_METRICS = {
+    'wall_seconds': ('etl_wall_seconds', 'Tiempo de pared por etapa/método'),
+    'cpu_seconds': ('etl_cpu_seconds', 'Tiempo de CPU del proceso por etapa/método'),
+    'rows_in': ('etl_rows_in', 'Filas de entrada'),
+    'rows_out': ('etl_rows_out', 'Filas de salida'),
+    'bytes_in': ('etl_bytes_in', 'Bytes de entrada (DataFrame)'),
+    'bytes_out': ('etl_bytes_out', 'Bytes de salida (DataFrame)'),
+    'peak_rss_delta_bytes': ('etl_peak_rss_delta_bytes', 'Crecimiento del pico de RSS'),
+    'traced_peak_bytes': ('etl_traced_peak_bytes', 'Pico de bytes asignados (tracemalloc)'),
+}
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Pico de RSS del proceso en bytes (None si no está disponible)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return int(peak if sys.platform == 'darwin' else peak * 1024)
+
+
+def frame_size(df: Any, deep: bool = False) -> Dict[str, Optional[int]]:
+    """
+    Filas y bytes de un DataFrame
+
+    Args:
+        df: DataFrame (u otro objeto, que no se mide)
+        deep: Medir el contenido de columnas object (más lento)
+
+    Returns:
+        Diccionario con 'rows' y 'bytes'
+    """
+    if not isinstance(df, pd.DataFrame):
+        return {'rows': None, 'bytes': None}
+    return {'rows': int(len(df)), 'bytes': int(df.memory_usage(index=True, deep=deep).sum())}
+
+
+class MetricRecord:
+    """
+    Métricas de una etapa o método en curso
+    """
+
+    def __init__(self, name: str, kind: str):
+        self.data: Dict[str, Any] = {'name': name, 'kind': kind}
+
+    def output(self, df: Any, deep: bool = False) -> None:
+        """
+        Registrar el DataFrame de salida
+
+        Args:
+            df: Resultado de la etapa
+            deep: Medir el contenido de columnas object
+        """
+        size = frame_size(df, deep)
+        self.data['rows_out'] = size['rows']
+        self.data['bytes_out'] = size['bytes']
+
+
+class _NullRecord(MetricRecord):
+    """Registro que no guarda nada (métricas desactivadas)"""
+
+    def __init__(self):
+        super().__init__('', '')
+
+    def output(self, df: Any, deep: bool = False) -> None:
+        pass
+
+
+NULL_RECORD = _NullRecord()
+
+
+class MetricsCollector:
+    """
+    Colector de métricas por etapa y por método
+    """
+
+    def __init__(self, trace_memory: bool = False, deep_bytes: bool = False):
+        """
+        Inicializar el colector
+
+        Args:
+            trace_memory: Medir el pico de bytes asignados con tracemalloc
+                          (ralentiza la ejecución de forma notable)
+            deep_bytes: Medir bytes de columnas object con deep=True
+        """
+        self.trace_memory = trace_memory
+        self.deep_bytes = deep_bytes
+        self.records: List[Dict[str, Any]] = []
+        self._traced_peaks: List[int] = []
+
+    @contextmanager
+    def measure(self, name: str, kind: str = 'stage', df_in: Any = None):
+        """
+        Medir un bloque de código
+
+        Args:
+            name: Nombre de la etapa o método
+            kind: 'stage' o 'method'
+            df_in: DataFrame de entrada (opcional)
+
+        Yields:
+            MetricRecord; llamar a output(df) con el resultado
+        """
+        record = MetricRecord(name, kind)
+        size = frame_size(df_in, self.deep_bytes)
+        record.data['rows_in'] = size['rows']
+        record.data['bytes_in'] = size['bytes']
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # El pico del bloque exterior se conserva antes de reiniciarlo
+            if self._traced_peaks:
+                self._traced_peaks[-1] = max(self._traced_peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._traced_peaks.append(current)
+            traced_start = current
+
+        rss_start = _peak_rss_bytes()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.data['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+            record.data['cpu_seconds'] = round(time.process_time() - cpu_start, 6)
+            rss_end = _peak_rss_bytes()
+            record.data['peak_rss_delta_bytes'] = (
+                None if rss_start is None else rss_end - rss_start
+            )
+
+            record.data['traced_peak_bytes'] = None
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], self._traced_peaks.pop())
+                record.data['traced_peak_bytes'] = int(peak - traced_start)
+                if self._traced_peaks:
+                    self._traced_peaks[-1] = max(self._traced_peaks[-1], peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            record.data.setdefault('rows_out', None)
+            record.data.setdefault('bytes_out', None)
+            self.records.append(record.data)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Totales por etapa/método (suma si se midió varias veces)
+
+        Returns:
+            Diccionario {'kind:name': métricas}
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        for record in self.records:
+            key = f"{record['kind']}:{record['name']}"
+            total = totals.setdefault(key, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            total['calls'] += 1
+            total['wall_seconds'] = round(total['wall_seconds'] + record['wall_seconds'], 6)
+            total['cpu_seconds'] = round(total['cpu_seconds'] + record['cpu_seconds'], 6)
+        return totals
+
+    def write_prometheus(self, filepath: str, labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Exportar la última medición de cada etapa/método en formato Prometheus
+
+        El archivo se escribe de forma atómica, como requiere el textfile
+        collector de node_exporter.
+
+        Args:
+            filepath: Ruta del archivo .prom
+            labels: Etiquetas adicionales (p. ej. {'pipeline': 'telecom_churn'})
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        latest: Dict[tuple, Dict[str, Any]] = {}
+        for record in self.records:
+            latest[(record['kind'], record['name'])] = record
+
+        def _labels(record: Dict[str, Any]) -> str:
+            values = {**(labels or {}), 'kind': record['kind'], 'name': record['name']}
+            escaped = {
+                k: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                for k, v in values.items()
+            }
+            return ','.join(f'{k}="{v}"' for k, v in sorted(escaped.items()))
+
+        lines = []
+        for field, (metric, help_text) in PROMETHEUS_METRICS.items():
+            samples = [(record, record.get(field)) for record in latest.values()
+                       if record.get(field) is not None]
+            if not samples:
+                continue
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for record, value in samples:
+                lines.append(f'{metric}{{{_labels(record)}}} {value}')
+
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+        return str(path)
+
+
+@contextmanager
+def measure_or_null(metrics: Optional[MetricsCollector], name: str,
+                    kind: str = 'method', df_in: Any = None):
+    """
+    Medir con el colector si existe; si no, no hacer nada
+
+    Args:
+        metrics: Colector o None
+        name: Nombre de la etapa o método
+        kind: 'stage' o 'method'
+        df_in: DataFrame de entrada
+
+    Yields:
+        MetricRecord (NULL_RECORD sin colector)
+    """
+    if metrics is None:
+        yield NULL_RECORD
+    else:
+        with metrics.measure(name, kind, df_in) as record:
+            yield record
+
+
+def measured_stage(name: str, kind: str = 'stage'):
+    """
+    Decorador para métodos de objetos con atributo `metrics`
+
+    El primer argumento posicional, si es un DataFrame, se mide como
+    entrada y el valor retornado como salida.
+
+    Args:
+        name: Nombre de la etapa
+        kind: 'stage' o 'method'
+
+    Returns:
+        Decorador
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            df_in = args[0] if args and isinstance(args[0], pd.DataFrame) else None
+            with measure_or_null(getattr(self, 'metrics', None), name, kind, df_in) as record:
+                result = method(self, *args, **kwargs)
+                record.output(result)
+            return result
+        return wrapper
+    return decorator
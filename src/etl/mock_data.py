@@ -0,0 +1,354 @@
+"""
+🎲 Mock Telecom X Data Module
+=============================
+
+Generador vectorizado de datos mock de Telecom X para pruebas de carga:
+- Un numpy.random.Generator independiente por shard (SeedSequence)
+- Shards de tamaño fijo: la misma semilla produce los mismos datos sin
+  importar cuántos procesos se usen
+- Columnas categóricas emitidas directamente como códigos (esquema Telecom X)
+- Escritura en streaming a un dataset Parquet particionado (estilo Hive)
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List
+from concurrent.futures import ProcessPoolExecutor
+
+from . import schema as telecom_schema
+
+
+# Semilla por defecto (la del generador original)
+DEFAULT_SEED = 42
+
+# Filas por shard; forma parte de la identidad de los datos junto con la semilla
+DEFAULT_SHARD_SIZE = 1_000_000
+
+# Filas por row group en el dataset Parquet generado
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+# Claves de partición por defecto del dataset generado
+DEFAULT_PARTITION_COLUMNS = ['Contract', 'InternetService']
+
+# Probabilidades por columna categórica, en el orden de categorías del esquema
+# (None = uniforme)
+CATEGORY_PROBABILITIES: Dict[str, Optional[List[float]]] = {
+    'Gender': None,
+    'Partner': [0.52, 0.48],
+    'Dependents': [0.70, 0.30],
+    'PhoneService': [0.10, 0.90],
+    'MultipleLines': None,
+    'InternetService': [0.34, 0.44, 0.22],
+    'OnlineSecurity': None,
+    'OnlineBackup': None,
+    'DeviceProtection': None,
+    'TechSupport': None,
+    'StreamingTV': None,
+    'StreamingMovies': None,
+    'Contract': [0.55, 0.21, 0.24],
+    'PaperlessBilling': [0.41, 0.59],
+    'PaymentMethod': [0.34, 0.23, 0.22, 0.21],
+}
+
+# Orden de columnas del dataset mock
+MOCK_COLUMNS: List[str] = [
+    'CustomerID', 'Gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure',
+    'PhoneService', 'MultipleLines', 'InternetService', 'OnlineSecurity',
+    'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+    'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod',
+    'MonthlyCharges', 'TotalCharges', 'Churn'
+]
+
+CHURN_BASE_PROBABILITY = 0.27
+
+
+def _categories(col: str) -> List[str]:
+    """Categorías declaradas en el esquema para una columna"""
+    if col in telecom_schema.CATEGORICAL_COLUMNS:
+        return telecom_schema.CATEGORICAL_COLUMNS[col]
+    return telecom_schema.YES_NO
+
+
+def _draw_codes(rng: np.random.Generator, probabilities: Optional[List[float]],
+                n_categories: int, n_rows: int) -> np.ndarray:
+    """
+    Sortear códigos de categoría con una búsqueda sobre la CDF
+
+    Args:
+        rng: Generador del shard
+        probabilities: Probabilidad de cada categoría (None = uniforme)
+        n_categories: Número de categorías
+        n_rows: Filas a generar
+
+    Returns:
+        Códigos int8
+    """
+    if probabilities is None:
+        return rng.integers(0, n_categories, n_rows, dtype=np.int8)
+    cdf = np.cumsum(probabilities)
+    codes = np.searchsorted(cdf / cdf[-1], rng.random(n_rows), side='right')
+    return np.minimum(codes, n_categories - 1).astype(np.int8)
+
+
+def _customer_ids(start: int, n_rows: int) -> np.ndarray:
+    """IDs CUST00001, CUST00002, ... sin bucle Python"""
+    numbers = np.arange(start + 1, start + n_rows + 1).astype('U')
+    return np.char.add('CUST', np.char.zfill(numbers, 5)).astype(object)
+
+
+def _generate_shard(task: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Generar un shard del dataset mock
+
+    Función de módulo para que ProcessPoolExecutor pueda serializarla.
+    El generador del shard se deriva solo de (semilla, índice del shard),
+    por eso el resultado no depende del proceso que lo ejecute.
+
+    Args:
+        task: 'seed', 'shard' (índice), 'start' (primera fila) y 'rows'
+
+    Returns:
+        DataFrame del shard con tipos del esquema Telecom X
+    """
+    n_rows = task['rows']
+    rng = np.random.default_rng(np.random.SeedSequence(task['seed'], spawn_key=(task['shard'],)))
+
+    codes = {}
+    for col, probabilities in CATEGORY_PROBABILITIES.items():
+        codes[col] = _draw_codes(rng, probabilities, len(_categories(col)), n_rows)
+
+    senior = (rng.random(n_rows) < 0.16).astype(np.int8)
+    tenure = rng.integers(1, 73, n_rows, dtype=np.int16)
+    monthly = rng.uniform(18.0, 120.0, n_rows)
+    total = np.clip(tenure * monthly + rng.uniform(-50, 50, n_rows), 0, None).round(2)
+
+    # Churn con la misma lógica que el generador original, sobre los códigos
+    factors = (
+        (codes['Contract'] == 0) * 0.3             # Month-to-month
+        + (tenure < 12) * 0.2
+        + (codes['InternetService'] == 1) * 0.1    # Fiber optic
+        + (senior == 1) * 0.1
+        + (codes['PaperlessBilling'] == 1) * 0.05  # Yes
+    )
+    codes['Churn'] = (rng.random(n_rows) < CHURN_BASE_PROBABILITY + factors * 0.5).astype(np.int8)
+
+    data = {
+        'CustomerID': _customer_ids(task['start'], n_rows),
+        'SeniorCitizen': senior,
+        'tenure': tenure,
+        'MonthlyCharges': monthly.round(2),
+        'TotalCharges': total,
+    }
+    for col, col_codes in codes.items():
+        data[col] = pd.Categorical.from_codes(col_codes, dtype=pd.CategoricalDtype(_categories(col)))
+
+    df = pd.DataFrame({col: data[col] for col in MOCK_COLUMNS})
+    df.index = pd.RangeIndex(task['start'], task['start'] + n_rows)
+    return df
+
+
+def _write_shard(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generar un shard y escribirlo en el dataset Parquet (en el worker)
+
+    Args:
+        task: Tarea de _generate_shard más 'path', 'partition_cols' y
+              'row_group_size'
+
+    Returns:
+        Índice del shard y filas escritas
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    df = _generate_shard(task)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    file_format = ds.ParquetFileFormat()
+    row_group_size = task['row_group_size']
+
+    ds.write_dataset(
+        table,
+        task['path'],
+        format=file_format,
+        partitioning=task['partition_cols'] or None,
+        partitioning_flavor='hive' if task['partition_cols'] else None,
+        file_options=file_format.make_write_options(compression='snappy', write_statistics=True),
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=row_group_size,
+        max_rows_per_file=max(row_group_size * 10, row_group_size),
+        basename_template=f"shard-{task['shard']:05d}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore'
+    )
+    return {'shard': task['shard'], 'rows': len(df)}
+
+
+def to_plain_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convertir un shard a tipos planos (object / int64), como un CSV leído sin esquema
+
+    Args:
+        df: DataFrame generado
+
+    Returns:
+        DataFrame con columnas object en lugar de category
+    """
+    converted = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            converted[col] = df[col].astype(object)
+        elif col in telecom_schema.INTEGER_COLUMNS:
+            converted[col] = df[col].astype('int64')
+    return df.assign(**converted)
+
+
+class MockDataGenerator:
+    """
+    Generador de datos mock de Telecom X por shards deterministas
+    """
+
+    def __init__(self, seed: int = DEFAULT_SEED, shard_size: int = DEFAULT_SHARD_SIZE,
+                 workers: int = 1):
+        """
+        Inicializar el generador
+
+        Args:
+            seed: Semilla base; cada shard usa un stream independiente derivado de ella
+            shard_size: Filas por shard (misma semilla y shard_size = mismos datos)
+            workers: Procesos usados para generar shards en paralelo
+        """
+        if shard_size <= 0:
+            raise ValueError(f"shard_size debe ser positivo: {shard_size}")
+        self.seed = int(seed)
+        self.shard_size = int(shard_size)
+        self.workers = max(int(workers), 1)
+
+    def _tasks(self, n_records: int) -> List[Dict[str, Any]]:
+        """Dividir n_records en shards de tamaño fijo"""
+        return [
+            {'seed': self.seed, 'shard': shard, 'start': start,
+             'rows': min(self.shard_size, n_records - start)}
+            for shard, start in enumerate(range(0, n_records, self.shard_size))
+        ]
+
+    def _map(self, function, tasks: List[Dict[str, Any]], workers: int) -> Iterator[Any]:
+        """
+        Ejecutar function sobre las tareas, en orden y con memoria acotada
+
+        Con varios procesos se mantienen como máximo 2 * workers shards en
+        vuelo, así la memoria no crece con el número total de shards.
+        """
+        if workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield function(task)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            pending = []
+            for task in tasks:
+                pending.append(executor.submit(function, task))
+                if len(pending) >= 2 * workers:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def iter_shards(self, n_records: int, workers: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Generar el dataset shard por shard (modo streaming)
+
+        Args:
+            n_records: Registros totales
+            workers: Procesos (default: los del generador)
+
+        Yields:
+            DataFrame de cada shard, en orden de filas
+        """
+        workers = self.workers if workers is None else max(int(workers), 1)
+        yield from self._map(_generate_shard, self._tasks(n_records), workers)
+
+    def generate(self, n_records: int, workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Generar el dataset completo en memoria
+
+        Args:
+            n_records: Registros a generar
+            workers: Procesos (default: los del generador)
+
+        Returns:
+            DataFrame con tipos del esquema Telecom X
+        """
+        if n_records <= 0:
+            return _generate_shard({'seed': self.seed, 'shard': 0, 'start': 0, 'rows': 0})
+        shards = list(self.iter_shards(n_records, workers))
+        if len(shards) == 1:
+            return shards[0]
+        return pd.concat(shards, ignore_index=True)
+
+    def write_parquet_dataset(self, n_records: int, path: str,
+                              partition_cols: Optional[List[str]] = None,
+                              workers: Optional[int] = None,
+                              row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> Dict[str, Any]:
+        """
+        Generar y escribir el dataset directamente como Parquet particionado
+
+        Cada worker genera su shard y lo escribe él mismo, de modo que los
+        datos nunca pasan por el proceso principal y la memoria depende de
+        shard_size y no de n_records. El resultado se lee con
+        DataExtractor.extract_from_parquet_dataset.
+
+        Args:
+            n_records: Registros totales
+            path: Directorio del dataset (los shards de una ejecución
+                  anterior se reemplazan)
+            partition_cols: Claves de partición (default: Contract, InternetService;
+                            [] = sin particionar)
+            workers: Procesos (default: los del generador)
+            row_group_size: Filas máximas por row group
+
+        Returns:
+            Resumen con ruta, registros, shards y archivos escritos
+        """
+        if partition_cols is None:
+            partition_cols = DEFAULT_PARTITION_COLUMNS
+        missing = set(partition_cols) - set(MOCK_COLUMNS)
+        if missing:
+            raise ValueError(f"Columnas de partición inexistentes: {sorted(missing)}")
+
+        dataset_path = Path(path)
+        for old_shard in dataset_path.rglob('shard-*.parquet'):
+            old_shard.unlink()
+
+        tasks = self._tasks(n_records)
+        for task in tasks:
+            task.update({'path': str(dataset_path), 'partition_cols': list(partition_cols),
+                         'row_group_size': int(row_group_size)})
+
+        workers = self.workers if workers is None else max(int(workers), 1)
+        rows = sum(result['rows'] for result in self._map(_write_shard, tasks, workers))
+
+        summary = {
+            'path': str(dataset_path),
+            'rows': rows,
+            'shards': len(tasks),
+            'files': len(list(dataset_path.rglob('shard-*.parquet'))),
+            'seed': self.seed,
+            'shard_size': self.shard_size,
+        }
+        print(f"✅ Dataset mock guardado: {dataset_path}")
+        print(f"   📊 Registros: {rows:,} en {len(tasks)} shards, {summary['files']} archivos")
+        return summary
+
+
+if __name__ == "__main__":
+    # Ejemplo de uso
+    generator = MockDataGenerator(seed=42, shard_size=250_000, workers=4)
+
+    # Dataset en memoria
+    df = generator.generate(1_000_000)
+    print(df.dtypes)
+    print(f"Tasa de Churn: {(df['Churn'] == 'Yes').mean():.2%}")
+
+    # Dataset particionado en disco (p. ej. 100M filas para capacidad)
+    generator.write_parquet_dataset(2_000_000, 'data/mock/telecom_mock')
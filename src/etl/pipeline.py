@@ -12,14 +12,64 @@ Autor: Elizabeth Díaz Familia
 """
 
 import pandas as pd
-from typing import Dict, Any, Optional
+import numpy as np
+from typing import Dict, Any, Optional, Iterator, List
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import io
 import json
+from pathlib import Path
 
-from .extractor import DataExtractor
+from .extractor import DataExtractor, DEFAULT_BATCH_SIZE
 from .transformer import DataTransformer
 from .loader import DataLoader
 from .validator import DataValidator
+from .validation_profile import ValidationProfile
+from .cache import PipelineCache, output_fingerprint, DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES
+from .checkpoint import CheckpointStore, DEFAULT_CHECKPOINT_DIR
+from .metrics import MetricsCollector, measured_stage
+
+
+def _process_partition(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transformar y validar (checks locales) una partición en un worker
+    
+    Función de módulo para que ProcessPoolExecutor pueda serializarla.
+    
+    Args:
+        task: 'data' (DataFrame) o 'filepath' (CSV a extraer), más la
+              configuración del extractor/transformador
+            
+    Returns:
+        Partición transformada, hashes de fila y resultados locales
+    """
+    with redirect_stdout(io.StringIO()):
+        df = task.get('data')
+        if df is None:
+            df = DataExtractor(task.get('extractor_config', {})).extract_from_csv(task['filepath'])
+        
+        transformer = DataTransformer(task.get('transformer_config', {}))
+        df_transformed = transformer.apply_all_transformations(df)
+        
+        # ProcessedAt varía entre particiones: se excluye del hash de fila
+        hashes = pd.util.hash_pandas_object(
+            df_transformed.drop(columns='ProcessedAt', errors='ignore'), index=False
+        ).to_numpy()
+        
+        result = {
+            'data': df_transformed,
+            'hashes': hashes,
+            'records_extracted': len(df),
+            'columns_original': len(df.columns),
+            'transformations_log': transformer.get_transformation_log(),
+        }
+        
+        if task.get('validate', True):
+            result['null_count'] = int(df_transformed.isnull().sum().sum())
+            result['business_rules'] = DataValidator.business_rule_counts(df_transformed)
+    
+    return result
 
 
 class ETLPipeline:
@@ -35,16 +85,36 @@ class ETLPipeline:
             config: Configuración del pipeline
         """
         self.config = config or {}
-        self.extractor = DataExtractor(config.get('extractor', {}))
-        self.transformer = DataTransformer(config.get('transformer', {}))
-        self.loader = DataLoader(config.get('output_dir', 'data/processed'))
+        self.extractor = DataExtractor(self.config.get('extractor', {}))
+        self.transformer = DataTransformer(self.config.get('transformer', {}))
+        self.loader = DataLoader(self.config.get('output_dir', 'data/processed'))
         self.validator = DataValidator()
         
+        # Sección 'etl' de config/settings.json
+        self.etl_settings = self.config.get('etl', {})
+        self.batch_size = int(self.etl_settings.get('batch_size', DEFAULT_BATCH_SIZE))
+        
+        # Métricas por etapa y por método del transformador
+        self.metrics = MetricsCollector(
+            trace_memory=self.etl_settings.get('trace_memory', False),
+            deep_bytes=self.etl_settings.get('metrics_deep_bytes', False)
+        )
+        self.transformer.metrics = self.metrics
+        
+        # Caché de resultados por etapa (etl.cache_enabled)
+        self.cache = None
+        if self.etl_settings.get('cache_enabled', False):
+            self.cache = PipelineCache(
+                self.config.get('cache_dir', DEFAULT_CACHE_DIR),
+                int(self.etl_settings.get('cache_max_entries', DEFAULT_MAX_ENTRIES))
+            )
+        
         self.execution_log = []
         self.start_time = None
         self.end_time = None
         
-    def log_step(self, step: str, status: str, details: str = ""):
+    def log_step(self, step: str, status: str, details: str = "",
+                 origin: str = 'computed'):
         """
         Registrar paso del pipeline
         
@@ -52,18 +122,22 @@ class ETLPipeline:
             step: Nombre del paso
             status: Estado (success/error/warning)
             details: Detalles adicionales
+            origin: Cómo se obtuvo el resultado ('computed', 'cache',
+                    'checkpoint' o 'skipped')
         """
         log_entry = {
             'timestamp': datetime.now().isoformat(),
             'step': step,
             'status': status,
-            'details': details
+            'details': details,
+            'origin': origin
         }
         self.execution_log.append(log_entry)
         
         icon = "✅" if status == "success" else "❌" if status == "error" else "⚠️"
         print(f"{icon} {step}: {details}")
     
+    @measured_stage('extract')
     def extract_data(self, source_type: str = 'mock', **kwargs) -> pd.DataFrame:
         """
         Paso 1: Extraer datos
@@ -106,6 +180,7 @@ class ETLPipeline:
             self.log_step("Extracción", "error", str(e))
             raise
     
+    @measured_stage('transform')
     def transform_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Paso 2: Transformar datos
@@ -123,6 +198,10 @@ class ETLPipeline:
         try:
             df_transformed = self.transformer.apply_all_transformations(df)
             
+            # Ajustar vocabularios/escalas una vez y reutilizarlos en los lotes siguientes
+            if self.transformer.config.get('fit_state') and self.transformer.fitted_state is None:
+                self.transformer.fit(df_transformed)
+            
             self.log_step(
                 "Transformación",
                 "success",
@@ -134,6 +213,7 @@ class ETLPipeline:
             self.log_step("Transformación", "error", str(e))
             raise
     
+    @measured_stage('validate')
     def validate_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Paso 3: Validar datos
@@ -166,10 +246,15 @@ class ETLPipeline:
             self.log_step("Validación", "error", str(e))
             raise
     
+    @measured_stage('load')
     def load_data(self, df: pd.DataFrame, base_filename: str = 'telecom_churn') -> Dict[str, str]:
         """
         Paso 4: Cargar datos
         
+        Los formatos se eligen con etl.output_formats, etl.skip_formats y
+        etl.deferred_formats; los tiempos por formato quedan en
+        loader.last_timings.
+        
         Args:
             df: DataFrame a cargar
             base_filename: Nombre base de archivos
@@ -182,28 +267,279 @@ class ETLPipeline:
         print("=" * 70)
         
         try:
-            paths = self.loader.save_all_formats(df, base_filename)
-            
-            self.log_step(
-                "Carga",
-                "success",
-                f"{len(paths)} archivos guardados"
+            paths = self.loader.save_all_formats(
+                df, base_filename,
+                formats=self.etl_settings.get('output_formats'),
+                skip=self.etl_settings.get('skip_formats'),
+                defer=self.etl_settings.get('deferred_formats')
             )
+            
+            if self.transformer.fitted_state is not None:
+                paths['fitted_state'] = self.transformer.save_fitted_state(
+                    str(self.loader.output_dir / f'{base_filename}_fitted_state.json')
+                )
+            
+            timings = ', '.join(f"{fmt} {seconds:.2f}s"
+                                for fmt, seconds in self.loader.last_timings.items())
+            details = f"{len(paths)} archivos guardados ({timings})"
+            if self.loader.last_deferred:
+                details += f", diferidos: {', '.join(self.loader.last_deferred)}"
+            self.log_step("Carga", "success", details)
             return paths
             
         except Exception as e:
             self.log_step("Carga", "error", str(e))
             raise
     
+    def _cache_keys(self, source_type: str, base_filename: str,
+                    extract_kwargs: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """
+        Calcular las claves de caché de cada etapa
+        
+        Args:
+            source_type: Tipo de fuente de datos
+            base_filename: Nombre base para archivos de salida
+            extract_kwargs: Argumentos para la extracción
+            
+        Returns:
+            Claves por etapa, o None si la caché está desactivada o la
+            fuente no es reproducible (API)
+        """
+        if self.cache is None:
+            return None
+        
+        if source_type == 'mock':
+            source = {'n_records': extract_kwargs.get('n_records', 1000)}
+        elif source_type in ('csv', 'excel'):
+            source = {
+                'fingerprint': self.cache.fingerprint(extract_kwargs['filepath']),
+                'sheet_name': extract_kwargs.get('sheet_name', 0),
+            }
+        else:
+            return None
+        
+        keys = {}
+        keys['extract'] = PipelineCache.stage_key(
+            None, 'extract',
+            {'source_type': source_type, **source, 'extractor': self.extractor.config}
+        )
+        keys['transform'] = PipelineCache.stage_key(
+            keys['extract'], 'transform', self.transformer.config
+        )
+        keys['validate'] = PipelineCache.stage_key(keys['transform'], 'validate', {})
+        keys['load'] = PipelineCache.stage_key(
+            keys['transform'], 'load',
+            {
+                'output_dir': str(self.loader.output_dir.resolve()),
+                'base_filename': base_filename,
+                'formats': [self.etl_settings.get(key) for key in
+                            ('output_formats', 'skip_formats', 'deferred_formats')],
+            }
+        )
+        return keys
+    
+    def _restore_cached_run(self, keys: Dict[str, str]):
+        """
+        Recuperar una ejecución completa si entrada y configuración no cambiaron
+        
+        Args:
+            keys: Claves de caché por etapa
+            
+        Returns:
+            (resumen, validación, rutas) o None si falta algo o algún
+            archivo de salida ya no existe o no es el que escribió esa
+            ejecución (huella de tamaño y mtime distinta)
+        """
+        entry = self.cache.get_json(keys['load'])
+        if entry is None:
+            return None
+        
+        output_paths = entry['output_files']
+        fingerprints = entry.get('fingerprints', {})
+        current = {key: output_fingerprint(path) for key, path in output_paths.items()}
+        if any(value is None or value != fingerprints.get(key) for key, value in current.items()):
+            self.cache.invalidate(keys['load'])
+            return None
+        
+        validation_results = self.cache.get_json(keys['validate'])
+        if validation_results is None:
+            return None
+        
+        for step in ("Extracción", "Transformación", "Validación", "Carga"):
+            self.log_step(step, "success", "restaurado desde caché", origin='cache')
+        return entry['summary'], validation_results, output_paths
+    
+    def _restore_frame(self, stage: str, keys: Optional[Dict[str, str]],
+                       checkpoints: Optional[CheckpointStore]):
+        """
+        Recuperar el DataFrame de una etapa desde la caché o un checkpoint
+        
+        Args:
+            stage: Nombre de la etapa ('extract' o 'transform')
+            keys: Claves de caché por etapa (None = sin caché)
+            checkpoints: Checkpoints a reanudar (None = sin reanudar)
+            
+        Returns:
+            (DataFrame, metadata, origen) o None
+        """
+        if keys:
+            cached = self.cache.get_frame(keys[stage])
+            if cached is not None:
+                return cached[0], cached[1], 'cache'
+        if checkpoints is not None:
+            restored = checkpoints.load_frame(stage)
+            if restored is not None:
+                return restored[0], restored[1], 'checkpoint'
+        return None
+    
+    def _run_stages(self, source_type: str, base_filename: str,
+                    extract_kwargs: Dict[str, Any],
+                    keys: Optional[Dict[str, str]],
+                    checkpoints: Optional[CheckpointStore] = None,
+                    resume: bool = False):
+        """
+        Ejecutar las etapas, reutilizando las que estén en caché o en checkpoint
+        
+        Solo se recalculan la primera etapa que no se pudo recuperar y las
+        siguientes. Cada etapa completada se guarda en la caché y, si hay
+        checkpoints, en disco.
+        
+        Args:
+            source_type: Tipo de fuente de datos
+            base_filename: Nombre base para archivos de salida
+            extract_kwargs: Argumentos para la extracción
+            keys: Claves de caché por etapa (None = sin caché)
+            checkpoints: Almacén de checkpoints (None = sin checkpoints)
+            resume: Recuperar etapas desde los checkpoints existentes
+            
+        Returns:
+            (resumen, validación, rutas)
+        """
+        names = {'cache': 'caché', 'checkpoint': 'checkpoint'}
+        resume_from = checkpoints if resume else None
+        restored = self._restore_frame('transform', keys, resume_from)
+        
+        if restored is not None:
+            df_transformed, meta, origin = restored
+            if meta.get('fitted_state') is not None:
+                self.transformer.fitted_state = meta['fitted_state']
+            self.log_step("Extracción", "success", "omitida (transformación recuperada)",
+                          origin='skipped')
+            self.log_step("Transformación", "success",
+                          f"restaurado desde {names[origin]}", origin=origin)
+        else:
+            # Paso 1: Extracción
+            restored_raw = self._restore_frame('extract', keys, resume_from)
+            if restored_raw is not None:
+                df_raw, _, origin = restored_raw
+                self.log_step("Extracción", "success",
+                              f"restaurado desde {names[origin]}", origin=origin)
+            else:
+                df_raw = self.extract_data(source_type, **extract_kwargs)
+                if keys:
+                    self.cache.put_frame(keys['extract'], 'extract', df_raw)
+                if checkpoints is not None:
+                    checkpoints.save_frame('extract', df_raw)
+            
+            # Paso 2: Transformación
+            df_transformed = self.transform_data(df_raw)
+            meta = {
+                'records_extracted': len(df_raw),
+                'columns_original': len(df_raw.columns),
+                'fitted_state': self.transformer.fitted_state,
+            }
+            if keys:
+                self.cache.put_frame(keys['transform'], 'transform', df_transformed, meta)
+            if checkpoints is not None:
+                checkpoints.save_frame('transform', df_transformed, meta)
+        
+        # Paso 3: Validación
+        validation_results = self.cache.get_json(keys['validate']) if keys else None
+        if validation_results is not None:
+            self.log_step("Validación", "success", "restaurado desde caché", origin='cache')
+        elif resume_from is not None and resume_from.load_result('validate') is not None:
+            validation_results = resume_from.load_result('validate')
+            self.log_step("Validación", "success", "restaurado desde checkpoint",
+                          origin='checkpoint')
+        else:
+            validation_results = self.validate_data(df_transformed)
+            if keys:
+                self.cache.put_json(keys['validate'], 'validate', validation_results)
+            if checkpoints is not None:
+                checkpoints.save_result('validate', validation_results)
+        
+        # Paso 4: Carga
+        output_paths = self.load_data(df_transformed, base_filename)
+        
+        summary = {
+            'records_extracted': meta['records_extracted'],
+            'records_loaded': len(df_transformed),
+            'columns_original': meta['columns_original'],
+            'columns_final': len(df_transformed.columns),
+        }
+        if keys and not self.loader.last_deferred:
+            self.cache.put_json(keys['load'], 'load', {
+                'summary': summary,
+                'output_files': output_paths,
+                'fingerprints': {key: output_fingerprint(path) for key, path in output_paths.items()},
+            })
+        return summary, validation_results, output_paths
+    
+    def _checkpoint_store(self, source_type: str, base_filename: str,
+                          extract_kwargs: Dict[str, Any]) -> CheckpointStore:
+        """
+        Crear el almacén de checkpoints de una ejecución
+        
+        La firma incluye fuente, tamaño/fecha del archivo de entrada y la
+        configuración del extractor y el transformador.
+        
+        Args:
+            source_type: Tipo de fuente de datos
+            base_filename: Nombre base para archivos de salida
+            extract_kwargs: Argumentos para la extracción
+            
+        Returns:
+            Almacén de checkpoints
+        """
+        source = dict(extract_kwargs)
+        filepath = extract_kwargs.get('filepath')
+        if filepath and Path(filepath).exists():
+            stat = Path(filepath).stat()
+            source['file'] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        
+        signature = PipelineCache.stage_key(None, 'run', {
+            'source_type': source_type,
+            'source': source,
+            'extractor': self.extractor.config,
+            'transformer': self.transformer.config,
+        })
+        return CheckpointStore(
+            base_filename, signature,
+            self.config.get('checkpoint_dir', DEFAULT_CHECKPOINT_DIR)
+        )
+    
     def run_full_pipeline(self, source_type: str = 'mock', 
                          base_filename: str = 'telecom_churn_processed',
+                         resume: bool = False,
                          **extract_kwargs) -> Dict[str, Any]:
         """
         Ejecutar pipeline completo
         
+        Con etl.cache_enabled, una entrada y configuración sin cambios
+        devuelven las salidas ya escritas, y un cambio de configuración solo
+        recalcula las etapas posteriores (ver cache.py).
+        
+        Con etl.checkpoint_enabled (o resume=True) cada etapa completada se
+        guarda en Arrow IPC bajo data/checkpoints/<base_filename>/; con
+        resume=True se recuperan las etapas ya completadas por una ejecución
+        anterior fallida. Los checkpoints se eliminan al terminar con éxito
+        salvo etl.keep_checkpoints. En execution_log, 'origin' indica si cada
+        etapa se recalculó o se restauró.
+        
         Args:
             source_type: Tipo de fuente de datos
             base_filename: Nombre base para archivos de salida
+            resume: Reanudar desde los checkpoints de una ejecución anterior
             **extract_kwargs: Argumentos para la extracción
             
         Returns:
@@ -218,17 +554,25 @@ class ETLPipeline:
         print("═" * 70)
         
         try:
-            # Paso 1: Extracción
-            df_raw = self.extract_data(source_type, **extract_kwargs)
-            
-            # Paso 2: Transformación
-            df_transformed = self.transform_data(df_raw)
+            keys = self._cache_keys(source_type, base_filename, extract_kwargs)
+            cached_run = self._restore_cached_run(keys) if keys else None
             
-            # Paso 3: Validación
-            validation_results = self.validate_data(df_transformed)
-            
-            # Paso 4: Carga
-            output_paths = self.load_data(df_transformed, base_filename)
+            if cached_run is not None:
+                summary, validation_results, output_paths = cached_run
+            else:
+                checkpoints = None
+                if resume or self.etl_settings.get('checkpoint_enabled', False):
+                    checkpoints = self._checkpoint_store(source_type, base_filename, extract_kwargs)
+                    if resume:
+                        completed = checkpoints.completed_stages()
+                        print(f"📌 Reanudando: etapas en checkpoint {completed or 'ninguna'}")
+                
+                summary, validation_results, output_paths = self._run_stages(
+                    source_type, base_filename, extract_kwargs, keys, checkpoints, resume
+                )
+                
+                if checkpoints is not None and not self.etl_settings.get('keep_checkpoints', False):
+                    checkpoints.clear()
             
             self.end_time = datetime.now()
             duration = (self.end_time - self.start_time).total_seconds()
@@ -239,16 +583,20 @@ class ETLPipeline:
                 'start_time': self.start_time.isoformat(),
                 'end_time': self.end_time.isoformat(),
                 'duration_seconds': duration,
-                'records_extracted': len(df_raw),
-                'records_loaded': len(df_transformed),
-                'columns_original': len(df_raw.columns),
-                'columns_final': len(df_transformed.columns),
+                **summary,
                 'validation_results': validation_results,
                 'output_files': output_paths,
                 'execution_log': self.execution_log
             }
+            if self.cache is not None:
+                results['cache'] = {
+                    'key': keys['load'] if keys else None,
+                    **self.cache.get_statistics()
+                }
             
             # Guardar log de ejecución
+            self._attach_metrics(results, base_filename)
+            
             log_path = self.loader.output_dir / f'{base_filename}_pipeline_log.json'
             with open(log_path, 'w', encoding='utf-8') as f:
                 json.dump(results, f, indent=4, ensure_ascii=False)
@@ -257,8 +605,8 @@ class ETLPipeline:
             print("🎉 PIPELINE COMPLETADO EXITOSAMENTE")
             print("═" * 70)
             print(f"⏱️ Duración: {duration:.2f} segundos")
-            print(f"📊 Registros procesados: {len(df_raw):,} → {len(df_transformed):,}")
-            print(f"📋 Columnas: {len(df_raw.columns)} → {len(df_transformed.columns)}")
+            print(f"📊 Registros procesados: {summary['records_extracted']:,} → {summary['records_loaded']:,}")
+            print(f"📋 Columnas: {summary['columns_original']} → {summary['columns_final']}")
             print(f"💾 Archivos generados: {len(output_paths)}")
             print("═" * 70)
             
@@ -286,6 +634,378 @@ class ETLPipeline:
             
             return error_results
     
+    def _stream_chunks(self, chunks: Iterator[pd.DataFrame],
+                       stats: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+        """
+        Transformar y validar bloques uno a uno
+        
+        Args:
+            chunks: Bloques extraídos
+            stats: Diccionario donde se acumulan conteos y el perfil de validación
+            
+        Yields:
+            Bloques transformados listos para cargar
+        """
+        for chunk in chunks:
+            stats['chunks'] += 1
+            stats['records_extracted'] += len(chunk)
+            if stats['columns_original'] is None:
+                stats['columns_original'] = len(chunk.columns)
+            
+            chunk_transformed = self.transformer.apply_all_transformations(chunk)
+            
+            if stats['profile'] is not None:
+                stats['profile'].update(chunk_transformed)
+            
+            stats['records_loaded'] += len(chunk_transformed)
+            stats['columns_final'] = len(chunk_transformed.columns)
+            yield chunk_transformed
+    
+    def run_streaming_pipeline(self, filepath: str,
+                               base_filename: str = 'telecom_churn_processed',
+                               chunksize: Optional[int] = None,
+                               formats: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Ejecutar pipeline completo por bloques sobre un archivo CSV
+        
+        Extracción, transformación, validación y carga se encadenan bloque a
+        bloque, así la memoria máxima depende de chunksize y no del tamaño
+        del archivo. Los duplicados se eliminan dentro de cada bloque; la
+        validación acumula un ValidationProfile combinable, así los
+        duplicados, IDs únicos y límites IQR se evalúan sobre todo el archivo.
+        
+        Args:
+            filepath: Ruta al archivo CSV
+            base_filename: Nombre base para archivos de salida
+            chunksize: Registros por bloque (default: etl.batch_size)
+            formats: Formatos de salida ('csv', 'parquet', 'excel')
+            
+        Returns:
+            Diccionario con resultados del pipeline
+        """
+        self.start_time = datetime.now()
+        chunksize = int(chunksize) if chunksize is not None else self.batch_size
+        
+        print("\n" + "═" * 70)
+        print("🚀 INICIANDO PIPELINE ETL EN STREAMING")
+        print("═" * 70)
+        print(f"⏰ Inicio: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"📦 Tamaño de bloque: {chunksize:,} registros")
+        print("═" * 70)
+        
+        stats = {
+            'chunks': 0,
+            'records_extracted': 0,
+            'records_loaded': 0,
+            'columns_original': None,
+            'columns_final': None,
+            'profile': ValidationProfile() if self.etl_settings.get('validation_enabled', True) else None,
+        }
+        
+        try:
+            chunks = self.extractor.extract_from_csv_chunks(filepath, chunksize)
+            
+            # Una medición para todo el flujo: por bloque y método serían
+            # miles de registros en el log
+            self.transformer.metrics = None
+            try:
+                with self.metrics.measure('stream', 'stage') as record:
+                    output_paths = self.loader.save_chunks(
+                        self._stream_chunks(chunks, stats), base_filename, formats
+                    )
+                    record.data['rows_in'] = stats['records_extracted']
+                    record.data['rows_out'] = stats['records_loaded']
+            finally:
+                self.transformer.metrics = self.metrics
+            
+            self.log_step("Extracción", "success",
+                          f"{stats['records_extracted']:,} registros en {stats['chunks']:,} bloques")
+            self.log_step("Transformación", "success",
+                          f"{stats['records_loaded']:,} registros, {stats['columns_final']} columnas")
+            
+            if stats['profile'] is not None:
+                validation_results = self.validator.run_profile_validation(stats['profile'])
+            else:
+                validation_results = {'errors': [], 'warnings': []}
+            if len(validation_results['errors']) == 0:
+                self.log_step("Validación", "success", "Todos los checks pasaron")
+            else:
+                self.log_step("Validación", "warning",
+                              f"{len(validation_results['errors'])} errores encontrados")
+            
+            self.log_step("Carga", "success", f"{len(output_paths)} archivos guardados")
+            
+            self.end_time = datetime.now()
+            duration = (self.end_time - self.start_time).total_seconds()
+            
+            results = {
+                'success': True,
+                'mode': 'streaming',
+                'chunksize': chunksize,
+                'chunks_processed': stats['chunks'],
+                'start_time': self.start_time.isoformat(),
+                'end_time': self.end_time.isoformat(),
+                'duration_seconds': duration,
+                'records_extracted': stats['records_extracted'],
+                'records_loaded': stats['records_loaded'],
+                'columns_original': stats['columns_original'],
+                'columns_final': stats['columns_final'],
+                'validation_results': validation_results,
+                'output_files': output_paths,
+                'execution_log': self.execution_log
+            }
+            
+            self._attach_metrics(results, base_filename)
+            
+            log_path = self.loader.output_dir / f'{base_filename}_pipeline_log.json'
+            with open(log_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=4, ensure_ascii=False)
+            
+            print("\n" + "═" * 70)
+            print("🎉 PIPELINE EN STREAMING COMPLETADO")
+            print("═" * 70)
+            print(f"⏱️ Duración: {duration:.2f} segundos")
+            print(f"📦 Bloques procesados: {stats['chunks']:,}")
+            print(f"📊 Registros procesados: {stats['records_extracted']:,} → {stats['records_loaded']:,}")
+            print("═" * 70)
+            
+            return results
+            
+        except Exception as e:
+            self.end_time = datetime.now()
+            duration = (self.end_time - self.start_time).total_seconds()
+            self.log_step("Pipeline streaming", "error", str(e))
+            
+            print("\n" + "═" * 70)
+            print("❌ PIPELINE FALLIDO")
+            print("═" * 70)
+            print(f"🚨 Error: {str(e)}")
+            print("═" * 70)
+            
+            return {
+                'success': False,
+                'mode': 'streaming',
+                'error': str(e),
+                'start_time': self.start_time.isoformat(),
+                'end_time': self.end_time.isoformat(),
+                'duration_seconds': duration,
+                'execution_log': self.execution_log
+            }
+    
+    @measured_stage('transform_validate')
+    def transform_validate_partitioned(self, tasks: List[Dict[str, Any]],
+                                       max_workers: Optional[int] = None):
+        """
+        Pasos 2 y 3 en paralelo: transformar y validar por particiones
+        
+        Las transformaciones y checks locales por fila se ejecutan en un
+        pool de procesos. Los pasos no locales se resuelven al combinar:
+        los duplicados entre particiones se eliminan por hash de fila
+        (conservando la primera aparición, como remove_duplicates) y los IDs
+        únicos y los límites IQR se calculan sobre el resultado combinado.
+        
+        Args:
+            tasks: Particiones (ver _process_partition)
+            max_workers: Procesos del pool (default: etl.max_workers)
+            
+        Returns:
+            (DataFrame transformado, resultados de validación, registros extraídos)
+        """
+        max_workers = int(max_workers or self.etl_settings.get('max_workers', 4))
+        validate = self.etl_settings.get('validation_enabled', True)
+        for task in tasks:
+            task.setdefault('transformer_config', self.transformer.config)
+            task.setdefault('extractor_config', self.extractor.config)
+            task['validate'] = validate
+        
+        print("\n" + "=" * 70)
+        print(f"🔧 PASOS 2-3: TRANSFORMACIÓN Y VALIDACIÓN EN {len(tasks)} PARTICIONES")
+        print("=" * 70)
+        
+        try:
+            if max_workers > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+                    partitions = list(executor.map(_process_partition, tasks))
+            else:
+                partitions = [_process_partition(task) for task in tasks]
+            
+            records_extracted = sum(part['records_extracted'] for part in partitions)
+            df_transformed = pd.concat([part.pop('data') for part in partitions])
+            
+            # Duplicados entre particiones (globales)
+            hashes = np.concatenate([part.pop('hashes') for part in partitions])
+            cross_duplicates = pd.Series(hashes).duplicated().to_numpy()
+            n_cross = int(cross_duplicates.sum())
+            if n_cross:
+                df_transformed = df_transformed.take(np.flatnonzero(~cross_duplicates))
+            
+            self.transformer.transformations_log.extend(partitions[0]['transformations_log'])
+            self.transformer.transformations_log.append(
+                f'Partitioned execution: {len(partitions)} partitions, '
+                f'{n_cross} cross-partition duplicates removed'
+            )
+            self.log_step(
+                "Transformación",
+                "success",
+                f"{len(df_transformed):,} registros, {len(df_transformed.columns)} columnas "
+                f"({len(partitions)} particiones, {max_workers} procesos)"
+            )
+        except Exception as e:
+            self.log_step("Transformación", "error", str(e))
+            raise
+        
+        if not validate:
+            return df_transformed, {'errors': [], 'warnings': []}, records_extracted
+        
+        try:
+            validation_results = self.validator.run_partitioned_validation(
+                df_transformed, partitions, duplicate_count=0
+            )
+            if len(validation_results['errors']) == 0:
+                self.log_step("Validación", "success", "Todos los checks pasaron")
+            else:
+                self.log_step(
+                    "Validación",
+                    "warning",
+                    f"{len(validation_results['errors'])} errores encontrados"
+                )
+        except Exception as e:
+            self.log_step("Validación", "error", str(e))
+            raise
+        
+        return df_transformed, validation_results, records_extracted
+    
+    def run_partitioned_pipeline(self, source_type: str = 'mock',
+                                 base_filename: str = 'telecom_churn_processed',
+                                 n_partitions: Optional[int] = None,
+                                 max_workers: Optional[int] = None,
+                                 **extract_kwargs) -> Dict[str, Any]:
+        """
+        Ejecutar pipeline completo con transformación particionada
+        
+        Si source_type es 'csv' y filepath es una lista, cada archivo es una
+        partición y se extrae dentro de su worker. En otro caso se extrae el
+        dataset completo y se divide en rangos de filas.
+        
+        Args:
+            source_type: Tipo de fuente de datos
+            base_filename: Nombre base para archivos de salida
+            n_partitions: Número de particiones por rango de filas
+                          (default: número de procesos)
+            max_workers: Procesos del pool (default: etl.max_workers)
+            **extract_kwargs: Argumentos para la extracción
+            
+        Returns:
+            Diccionario con resultados del pipeline
+        """
+        self.start_time = datetime.now()
+        max_workers = int(max_workers or self.etl_settings.get('max_workers', 4))
+        
+        print("\n" + "═" * 70)
+        print("🚀 INICIANDO PIPELINE ETL PARTICIONADO")
+        print("═" * 70)
+        print(f"⏰ Inicio: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🧵 Procesos: {max_workers}")
+        print("═" * 70)
+        
+        try:
+            filepaths = extract_kwargs.get('filepath')
+            if source_type == 'csv' and isinstance(filepaths, (list, tuple)):
+                tasks = [{'filepath': str(path)} for path in filepaths]
+                columns_original = None
+            else:
+                df_raw = self.extract_data(source_type, **extract_kwargs)
+                columns_original = len(df_raw.columns)
+                n_partitions = int(n_partitions or max_workers)
+                bounds = np.linspace(0, len(df_raw), n_partitions + 1).astype(int)
+                tasks = [{'data': df_raw.iloc[start:end]}
+                         for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+                del df_raw
+            
+            df_transformed, validation_results, records_extracted = \
+                self.transform_validate_partitioned(tasks, max_workers)
+            if columns_original is None:
+                self.log_step("Extracción", "success",
+                              f"{records_extracted:,} registros en {len(tasks)} archivos")
+            
+            output_paths = self.load_data(df_transformed, base_filename)
+            
+            self.end_time = datetime.now()
+            duration = (self.end_time - self.start_time).total_seconds()
+            
+            results = {
+                'success': True,
+                'mode': 'partitioned',
+                'partitions': len(tasks),
+                'max_workers': max_workers,
+                'start_time': self.start_time.isoformat(),
+                'end_time': self.end_time.isoformat(),
+                'duration_seconds': duration,
+                'records_extracted': records_extracted,
+                'records_loaded': len(df_transformed),
+                'columns_original': columns_original,
+                'columns_final': len(df_transformed.columns),
+                'validation_results': validation_results,
+                'output_files': output_paths,
+                'execution_log': self.execution_log
+            }
+            
+            self._attach_metrics(results, base_filename)
+            
+            log_path = self.loader.output_dir / f'{base_filename}_pipeline_log.json'
+            with open(log_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=4, ensure_ascii=False)
+            
+            print("\n" + "═" * 70)
+            print("🎉 PIPELINE PARTICIONADO COMPLETADO")
+            print("═" * 70)
+            print(f"⏱️ Duración: {duration:.2f} segundos")
+            print(f"🧩 Particiones: {len(tasks)}")
+            print(f"📊 Registros procesados: {records_extracted:,} → {len(df_transformed):,}")
+            print("═" * 70)
+            
+            return results
+            
+        except Exception as e:
+            self.end_time = datetime.now()
+            duration = (self.end_time - self.start_time).total_seconds()
+            
+            print("\n" + "═" * 70)
+            print("❌ PIPELINE FALLIDO")
+            print("═" * 70)
+            print(f"🚨 Error: {str(e)}")
+            print("═" * 70)
+            
+            return {
+                'success': False,
+                'mode': 'partitioned',
+                'error': str(e),
+                'start_time': self.start_time.isoformat(),
+                'end_time': self.end_time.isoformat(),
+                'duration_seconds': duration,
+                'execution_log': self.execution_log
+            }
+    
+    def _attach_metrics(self, results: Dict[str, Any], base_filename: str) -> None:
+        """
+        Agregar las métricas a los resultados y exportarlas a Prometheus
+        
+        Con etl.prometheus_textfile se escribe además un archivo de texto
+        para el textfile collector de node_exporter.
+        
+        Args:
+            results: Resultados del pipeline (se modifican in-place)
+            base_filename: Nombre base (etiqueta 'pipeline')
+        """
+        results['metrics'] = self.metrics.records
+        results['metrics_summary'] = self.metrics.summary()
+        
+        textfile = self.etl_settings.get('prometheus_textfile')
+        if textfile:
+            results['prometheus_textfile'] = self.metrics.write_prometheus(
+                textfile, labels={'pipeline': base_filename}
+            )
+    
     def get_execution_summary(self) -> Dict[str, Any]:
         """
         Obtener resumen de la ejecución
@@ -301,7 +1021,9 @@ class ETLPipeline:
             'successful_steps': sum(1 for log in self.execution_log if log['status'] == 'success'),
             'failed_steps': sum(1 for log in self.execution_log if log['status'] == 'error'),
             'warnings': sum(1 for log in self.execution_log if log['status'] == 'warning'),
-            'execution_log': self.execution_log
+            'execution_log': self.execution_log,
+            'metrics': self.metrics.records,
+            'metrics_summary': self.metrics.summary()
         }
         
         if self.start_time and self.end_time:
@@ -0,0 +1,182 @@
+"""
+📐 Telecom X Schema Module
+==========================
+
+Esquema declarado del dataset de churn de Telecom X:
+- Columnas categóricas de baja cardinalidad → category
+- SeniorCitizen y tenure → enteros compactos
+- Flags Yes/No → category (o bool opcional)
+- Cargos → float64 (o float32 opcional)
+
+Aplicar el esquema al extraer reduce la memoria de cada etapa posterior
+sin cambiar la semántica de los valores ('Yes', 'Month-to-month', ...).
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import sys
+import pandas as pd
+from typing import Dict, List, Any, Optional
+
+
+YES_NO = ['No', 'Yes']
+INTERNET_ADDON = ['No', 'Yes', 'No internet service']
+
+# Columnas categóricas con sus valores conocidos
+CATEGORICAL_COLUMNS: Dict[str, List[str]] = {
+    'Gender': ['Female', 'Male'],
+    'MultipleLines': ['No', 'Yes', 'No phone service'],
+    'InternetService': ['DSL', 'Fiber optic', 'No'],
+    'OnlineSecurity': INTERNET_ADDON,
+    'OnlineBackup': INTERNET_ADDON,
+    'DeviceProtection': INTERNET_ADDON,
+    'TechSupport': INTERNET_ADDON,
+    'StreamingTV': INTERNET_ADDON,
+    'StreamingMovies': INTERNET_ADDON,
+    'Contract': ['Month-to-month', 'One year', 'Two year'],
+    'PaymentMethod': [
+        'Electronic check', 'Mailed check',
+        'Bank transfer (automatic)', 'Credit card (automatic)'
+    ],
+}
+
+# Flags Yes/No
+FLAG_COLUMNS: List[str] = ['Partner', 'Dependents', 'PhoneService', 'PaperlessBilling', 'Churn']
+
+# Columnas enteras con su tipo compacto
+INTEGER_COLUMNS: Dict[str, str] = {
+    'SeniorCitizen': 'int8',
+    'tenure': 'int16',
+}
+
+# Columnas de cargos
+FLOAT_COLUMNS: List[str] = ['MonthlyCharges', 'TotalCharges']
+
+# Servicios contratados (usados por DataTransformer.calculate_total_services)
+SERVICE_COLUMNS: List[str] = [
+    'PhoneService', 'InternetService', 'OnlineSecurity',
+    'OnlineBackup', 'DeviceProtection', 'TechSupport',
+    'StreamingTV', 'StreamingMovies'
+]
+
+
+def get_read_dtypes(columns: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Obtener tipos para pd.read_csv(dtype=...)
+
+    Solo se declaran las columnas de texto, que pandas puede parsear
+    directamente a category sin materializar objetos Python. Los numéricos
+    se compactan después con apply_schema, porque pueden contener nulos.
+
+    Args:
+        columns: Columnas presentes en el archivo (None = todas las del esquema)
+
+    Returns:
+        Diccionario {columna: tipo}
+    """
+    text_columns = list(CATEGORICAL_COLUMNS) + FLAG_COLUMNS
+    if columns is not None:
+        text_columns = [col for col in text_columns if col in columns]
+    # Los flags bool se convierten en apply_schema: read_csv no entiende 'Yes'/'No'
+    return {col: 'category' for col in text_columns}
+
+
+def object_memory_equivalent(series: pd.Series) -> int:
+    """
+    Estimar la memoria (deep) que ocuparía la columna como objetos Python
+
+    Args:
+        series: Columna categórica
+
+    Returns:
+        Bytes equivalentes a la representación object
+    """
+    counts = series.value_counts(dropna=False)
+    size = sum(sys.getsizeof(value) * int(count) for value, count in counts.items())
+    return int(size + 8 * len(series))
+
+
+def _categorize(series: pd.Series, categories: List[str]) -> pd.Series:
+    """Convertir a category conservando valores fuera del esquema"""
+    observed = series.dropna().unique()
+    extra = sorted(str(value) for value in observed if value not in categories)
+    if extra:
+        print(f"⚠️ {series.name}: valores fuera del esquema {extra}")
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.set_categories(categories + extra)
+    return series.astype(pd.CategoricalDtype(categories + extra))
+
+
+def _to_bool(series: pd.Series) -> pd.Series:
+    """Convertir un flag Yes/No a bool (falla si hay nulos u otros valores)"""
+    mapped = series.astype(object).map({'Yes': True, 'No': False})
+    if mapped.isnull().any():
+        raise ValueError("valores distintos de 'Yes'/'No'")
+    return mapped.astype('bool')
+
+
+def apply_schema(df: pd.DataFrame,
+                 float_dtype: str = 'float64',
+                 flag_dtype: str = 'category') -> Dict[str, Any]:
+    """
+    Aplicar el esquema Telecom X sobre un DataFrame (in-place)
+
+    Las columnas que no existen en el DataFrame se ignoran, por lo que el
+    esquema también sirve para extracciones parciales.
+
+    Args:
+        df: DataFrame a convertir (se modifica in-place)
+        float_dtype: Tipo de los cargos ('float64' o 'float32')
+        flag_dtype: Tipo de los flags Yes/No ('category' o 'bool')
+
+    Returns:
+        Reporte con bytes antes/después y columnas convertidas
+    """
+    if flag_dtype not in ('category', 'bool'):
+        raise ValueError(f"flag_dtype no soportado: {flag_dtype}")
+    if float_dtype not in ('float64', 'float32'):
+        raise ValueError(f"float_dtype no soportado: {float_dtype}")
+
+    report = {'memory_before_bytes': 0, 'memory_after_bytes': 0, 'columns_converted': {}}
+
+    def _convert(col: str, converter) -> None:
+        before = df[col]
+        if isinstance(before.dtype, pd.CategoricalDtype):
+            # Leída ya como category por read_csv: se compara contra object
+            report['memory_before_bytes'] += object_memory_equivalent(before)
+        else:
+            report['memory_before_bytes'] += int(before.memory_usage(deep=True, index=False))
+
+        try:
+            df[col] = converter(before)
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Error aplicando esquema a {col}: {str(e)}")
+
+        report['memory_after_bytes'] += int(df[col].memory_usage(deep=True, index=False))
+        report['columns_converted'][col] = str(df[col].dtype)
+
+    for col, categories in CATEGORICAL_COLUMNS.items():
+        if col in df.columns:
+            _convert(col, lambda s, c=categories: _categorize(s, c))
+
+    for col in FLAG_COLUMNS:
+        if col in df.columns:
+            if flag_dtype == 'bool':
+                _convert(col, _to_bool)
+            else:
+                _convert(col, lambda s: _categorize(s, YES_NO))
+
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in df.columns:
+            def _to_int(s, dtype=dtype):
+                s = pd.to_numeric(s, errors='coerce')
+                # Con nulos no se puede usar un entero numpy
+                return s if s.isnull().any() else s.astype(dtype)
+            _convert(col, _to_int)
+
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            _convert(col, lambda s: pd.to_numeric(s, errors='coerce').astype(float_dtype))
+
+    report['bytes_saved'] = report['memory_before_bytes'] - report['memory_after_bytes']
+    return report
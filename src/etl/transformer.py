@@ -16,6 +16,18 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional, Any
 from datetime import datetime
+from pathlib import Path
+import json
+
+from .schema import SERVICE_COLUMNS, CATEGORICAL_COLUMNS, FLAG_COLUMNS
+from .metrics import measure_or_null
+
+
+# Bit asignado a cada servicio en la columna ServiceMask
+SERVICE_BITS = {col: 1 << i for i, col in enumerate(SERVICE_COLUMNS)}
+
+# Cantidad de bits encendidos para cada valor de un uint8
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
 
 
 class DataTransformer:
@@ -33,6 +45,15 @@ class DataTransformer:
         self.config = config or {}
         self.transformations_log = []
         
+        # MetricsCollector opcional (lo asigna ETLPipeline) para métricas por método
+        self.metrics = None
+        
+        # Estado ajustado (vocabularios y estadísticas) para fit/transform
+        self.fitted_state = None
+        state_path = self.config.get('fitted_state_path')
+        if state_path and Path(state_path).exists():
+            self.load_fitted_state(state_path)
+        
     def clean_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Limpiar nombres de columnas
@@ -133,6 +154,158 @@ class DataTransformer:
         self.transformations_log.append('Data types converted')
         return df_clean
     
+    @staticmethod
+    def _tenure_groups(tenure: pd.Series) -> pd.Series:
+        """Calcular TenureGroup a partir de la columna de tenure"""
+        return pd.cut(
+            tenure,
+            bins=[0, 12, 24, 48, 73],
+            labels=['0-12 months', '12-24 months', '24-48 months', '48+ months'],
+            include_lowest=True
+        )
+    
+    @staticmethod
+    def _charges_groups(charges: pd.Series) -> pd.Series:
+        """Calcular ChargesGroup a partir de los cargos mensuales"""
+        return pd.cut(
+            charges,
+            bins=[0, 35, 70, 120],
+            labels=['Low', 'Medium', 'High'],
+            include_lowest=True
+        )
+    
+    @staticmethod
+    def _is_yes(series: pd.Series) -> np.ndarray:
+        """
+        Evaluar una columna de servicio como arreglo booleano
+        
+        Las columnas category se comparan por código (sin comparar strings)
+        y las bool (flag_dtype='bool') se usan directamente.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if 'Yes' not in categories:
+                return np.zeros(len(series), dtype=bool)
+            return series.cat.codes.values == categories.get_loc('Yes')
+        if series.dtype == bool:
+            return series.values
+        return (series == 'Yes').values
+    
+    @classmethod
+    def service_mask(cls, df: pd.DataFrame) -> np.ndarray:
+        """
+        Obtener los servicios contratados como bitmask uint8 por cliente
+        
+        Si el DataFrame ya tiene la columna ServiceMask se reutiliza; si no,
+        cada columna de servicio se parsea una sola vez.
+        
+        Args:
+            df: DataFrame
+            
+        Returns:
+            Arreglo uint8 con un bit por servicio (ver SERVICE_BITS)
+        """
+        if 'ServiceMask' in df.columns:
+            return df['ServiceMask'].to_numpy(dtype=np.uint8)
+        return cls._build_service_mask(df)
+    
+    @classmethod
+    def _build_service_mask(cls, df: pd.DataFrame) -> np.ndarray:
+        """Construir el bitmask de servicios leyendo las columnas de servicio"""
+        mask = np.zeros(len(df), dtype=np.uint8)
+        for col, bit in SERVICE_BITS.items():
+            if col in df.columns:
+                mask |= cls._is_yes(df[col]).astype(np.uint8) * np.uint8(bit)
+        return mask
+    
+    @classmethod
+    def service_matrix(cls, df: pd.DataFrame) -> np.ndarray:
+        """
+        Obtener la matriz de servicios (clientes x servicios) en uint8
+        
+        Args:
+            df: DataFrame
+            
+        Returns:
+            Matriz uint8 de forma (n, len(SERVICE_COLUMNS)), columnas en el
+            orden de SERVICE_COLUMNS
+        """
+        mask = cls.service_mask(df)
+        matrix = np.unpackbits(mask[:, None], axis=1, bitorder='little')
+        return matrix[:, :len(SERVICE_COLUMNS)]
+    
+    @classmethod
+    def has_services(cls, df: pd.DataFrame, services: List[str],
+                     how: str = 'any') -> pd.Series:
+        """
+        Evaluar si cada cliente tiene alguno/todos los servicios indicados
+        
+        Args:
+            df: DataFrame
+            services: Servicios a evaluar (nombres de SERVICE_COLUMNS)
+            how: 'any' o 'all'
+            
+        Returns:
+            Serie booleana alineada con df
+        """
+        unknown = set(services) - set(SERVICE_BITS)
+        if unknown:
+            raise ValueError(f"Servicios desconocidos: {sorted(unknown)}")
+        
+        bits = np.uint8(sum(SERVICE_BITS[col] for col in services))
+        selected = cls.service_mask(df) & bits
+        result = selected == bits if how == 'all' else selected != 0
+        return pd.Series(result, index=df.index)
+    
+    @classmethod
+    def _total_services(cls, df: pd.DataFrame) -> pd.Series:
+        """Contar servicios contratados ('Yes') por cliente"""
+        total = _POPCOUNT[cls.service_mask(df)].astype(np.int64)
+        return pd.Series(total, index=df.index)
+    
+    def create_service_mask(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Crear columna ServiceMask con los servicios como bitmask
+        
+        Los cálculos posteriores de servicios (TotalServices, bundles,
+        has_services) reutilizan esta columna sin volver a leer strings.
+        
+        Args:
+            df: DataFrame
+            
+        Returns:
+            DataFrame con columna ServiceMask (uint8)
+        """
+        df_new = df.copy()
+        df_new['ServiceMask'] = self._build_service_mask(df_new)
+        
+        self.transformations_log.append('Service mask created')
+        print("✅ Bitmask de servicios creado")
+        return df_new
+    
+    def create_service_bundles(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Crear indicadores de paquetes de servicios
+        
+        Args:
+            df: DataFrame
+            
+        Returns:
+            DataFrame con columnas HasStreaming y HasProtectionBundle
+        """
+        df_new = df.copy()
+        df_new['HasStreaming'] = self.has_services(
+            df_new, ['StreamingTV', 'StreamingMovies'], how='any'
+        )
+        df_new['HasProtectionBundle'] = self.has_services(
+            df_new, ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport'],
+            how='all'
+        )
+        
+        self.transformations_log.append('Service bundles created')
+        print("✅ Paquetes de servicios creados")
+        return df_new
+    
     def create_tenure_groups(self, df: pd.DataFrame, 
                             tenure_col: str = 'tenure') -> pd.DataFrame:
         """
@@ -146,13 +319,7 @@ class DataTransformer:
             DataFrame con columna TenureGroup
         """
         df_new = df.copy()
-        
-        df_new['TenureGroup'] = pd.cut(
-            df_new[tenure_col],
-            bins=[0, 12, 24, 48, 73],
-            labels=['0-12 months', '12-24 months', '24-48 months', '48+ months'],
-            include_lowest=True
-        )
+        df_new['TenureGroup'] = self._tenure_groups(df_new[tenure_col])
         
         self.transformations_log.append('Tenure groups created')
         print("✅ Grupos de tenure creados")
@@ -171,13 +338,7 @@ class DataTransformer:
             DataFrame con columna ChargesGroup
         """
         df_new = df.copy()
-        
-        df_new['ChargesGroup'] = pd.cut(
-            df_new[charges_col],
-            bins=[0, 35, 70, 120],
-            labels=['Low', 'Medium', 'High'],
-            include_lowest=True
-        )
+        df_new['ChargesGroup'] = self._charges_groups(df_new[charges_col])
         
         self.transformations_log.append('Charges groups created')
         print("✅ Grupos de cargos creados")
@@ -187,6 +348,9 @@ class DataTransformer:
         """
         Calcular total de servicios por cliente
         
+        Se suma el bitmask de servicios (columna ServiceMask si existe) con
+        una tabla de popcount, en una sola operación vectorizada.
+        
         Args:
             df: DataFrame
             
@@ -194,17 +358,7 @@ class DataTransformer:
             DataFrame con columna TotalServices
         """
         df_new = df.copy()
-        
-        service_cols = [
-            'PhoneService', 'InternetService', 'OnlineSecurity',
-            'OnlineBackup', 'DeviceProtection', 'TechSupport',
-            'StreamingTV', 'StreamingMovies'
-        ]
-        
-        df_new['TotalServices'] = 0
-        for col in service_cols:
-            if col in df_new.columns:
-                df_new['TotalServices'] += (df_new[col] == 'Yes').astype(int)
+        df_new['TotalServices'] = self._total_services(df_new)
         
         self.transformations_log.append('Total services calculated')
         print("✅ Total de servicios calculado")
@@ -225,19 +379,134 @@ class DataTransformer:
             DataFrame con columna CLV_Estimate
         """
         df_new = df.copy()
-        
         df_new['CLV_Estimate'] = (df_new[total_charges_col] * multiplier).round(2)
         
         self.transformations_log.append('CLV calculated')
         print("✅ Customer Lifetime Value estimado")
         return df_new
     
+    def fit(self, df: pd.DataFrame,
+            categorical_columns: Optional[List[str]] = None,
+            numeric_columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Ajustar vocabularios categóricos y estadísticas numéricas
+        
+        El estado resultante se reutiliza en encode_categorical y
+        normalize_numeric, de modo que los lotes incrementales reciben
+        siempre los mismos códigos y escalas sin volver a ajustar.
+        
+        Args:
+            df: DataFrame de referencia
+            categorical_columns: Columnas a codificar (default: las del esquema)
+            numeric_columns: Columnas a normalizar (default: todas las numéricas)
+            
+        Returns:
+            Estado ajustado
+        """
+        if categorical_columns is None:
+            categorical_columns = [col for col in list(CATEGORICAL_COLUMNS) + FLAG_COLUMNS
+                                   if col in df.columns]
+        if numeric_columns is None:
+            numeric_columns = list(df.select_dtypes(include=[np.number]).columns)
+        
+        self.fitted_state = {
+            'fitted_at': datetime.now().isoformat(),
+            'categorical': {col: self._fit_vocabulary(df[col])
+                            for col in categorical_columns if col in df.columns},
+            'numeric': {col: self._fit_numeric_stats(df[col])
+                        for col in numeric_columns if col in df.columns},
+        }
+        
+        self.transformations_log.append(
+            f"Fitted state: {len(self.fitted_state['categorical'])} categorical, "
+            f"{len(self.fitted_state['numeric'])} numeric"
+        )
+        print(f"✅ Estado ajustado: {len(self.fitted_state['categorical'])} categóricas, "
+              f"{len(self.fitted_state['numeric'])} numéricas")
+        return self.fitted_state
+    
+    @staticmethod
+    def _fit_vocabulary(series: pd.Series) -> List[str]:
+        """Vocabulario ordenado (mismo orden de clases que LabelEncoder)"""
+        return sorted(series.astype(str).unique().tolist())
+    
+    @staticmethod
+    def _fit_numeric_stats(series: pd.Series) -> Dict[str, float]:
+        """Estadísticas para MinMax y Standard (std poblacional, como sklearn)"""
+        values = series.astype('float64')
+        return {
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+            'std': float(values.std(ddof=0)),
+        }
+    
+    def save_fitted_state(self, filepath: str) -> str:
+        """
+        Guardar el estado ajustado en JSON
+        
+        Args:
+            filepath: Ruta del archivo
+            
+        Returns:
+            Ruta del archivo guardado
+        """
+        if self.fitted_state is None:
+            raise ValueError("No hay estado ajustado: ejecutar fit() primero")
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.fitted_state, f, indent=4, ensure_ascii=False)
+        
+        print(f"✅ Estado ajustado guardado: {filepath}")
+        return str(filepath)
+    
+    def load_fitted_state(self, filepath: str) -> Dict[str, Any]:
+        """
+        Cargar un estado ajustado desde JSON
+        
+        Args:
+            filepath: Ruta del archivo
+            
+        Returns:
+            Estado ajustado
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            self.fitted_state = json.load(f)
+        
+        print(f"✅ Estado ajustado cargado: {filepath}")
+        return self.fitted_state
+    
+    def _vocabulary(self, series: pd.Series) -> List[str]:
+        """Vocabulario ajustado de la columna, o ajustado al vuelo"""
+        if self.fitted_state and series.name in self.fitted_state['categorical']:
+            return self.fitted_state['categorical'][series.name]
+        return self._fit_vocabulary(series)
+    
+    def _numeric_stats(self, series: pd.Series) -> Dict[str, float]:
+        """Estadísticas ajustadas de la columna, o ajustadas al vuelo"""
+        if self.fitted_state and series.name in self.fitted_state['numeric']:
+            return self.fitted_state['numeric'][series.name]
+        return self._fit_numeric_stats(series)
+    
+    def _as_vocabulary_categorical(self, series: pd.Series) -> pd.Categorical:
+        """Mapear la columna al vocabulario (valores desconocidos → NaN / código -1)"""
+        vocabulary = self._vocabulary(series)
+        categorical = pd.Categorical(series.astype(str), categories=vocabulary)
+        unseen = int((categorical.codes == -1).sum())
+        if unseen:
+            print(f"⚠️ {series.name}: {unseen} valores fuera del vocabulario ajustado")
+        return categorical
+    
     def encode_categorical(self, df: pd.DataFrame,
                           columns: List[str],
                           method: str = 'label') -> pd.DataFrame:
         """
         Codificar variables categóricas
         
+        Si hay un estado ajustado (fit / load_fitted_state) se usan sus
+        vocabularios; los valores no vistos reciben el código -1. Sin estado,
+        cada columna se ajusta al vuelo con el mismo orden que LabelEncoder.
+        
         Args:
             df: DataFrame
             columns: Columnas a codificar
@@ -249,16 +518,17 @@ class DataTransformer:
         df_encoded = df.copy()
         
         if method == 'label':
-            from sklearn.preprocessing import LabelEncoder
-            le = LabelEncoder()
-            
             for col in columns:
                 if col in df_encoded.columns:
-                    df_encoded[f'{col}_Encoded'] = le.fit_transform(df_encoded[col].astype(str))
+                    df_encoded[f'{col}_Encoded'] = self._as_vocabulary_categorical(df_encoded[col]).codes
                     print(f"✅ {col} codificado (Label Encoding)")
         
         elif method == 'onehot':
-            df_encoded = pd.get_dummies(df_encoded, columns=columns, prefix=columns)
+            present = [col for col in columns if col in df_encoded.columns]
+            for col in present:
+                # Con vocabulario fijo, las columnas dummy son estables entre lotes
+                df_encoded[col] = self._as_vocabulary_categorical(df_encoded[col])
+            df_encoded = pd.get_dummies(df_encoded, columns=present, prefix=present)
             print(f"✅ Variables codificadas (One-Hot Encoding)")
         
         self.transformations_log.append(f'Categorical encoding: {method}')
@@ -270,6 +540,10 @@ class DataTransformer:
         """
         Normalizar variables numéricas
         
+        Si hay un estado ajustado se usan sus min/max o mean/std; sin estado,
+        cada columna se ajusta al vuelo (mismo resultado que los scalers de
+        sklearn).
+        
         Args:
             df: DataFrame
             columns: Columnas a normalizar
@@ -281,21 +555,19 @@ class DataTransformer:
         df_norm = df.copy()
         
         if method == 'minmax':
-            from sklearn.preprocessing import MinMaxScaler
-            scaler = MinMaxScaler()
-            
             for col in columns:
                 if col in df_norm.columns:
-                    df_norm[f'{col}_Normalized'] = scaler.fit_transform(df_norm[[col]])
+                    stats = self._numeric_stats(df_norm[col])
+                    scale = (stats['max'] - stats['min']) or 1.0
+                    df_norm[f'{col}_Normalized'] = (df_norm[col].astype('float64') - stats['min']) / scale
                     print(f"✅ {col} normalizado (MinMax)")
         
         elif method == 'standard':
-            from sklearn.preprocessing import StandardScaler
-            scaler = StandardScaler()
-            
             for col in columns:
                 if col in df_norm.columns:
-                    df_norm[f'{col}_Scaled'] = scaler.fit_transform(df_norm[[col]])
+                    stats = self._numeric_stats(df_norm[col])
+                    scale = stats['std'] or 1.0
+                    df_norm[f'{col}_Scaled'] = (df_norm[col].astype('float64') - stats['mean']) / scale
                     print(f"✅ {col} escalado (Standard)")
         
         self.transformations_log.append(f'Numeric normalization: {method}')
@@ -317,49 +589,155 @@ class DataTransformer:
         print("✅ Timestamp agregado")
         return df_new
     
-    def apply_all_transformations(self, df: pd.DataFrame) -> pd.DataFrame:
+    def apply_all_transformations(self, df: pd.DataFrame,
+                                  fused: Optional[bool] = None) -> pd.DataFrame:
         """
         Aplicar todas las transformaciones en secuencia
         
         Args:
             df: DataFrame original
+            fused: Ejecutar la cadena fusionada (una sola copia de los datos).
+                   Por defecto se usa config['fused'] (True).
             
         Returns:
             DataFrame completamente transformado
         """
+        if fused is None:
+            fused = self.config.get('fused', True)
+        
         print("\n🔧 Iniciando transformaciones...")
         print("=" * 60)
         
+        if fused:
+            df_transformed = self._apply_fused(df)
+        else:
+            df_transformed = self._apply_sequential(df)
+        
+        print("=" * 60)
+        print(f"✅ Transformaciones completadas")
+        print(f"📊 Registros: {len(df)} → {len(df_transformed)}")
+        print(f"📋 Columnas: {len(df.columns)} → {len(df_transformed.columns)}")
+        
+        return df_transformed
+    
+    def _apply_sequential(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Encadenar los métodos públicos (cada uno copia el DataFrame)
+        
+        Args:
+            df: DataFrame original
+            
+        Returns:
+            DataFrame completamente transformado
+        """
         df_transformed = df.copy()
         
         # 1. Limpiar nombres de columnas
-        df_transformed = self.clean_column_names(df_transformed)
+        df_transformed = self._run_step(self.clean_column_names, df_transformed)
         
         # 2. Manejar valores faltantes
-        df_transformed = self.handle_missing_values(df_transformed, strategy='drop')
+        df_transformed = self._run_step(self.handle_missing_values, df_transformed, strategy='drop')
         
         # 3. Eliminar duplicados
-        df_transformed = self.remove_duplicates(df_transformed)
+        df_transformed = self._run_step(self.remove_duplicates, df_transformed)
         
         # 4. Crear variables derivadas
         if 'tenure' in df_transformed.columns:
-            df_transformed = self.create_tenure_groups(df_transformed)
+            df_transformed = self._run_step(self.create_tenure_groups, df_transformed)
         
         if 'MonthlyCharges' in df_transformed.columns:
-            df_transformed = self.create_charges_groups(df_transformed)
+            df_transformed = self._run_step(self.create_charges_groups, df_transformed)
         
-        df_transformed = self.calculate_total_services(df_transformed)
+        df_transformed = self._run_step(self.create_service_mask, df_transformed)
+        df_transformed = self._run_step(self.calculate_total_services, df_transformed)
         
         if 'TotalCharges' in df_transformed.columns:
-            df_transformed = self.calculate_clv(df_transformed)
+            df_transformed = self._run_step(self.calculate_clv, df_transformed)
         
         # 5. Agregar timestamp
-        df_transformed = self.add_timestamp(df_transformed)
+        df_transformed = self._run_step(self.add_timestamp, df_transformed)
         
-        print("=" * 60)
-        print(f"✅ Transformaciones completadas")
-        print(f"📊 Registros: {len(df)} → {len(df_transformed)}")
-        print(f"📋 Columnas: {len(df.columns)} → {len(df_transformed.columns)}")
+        return df_transformed
+    
+    def _run_step(self, method, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+        """
+        Ejecutar un método de transformación registrando sus métricas
+        
+        Args:
+            method: Método público del transformador
+            df: DataFrame de entrada
+            **kwargs: Argumentos del método
+            
+        Returns:
+            DataFrame resultado
+        """
+        with measure_or_null(self.metrics, method.__name__, 'method', df) as record:
+            result = method(df, **kwargs)
+            record.output(result)
+        return result
+    
+    def _apply_fused(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ejecutar la cadena planificada con una sola copia de los datos
+        
+        Las filas a conservar (sin nulos y sin duplicados) se calculan con
+        una máscara sobre el DataFrame original y se materializan una sola
+        vez; las columnas derivadas se agregan in-place sobre esa copia.
+        El resultado es idéntico al de _apply_sequential.
+        
+        Args:
+            df: DataFrame original (no se modifica)
+            
+        Returns:
+            DataFrame completamente transformado
+        """
+        columns = df.columns.str.strip().str.replace(' ', '_')
+        
+        # Plan de filas: dropna + drop_duplicates en una sola máscara.
+        # Un duplicado de una fila sin nulos tampoco tiene nulos, así que
+        # duplicated() sobre el original equivale a hacerlo tras dropna.
+        with measure_or_null(self.metrics, 'fused_row_plan', 'method', df):
+            null_mask = df.isnull()
+            missing_before = int(null_mask.values.sum())
+            keep = ~null_mask.any(axis=1)
+            del null_mask
+            duplicated = df.duplicated() & keep
+            duplicates_before = int(duplicated.sum())
+            keep &= ~duplicated
+        
+        # Única copia materializada
+        with measure_or_null(self.metrics, 'fused_materialize', 'method', df) as record:
+            df_transformed = df.take(np.flatnonzero(keep.values))
+            df_transformed.columns = columns
+            record.output(df_transformed)
+        
+        self.transformations_log.append('Column names cleaned')
+        self.transformations_log.append(f'Missing values handled: {missing_before} → 0')
+        self.transformations_log.append(f'Duplicates removed: {duplicates_before}')
+        print(f"✅ Valores faltantes manejados: {missing_before} → 0")
+        print(f"✅ Duplicados eliminados: {duplicates_before}")
+        
+        with measure_or_null(self.metrics, 'fused_derived_columns', 'method', df_transformed) as record:
+            if 'tenure' in df_transformed.columns:
+                df_transformed['TenureGroup'] = self._tenure_groups(df_transformed['tenure'])
+                self.transformations_log.append('Tenure groups created')
+            
+            if 'MonthlyCharges' in df_transformed.columns:
+                df_transformed['ChargesGroup'] = self._charges_groups(df_transformed['MonthlyCharges'])
+                self.transformations_log.append('Charges groups created')
+            
+            df_transformed['ServiceMask'] = self._build_service_mask(df_transformed)
+            self.transformations_log.append('Service mask created')
+            df_transformed['TotalServices'] = self._total_services(df_transformed)
+            self.transformations_log.append('Total services calculated')
+            
+            if 'TotalCharges' in df_transformed.columns:
+                df_transformed['CLV_Estimate'] = (df_transformed['TotalCharges'] * 1.2).round(2)
+                self.transformations_log.append('CLV calculated')
+            
+            df_transformed['ProcessedAt'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            record.output(df_transformed)
+        print("✅ Variables derivadas y timestamp agregados (ejecución fusionada)")
         
         return df_transformed
     
@@ -0,0 +1,397 @@
+"""
+🧮 Validation Profile Module
+============================
+
+Perfil de validación combinable para datos por bloques o particiones:
+- Contadores aditivos (registros, nulos, reglas de negocio, min/max)
+- Conjunto compacto de hashes para IDs únicos y filas duplicadas
+- Sketch de cuantiles para los límites IQR y el conteo de outliers
+
+Cada bloque o worker actualiza su propio ValidationProfile; los perfiles se
+combinan con merge() y DataValidator.run_profile_validation produce el mismo
+diccionario de resultados que run_full_validation.
+
+Cotas de error:
+- Nulos, registros, reglas de negocio, min/max: exactos.
+- IDs únicos y duplicados: exactos salvo colisiones de hash de 64 bits
+  (probabilidad ~ n² / 2^65, < 1e-4 para 40M de filas). Memoria: 8 bytes
+  por valor distinto.
+- Cuartiles y outliers: exactos mientras una columna tenga como máximo
+  sketch_size valores; por encima, el error de rango es como mucho
+  ε·n con ε ≈ log2(n / sketch_size) / sketch_size (≈0.7% para 40M de filas
+  con sketch_size=2048), y el conteo de outliers puede desviarse en 2·ε·n.
+
+Autor: Elizabeth Díaz Familia
+"""
+
+import copy
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Optional, Iterable
+
+from .validator import DataValidator
+
+
+class QuantileSketch:
+    """
+    Sketch de cuantiles combinable (compactación por niveles, estilo KLL)
+
+    El nivel h guarda elementos con peso 2^h. Cuando un nivel supera
+    `size` elementos se ordena y se conserva uno de cada dos, que sube al
+    nivel siguiente con el doble de peso.
+    """
+
+    def __init__(self, size: int = 2048, seed: int = 0):
+        """
+        Inicializar el sketch
+
+        Args:
+            size: Capacidad por nivel (mayor = más preciso)
+            seed: Semilla del desplazamiento aleatorio de compactación
+        """
+        self.size = size
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self) -> bool:
+        """True si no se ha compactado ningún nivel (se conservan todos los valores)"""
+        return len(self.levels) == 1
+
+    def update(self, values: Iterable[float]) -> None:
+        """
+        Agregar valores al sketch (los nulos se ignoran)
+
+        Args:
+            values: Valores numéricos
+        """
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def copy(self) -> 'QuantileSketch':
+        """Copia independiente del sketch (niveles y generador aleatorio)"""
+        return copy.deepcopy(self)
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Combinar otro sketch en este
+
+        Args:
+            other: Sketch a combinar
+
+        Returns:
+            Este sketch (combinado)
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        """Compactar los niveles que superan la capacidad"""
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.size:
+                items = np.sort(items)
+                # Con longitud impar, un elemento se queda en este nivel
+                if len(items) % 2:
+                    self.levels[h], items = items[-1:], items[:-1]
+                else:
+                    self.levels[h] = np.empty(0)
+                promoted = items[self._rng.integers(2)::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _weighted_items(self):
+        """Elementos ordenados con su peso acumulado"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q: List[float]) -> np.ndarray:
+        """
+        Estimar cuantiles
+
+        Sin compactación el resultado es exacto (interpolación lineal,
+        igual que pandas); con compactación, aproximado (ver cotas).
+
+        Args:
+            q: Cuantiles entre 0 y 1
+
+        Returns:
+            Valores de los cuantiles
+        """
+        if self.count == 0:
+            return np.full(len(q), np.nan)
+        if self.is_exact:
+            return np.quantile(self.levels[0], q)
+
+        items, cumulative = self._weighted_items()
+        targets = np.asarray(q) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def count_outside(self, lower: float, upper: float) -> int:
+        """
+        Contar (o estimar) los valores fuera de [lower, upper]
+
+        Args:
+            lower: Límite inferior
+            upper: Límite superior
+
+        Returns:
+            Cantidad de valores < lower o > upper
+        """
+        if self.count == 0:
+            return 0
+        if self.is_exact:
+            values = self.levels[0]
+            return int(((values < lower) | (values > upper)).sum())
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        return int(round(weights[(items < lower) | (items > upper)].sum()))
+
+
+class DistinctHashSet:
+    """
+    Conjunto compacto de hashes uint64 para contar valores distintos
+
+    Los hashes se guardan en arreglos ordenados; los lotes nuevos se
+    acumulan y se consolidan cuando igualan el tamaño del conjunto, con
+    costo amortizado O(n log n).
+    """
+
+    def __init__(self):
+        """Inicializar el conjunto vacío"""
+        self.count = 0
+        self._values = np.empty(0, dtype=np.uint64)
+        self._pending: List[np.ndarray] = []
+        self._pending_size = 0
+
+    def add(self, hashes: np.ndarray) -> None:
+        """
+        Agregar hashes
+
+        Args:
+            hashes: Arreglo de hashes uint64
+        """
+        self.count += len(hashes)
+        batch = self._sorted_unique(np.asarray(hashes, dtype=np.uint64))
+        self._pending.append(batch)
+        self._pending_size += len(batch)
+        if self._pending_size >= max(len(self._values), 1 << 16):
+            self._consolidate()
+
+    def merge(self, other: 'DistinctHashSet') -> 'DistinctHashSet':
+        """
+        Combinar otro conjunto en este
+
+        Args:
+            other: Conjunto a combinar
+
+        Returns:
+            Este conjunto (combinado)
+        """
+        other._consolidate()
+        self.count += other.count
+        self._pending.append(other._values)
+        self._pending_size += len(other._values)
+        self._consolidate()
+        return self
+
+    @staticmethod
+    def _sorted_unique(values: np.ndarray) -> np.ndarray:
+        """Valores únicos ordenados (timsort aprovecha los tramos ya ordenados)"""
+        values = np.sort(values, kind='stable')
+        if len(values) < 2:
+            return values
+        keep = np.empty(len(values), dtype=bool)
+        keep[0] = True
+        np.not_equal(values[1:], values[:-1], out=keep[1:])
+        return values[keep]
+
+    def _consolidate(self) -> None:
+        """Unir los lotes pendientes con el conjunto ordenado"""
+        if self._pending:
+            self._values = self._sorted_unique(np.concatenate([self._values] + self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def distinct(self) -> int:
+        """Cantidad de hashes distintos"""
+        self._consolidate()
+        return len(self._values)
+
+    def duplicates(self) -> int:
+        """Cantidad de elementos agregados que repiten un hash anterior"""
+        return self.count - self.distinct()
+
+
+class ValidationProfile:
+    """
+    Perfil de validación combinable entre bloques y workers
+    """
+
+    def __init__(self, id_column: str = 'CustomerID',
+                 threshold: float = 1.5,
+                 sketch_size: int = 2048,
+                 ignore_columns: Optional[List[str]] = None):
+        """
+        Inicializar el perfil
+
+        Args:
+            id_column: Columna de ID a validar
+            threshold: Multiplicador de IQR
+            sketch_size: Capacidad por nivel de los sketches de cuantiles
+            ignore_columns: Columnas excluidas del hash de duplicados
+                            (default: ProcessedAt, que varía entre bloques)
+        """
+        self.id_column = id_column
+        self.threshold = threshold
+        self.sketch_size = sketch_size
+        self.ignore_columns = ['ProcessedAt'] if ignore_columns is None else list(ignore_columns)
+
+        self.total_records = 0
+        self.columns: List[str] = []
+        self.null_counts: Dict[str, int] = {}
+        self.business_rules: Dict[str, Any] = {}
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self.row_hashes = DistinctHashSet()
+        self.id_hashes = DistinctHashSet()
+        self.has_id_column = False
+
+    def update(self, df: pd.DataFrame) -> 'ValidationProfile':
+        """
+        Agregar un bloque al perfil
+
+        Args:
+            df: Bloque de datos
+
+        Returns:
+            Este perfil (actualizado)
+        """
+        self.total_records += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns.append(col)
+
+        for col, n in df.isnull().sum().items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + int(n)
+
+        self.business_rules = DataValidator.merge_business_rule_counts(
+            self.business_rules, DataValidator.business_rule_counts(df)
+        )
+
+        for col in df.select_dtypes(include=[np.number]).columns:
+            if col not in self.sketches:
+                self.sketches[col] = QuantileSketch(self.sketch_size)
+            self.sketches[col].update(df[col].to_numpy(dtype='float64', na_value=np.nan))
+
+        hashed = df.drop(columns=[c for c in self.ignore_columns if c in df.columns])
+        self.row_hashes.add(pd.util.hash_pandas_object(hashed, index=False).to_numpy())
+
+        if self.id_column in df.columns:
+            self.has_id_column = True
+            self.id_hashes.add(pd.util.hash_pandas_object(df[self.id_column], index=False).to_numpy())
+
+        return self
+
+    def merge(self, other: 'ValidationProfile') -> 'ValidationProfile':
+        """
+        Combinar otro perfil en este
+
+        Args:
+            other: Perfil de otro bloque o worker
+
+        Returns:
+            Este perfil (combinado)
+        """
+        self.total_records += other.total_records
+        for col in other.columns:
+            if col not in self.columns:
+                self.columns.append(col)
+        for col, n in other.null_counts.items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + n
+
+        self.business_rules = DataValidator.merge_business_rule_counts(
+            self.business_rules, other.business_rules
+        )
+
+        for col, sketch in other.sketches.items():
+            if col in self.sketches:
+                self.sketches[col].merge(sketch)
+            else:
+                self.sketches[col] = sketch.copy()
+
+        self.row_hashes.merge(other.row_hashes)
+        self.id_hashes.merge(other.id_hashes)
+        self.has_id_column = self.has_id_column or other.has_id_column
+        return self
+
+    def numeric_profile(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estadísticas numéricas con el mismo formato que DataValidator.numeric_profile
+
+        Returns:
+            Diccionario {columna: estadísticas}
+        """
+        numeric = {}
+        for col, sketch in self.sketches.items():
+            q1, q3 = sketch.quantile([0.25, 0.75])
+            iqr = q3 - q1
+            lower, upper = q1 - self.threshold * iqr, q3 + self.threshold * iqr
+            numeric[col] = {
+                'min': float(sketch.min) if sketch.count else float('nan'),
+                'max': float(sketch.max) if sketch.count else float('nan'),
+                'q1': float(q1),
+                'q3': float(q3),
+                'lower_bound': float(lower),
+                'upper_bound': float(upper),
+                'outliers': sketch.count_outside(lower, upper),
+                'exact': sketch.is_exact,
+            }
+        return numeric
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Perfil con el mismo formato que DataValidator.build_profile
+
+        Returns:
+            Perfil de validación
+        """
+        profile = {
+            'total_records': self.total_records,
+            'total_columns': len(self.columns),
+            'null_counts': {col: n for col, n in self.null_counts.items() if n > 0},
+            'null_count': int(sum(self.null_counts.values())),
+            'duplicate_count': self.row_hashes.duplicates(),
+            'numeric': self.numeric_profile(),
+            'business_rules': self.business_rules,
+        }
+        if self.has_id_column:
+            profile['unique_ids'] = {self.id_column: self.id_hashes.distinct()}
+        return profile
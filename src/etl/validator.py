@@ -27,6 +27,7 @@ class DataValidator:
         self.validation_results = []
         self.errors = []
         self.warnings = []
+        self.profile = None
         
     def validate_no_nulls(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> bool:
         """
@@ -146,9 +147,10 @@ class DataValidator:
             self.errors.append(f"Columna {id_column} no existe")
             return False
         
-        unique_count = df[id_column].nunique()
-        total_count = len(df)
-        
+        return self._report_unique_id(id_column, df[id_column].nunique(), len(df))
+    
+    def _report_unique_id(self, id_column: str, unique_count: int, total_count: int) -> bool:
+        """Registrar el resultado del check de IDs únicos"""
         if unique_count != total_count:
             duplicates = total_count - unique_count
             self.errors.append(f"{id_column}: {duplicates} IDs duplicados")
@@ -201,15 +203,17 @@ class DataValidator:
         if column not in df.columns:
             return False, 0
         
-        Q1 = df[column].quantile(0.25)
-        Q3 = df[column].quantile(0.75)
+        Q1, Q3 = df[column].quantile([0.25, 0.75])
         IQR = Q3 - Q1
         
         lower_bound = Q1 - threshold * IQR
         upper_bound = Q3 + threshold * IQR
         
-        outliers = ((df[column] < lower_bound) | (df[column] > upper_bound)).sum()
-        
+        outliers = int(((df[column] < lower_bound) | (df[column] > upper_bound)).sum())
+        return self._report_outliers(column, outliers)
+    
+    def _report_outliers(self, column: str, outliers: int) -> Tuple[bool, int]:
+        """Registrar el resultado de la detección de outliers de una columna"""
         if outliers > 0:
             self.warnings.append(f"{column}: {outliers} outliers detectados")
             print(f"⚠️ {column}: {outliers} outliers detectados (IQR)")
@@ -218,97 +222,267 @@ class DataValidator:
             print(f"✅ {column}: Sin outliers significativos")
             return False, 0
     
-    def validate_business_rules(self, df: pd.DataFrame) -> bool:
+    @staticmethod
+    def business_rule_counts(df: pd.DataFrame) -> Dict[str, Any]:
         """
-        Validar reglas de negocio específicas para telecomunicaciones
+        Contar violaciones de reglas de negocio (checks locales por fila)
+        
+        Los conteos de distintas particiones se combinan con
+        merge_business_rule_counts y se reportan con report_business_rules.
         
         Args:
             df: DataFrame
             
         Returns:
-            True si pasa todas las validaciones
+            Diccionario con conteos por regla
         """
-        print("\n🔍 Validando reglas de negocio...")
-        print("=" * 60)
-        
-        all_valid = True
+        counts = {}
         
         # Regla 1: MonthlyCharges debe ser > 0
         if 'MonthlyCharges' in df.columns:
-            invalid = (df['MonthlyCharges'] <= 0).sum()
-            if invalid > 0:
-                self.errors.append(f"MonthlyCharges <= 0: {invalid} registros")
-                print(f"❌ {invalid} registros con MonthlyCharges <= 0")
-                all_valid = False
+            counts['monthly_charges_non_positive'] = int((df['MonthlyCharges'] <= 0).sum())
         
         # Regla 2: TotalCharges >= MonthlyCharges * tenure (aproximadamente)
         if all(col in df.columns for col in ['TotalCharges', 'MonthlyCharges', 'tenure']):
             expected_min = df['MonthlyCharges'] * df['tenure'] * 0.8  # 80% del esperado
-            invalid = (df['TotalCharges'] < expected_min).sum()
-            if invalid > 0:
-                self.warnings.append(f"TotalCharges inconsistente: {invalid} registros")
-                print(f"⚠️ {invalid} registros con TotalCharges inconsistente")
+            counts['total_charges_inconsistent'] = int((df['TotalCharges'] < expected_min).sum())
         
         # Regla 3: Tenure debe estar en rango válido (1-72 meses)
         if 'tenure' in df.columns:
-            if not self.validate_value_range(df, 'tenure', 1, 72):
-                all_valid = False
+            counts['tenure_out_of_range'] = int(((df['tenure'] < 1) | (df['tenure'] > 72)).sum())
         
         # Regla 4: Churn debe ser Yes o No
         if 'Churn' in df.columns:
-            if not self.validate_categorical_values(df, 'Churn', ['Yes', 'No']):
+            counts['churn_invalid_values'] = set(df['Churn'].unique()) - {'Yes', 'No'}
+        
+        return counts
+    
+    @staticmethod
+    def merge_business_rule_counts(counts: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combinar conteos de reglas de negocio de dos particiones
+        
+        Args:
+            counts: Conteos acumulados
+            other: Conteos de otra partición
+            
+        Returns:
+            Conteos combinados
+        """
+        merged = dict(counts)
+        for key, value in other.items():
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(value, set):
+                merged[key] = merged[key] | value
+            else:
+                merged[key] = merged[key] + value
+        return merged
+    
+    def report_business_rules(self, counts: Dict[str, Any]) -> bool:
+        """
+        Registrar errores y advertencias a partir de los conteos de reglas
+        
+        Args:
+            counts: Conteos de business_rule_counts
+            
+        Returns:
+            True si pasa todas las validaciones
+        """
+        print("\n🔍 Validando reglas de negocio...")
+        print("=" * 60)
+        
+        all_valid = True
+        
+        invalid = counts.get('monthly_charges_non_positive', 0)
+        if invalid > 0:
+            self.errors.append(f"MonthlyCharges <= 0: {invalid} registros")
+            print(f"❌ {invalid} registros con MonthlyCharges <= 0")
+            all_valid = False
+        
+        invalid = counts.get('total_charges_inconsistent', 0)
+        if invalid > 0:
+            self.warnings.append(f"TotalCharges inconsistente: {invalid} registros")
+            print(f"⚠️ {invalid} registros con TotalCharges inconsistente")
+        
+        if 'tenure_out_of_range' in counts:
+            out_of_range = counts['tenure_out_of_range']
+            if out_of_range > 0:
+                self.warnings.append(f"tenure: {out_of_range} valores fuera de rango [1, 72]")
+                print(f"⚠️ Advertencia: {out_of_range} valores fuera de rango en tenure")
+                all_valid = False
+            else:
+                print("✅ Validación exitosa: tenure en rango válido")
+        
+        if 'churn_invalid_values' in counts:
+            invalid_values = counts['churn_invalid_values']
+            if invalid_values:
+                self.errors.append(f"Churn: valores inválidos {invalid_values}")
+                print("❌ Validación fallida: Churn tiene valores inválidos")
                 all_valid = False
+            else:
+                print("✅ Validación exitosa: Churn tiene valores válidos")
         
         print("=" * 60)
         return all_valid
     
-    def run_full_validation(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def validate_business_rules(self, df: pd.DataFrame) -> bool:
         """
-        Ejecutar validación completa
+        Validar reglas de negocio específicas para telecomunicaciones
         
         Args:
-            df: DataFrame a validar
+            df: DataFrame
             
         Returns:
-            Diccionario con resultados de validación
+            True si pasa todas las validaciones
         """
-        print("\n✅ INICIANDO VALIDACIÓN COMPLETA")
-        print("=" * 60)
+        return self.report_business_rules(self.business_rule_counts(df))
+    
+    @staticmethod
+    def numeric_profile(df: pd.DataFrame, threshold: float = 1.5) -> Dict[str, Dict[str, float]]:
+        """
+        Calcular min/max, cuartiles, límites IQR y outliers de todas las
+        columnas numéricas en operaciones vectorizadas sobre el bloque
         
-        self.validation_results = []
-        self.errors = []
-        self.warnings = []
+        Los cuartiles se obtienen con una sola llamada quantile([0.25, 0.75]).
         
-        # Validaciones básicas
-        results = {
+        Args:
+            df: DataFrame
+            threshold: Multiplicador de IQR
+            
+        Returns:
+            Diccionario {columna: estadísticas}
+        """
+        numeric = df.select_dtypes(include=[np.number])
+        if numeric.shape[1] == 0:
+            return {}
+        
+        quartiles = numeric.quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        iqr = q3 - q1
+        lower, upper = q1 - threshold * iqr, q3 + threshold * iqr
+        outliers = (numeric.lt(lower, axis=1) | numeric.gt(upper, axis=1)).sum()
+        minimum, maximum = numeric.min(), numeric.max()
+        
+        return {
+            col: {
+                'min': float(minimum[col]),
+                'max': float(maximum[col]),
+                'q1': float(q1[col]),
+                'q3': float(q3[col]),
+                'lower_bound': float(lower[col]),
+                'upper_bound': float(upper[col]),
+                'outliers': int(outliers[col]),
+            }
+            for col in numeric.columns
+        }
+    
+    def build_profile(self, df: pd.DataFrame, id_column: str = 'CustomerID',
+                      threshold: float = 1.5) -> Dict[str, Any]:
+        """
+        Calcular el perfil compartido por todos los checks de validación
+        
+        Nulos, duplicados, cardinalidad de IDs, estadísticas numéricas y
+        conteos de reglas de negocio se calculan una sola vez; los checks de
+        run_full_validation solo leen este perfil.
+        
+        Args:
+            df: DataFrame
+            id_column: Columna de ID a validar
+            threshold: Multiplicador de IQR
+            
+        Returns:
+            Perfil de validación
+        """
+        null_counts = df.isnull().sum()
+        
+        profile = {
             'total_records': len(df),
             'total_columns': len(df.columns),
-            'has_nulls': df.isnull().sum().sum() > 0,
-            'null_count': int(df.isnull().sum().sum()),
-            'has_duplicates': df.duplicated().sum() > 0,
+            'null_counts': {col: int(n) for col, n in null_counts.items() if n > 0},
+            'null_count': int(null_counts.sum()),
             'duplicate_count': int(df.duplicated().sum()),
+            'numeric': self.numeric_profile(df, threshold),
+            'business_rules': self.business_rule_counts(df),
+        }
+        if id_column in df.columns:
+            profile['unique_ids'] = {id_column: int(df[id_column].nunique())}
+        
+        return profile
+    
+    def _results_from_profile(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluar los checks de validación a partir de un perfil
+        
+        Args:
+            profile: Perfil de build_profile
+            
+        Returns:
+            Diccionario con resultados de validación
+        """
+        results = {
+            'total_records': profile['total_records'],
+            'total_columns': profile['total_columns'],
+            'has_nulls': profile['null_count'] > 0,
+            'null_count': profile['null_count'],
+            'has_duplicates': profile['duplicate_count'] > 0,
+            'duplicate_count': profile['duplicate_count'],
         }
         
         # Validar ID único
-        if 'CustomerID' in df.columns:
-            results['unique_ids'] = self.validate_unique_id(df, 'CustomerID')
+        for id_column, unique_count in profile.get('unique_ids', {}).items():
+            results['unique_ids'] = self._report_unique_id(
+                id_column, unique_count, profile['total_records']
+            )
         
         # Validar reglas de negocio
-        results['business_rules_valid'] = self.validate_business_rules(df)
+        results['business_rules_valid'] = self.report_business_rules(profile['business_rules'])
         
-        # Detectar outliers en columnas numéricas
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        # Outliers en columnas numéricas
         outliers_detected = {}
-        for col in numeric_cols:
-            has_outliers, count = self.detect_outliers_iqr(df, col)
+        for col, stats in profile['numeric'].items():
+            has_outliers, count = self._report_outliers(col, stats['outliers'])
             if has_outliers:
-                outliers_detected[col] = count
+                outliers_detected[col] = int(count)
         
         results['outliers'] = outliers_detected
         results['errors'] = self.errors
         results['warnings'] = self.warnings
+        return results
+    
+    def run_full_validation(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Ejecutar validación completa
+        
+        Todos los checks se alimentan de un único perfil (build_profile),
+        disponible después en self.profile.
+        
+        Args:
+            df: DataFrame a validar
+            
+        Returns:
+            Diccionario con resultados de validación
+        """
+        print("\n✅ INICIANDO VALIDACIÓN COMPLETA")
+        print("=" * 60)
+        
+        self.validation_results = []
+        self.errors = []
+        self.warnings = []
         
-        # Resumen final
+        self.profile = self.build_profile(df)
+        results = self._results_from_profile(self.profile)
+        
+        self._print_summary(results)
+        return results
+    
+    def _print_summary(self, results: Dict[str, Any]) -> None:
+        """
+        Imprimir el resumen final de validación
+        
+        Args:
+            results: Resultados de validación
+        """
         print("\n" + "=" * 60)
         print("📊 RESUMEN DE VALIDACIÓN")
         print("=" * 60)
@@ -325,7 +499,82 @@ class DataValidator:
             print("\n❌ VALIDACIÓN FALLIDA - Revisar errores")
         
         print("=" * 60)
+    
+    def run_partitioned_validation(self, df: pd.DataFrame,
+                                   partition_results: List[Dict[str, Any]],
+                                   duplicate_count: int = 0) -> Dict[str, Any]:
+        """
+        Completar la validación de un DataFrame procesado por particiones
+        
+        Los checks locales por fila (nulos y reglas de negocio) ya vienen
+        calculados por cada partición y aquí solo se combinan. Los checks
+        globales (IDs únicos y límites IQR) se evalúan sobre el DataFrame
+        combinado, así el resultado coincide con run_full_validation.
+        
+        Args:
+            df: DataFrame combinado
+            partition_results: Resultados locales de cada partición
+                ('null_count' y 'business_rules')
+            duplicate_count: Duplicados detectados globalmente
+            
+        Returns:
+            Diccionario con resultados de validación
+        """
+        print("\n✅ INICIANDO VALIDACIÓN POR PARTICIONES")
+        print("=" * 60)
+        
+        self.validation_results = []
+        self.errors = []
+        self.warnings = []
+        
+        rule_counts = {}
+        for part in partition_results:
+            rule_counts = self.merge_business_rule_counts(rule_counts, part['business_rules'])
+        
+        # Perfil combinado: conteos locales sumados + checks globales
+        self.profile = {
+            'total_records': len(df),
+            'total_columns': len(df.columns),
+            'null_count': sum(int(part['null_count']) for part in partition_results),
+            'duplicate_count': int(duplicate_count),
+            'numeric': self.numeric_profile(df),
+            'business_rules': rule_counts,
+        }
+        if 'CustomerID' in df.columns:
+            self.profile['unique_ids'] = {'CustomerID': int(df['CustomerID'].nunique())}
+        
+        results = self._results_from_profile(self.profile)
+        results['partitions'] = len(partition_results)
+        
+        self._print_summary(results)
+        return results
+    
+    def run_profile_validation(self, profile) -> Dict[str, Any]:
+        """
+        Evaluar la validación a partir de un ValidationProfile combinado
+        
+        Cada bloque o worker actualiza su propio perfil y los perfiles se
+        combinan con ValidationProfile.merge; el resultado tiene el mismo
+        formato que run_full_validation (ver las cotas de error en
+        validation_profile).
+        
+        Args:
+            profile: ValidationProfile con todos los bloques
+            
+        Returns:
+            Diccionario con resultados de validación
+        """
+        print("\n✅ INICIANDO VALIDACIÓN POR PERFIL COMBINADO")
+        print("=" * 60)
+        
+        self.validation_results = []
+        self.errors = []
+        self.warnings = []
+        
+        self.profile = profile.as_dict()
+        results = self._results_from_profile(self.profile)
         
+        self._print_summary(results)
         return results
 
 
@@ -80,12 +80,41 @@ __author__ = 'Elizabeth Díaz Familia'
 __email__ = 'contact@elizabethdiaz.com'
 __license__ = 'MIT'
 
-# Importar componentes principales para acceso directo
-from .etl.pipeline import ETLPipeline
-from .api.api_manager import APIManager
-from .analysis.churn_analysis import ChurnAnalysis
-from .visualization.plotly_charts import PlotlyCharts
-from .reports.report_generator import ReportGenerator
+import importlib
+from typing import TYPE_CHECKING
+
+# Componentes principales para acceso directo. Se importan en el primer
+# acceso (PEP 562): importar un módulo hoja como src.utils.helpers no
+# carga pandas, plotly, requests, openpyxl ni reportlab.
+_LAZY_IMPORTS = {
+    'ETLPipeline': '..etl.pipeline',
+    'APIManager': '..api.api_manager',
+    'ChurnAnalysis': '..analysis.churn_analysis',
+    'PlotlyCharts': '..visualization.plotly_charts',
+    'ReportGenerator': '..reports.report_generator',
+}
+
+if TYPE_CHECKING:
+    from ..etl.pipeline import ETLPipeline
+    from ..api.api_manager import APIManager
+    from ..analysis.churn_analysis import ChurnAnalysis
+    from ..visualization.plotly_charts import PlotlyCharts
+    from ..reports.report_generator import ReportGenerator
+
+
+def __getattr__(name):
+    """Importar un componente principal al primer acceso"""
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Incluir los componentes aún no importados"""
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 # Configurar namespace público
 __all__ = [
@@ -7,6 +7,9 @@ Autor: Elizabeth Díaz Familia
 
 import pandas as pd
 from pathlib import Path
+from typing import Iterable, Optional
+
+from ..etl.loader import EXCEL_STREAM_MIN_ROWS, iter_frame_chunks, write_excel_chunks
 
 class ExcelExporter:
     """Exportador Excel"""
@@ -15,9 +18,23 @@ class ExcelExporter:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-    def export(self, df: pd.DataFrame, filename: str, sheet_name: str = 'Data'):
-        """Exportar DataFrame a Excel"""
+    def export(self, df: pd.DataFrame, filename: str, sheet_name: str = 'Data',
+               streaming: Optional[bool] = None):
+        """Exportar DataFrame a Excel (en streaming desde EXCEL_STREAM_MIN_ROWS filas)"""
+        if streaming is None:
+            streaming = len(df) >= EXCEL_STREAM_MIN_ROWS
+        if streaming:
+            return self.export_chunks(iter_frame_chunks(df), filename, sheet_name)
+        
         filepath = self.output_dir / filename
         df.to_excel(filepath, sheet_name=sheet_name, index=False)
         print(f"✅ Excel exportado: {filepath}")
         return str(filepath)
+    
+    def export_chunks(self, chunks: Iterable[pd.DataFrame], filename: str,
+                      sheet_name: str = 'Data'):
+        """Exportar bloques a Excel con memoria constante (hojas write-only)"""
+        filepath = self.output_dir / filename
+        result = write_excel_chunks(chunks, str(filepath), sheet_name)
+        print(f"✅ Excel exportado: {filepath} ({len(result['sheets'])} hoja(s))")
+        return str(filepath)
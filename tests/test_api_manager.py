@@ -203,5 +203,868 @@ class TestAPIResponseFormats:
         assert 'code' in error_response['error']
 
 
+def fake_session(payload=None, delay=0.0):
+    """Session double whose get/post return payload (or the request URL)"""
+    import time
+    
+    def respond(url, **kwargs):
+        time.sleep(delay)
+        body = payload if payload is not None else {'url': url}
+        return Mock(json=lambda: body, raise_for_status=lambda: None)
+    
+    session = MagicMock()
+    session.get.side_effect = respond
+    session.post.side_effect = respond
+    return session
+
+
+class TestSessionPool:
+    """Tests for the pooled session layer and concurrent fetching"""
+    
+    def test_shared_session_is_reused(self):
+        """API classes share one pooled session per process"""
+        from src.api.http_session import get_session
+        from src.api.exchange_rates import ExchangeRatesAPI
+        from src.api.geolocation import GeolocationAPI
+        
+        assert ExchangeRatesAPI().session is get_session()
+        assert GeolocationAPI(cache_path=None).session is get_session()
+    
+    def test_pool_size(self):
+        """Sessions mount an adapter with the requested pool size"""
+        from src.api.http_session import create_session
+        
+        adapter = create_session(pool_size=32).get_adapter('https://example.com')
+        assert adapter._pool_maxsize == 32
+    
+    def test_api_classes_route_through_session(self):
+        """Requests go through the given session instead of requests.get"""
+        from src.api.weather_data import WeatherAPI
+        
+        session = fake_session({'main': {'temp': 21.5}})
+        with patch('requests.get') as module_get:
+            data = WeatherAPI(session=session).get_weather('Lima')
+        
+        assert data['main']['temp'] == 21.5
+        assert session.get.call_count == 1
+        module_get.assert_not_called()
+    
+    def test_fetch_many_keeps_order(self):
+        """fetch_many returns one response per request, in request order"""
+        from src.api.api_manager import APIManager
+        
+        manager = APIManager({'cache_path': None, 'session': fake_session()})
+        urls = [f'http://api.example.com/region/{i}' for i in range(50)]
+        results = manager.fetch_many([{'url': url} for url in urls], max_workers=8)
+        
+        assert [r['url'] for r in results] == urls
+        assert manager.get_statistics()['total_calls'] == 50
+    
+    def test_fetch_many_runs_concurrently(self):
+        """Slow requests overlap instead of running one after another"""
+        import time
+        from src.api.api_manager import APIManager
+        
+        manager = APIManager({'cache_path': None, 'session': fake_session(delay=0.1)})
+        start = time.perf_counter()
+        manager.fetch_many([{'url': f'http://x/{i}', 'use_cache': False} for i in range(8)],
+                           max_workers=8)
+        
+        assert time.perf_counter() - start < 0.5
+    
+    def test_indicator_many(self):
+        """Economic indicators for many countries are fetched in one call"""
+        from src.api.economic_indicators import EconomicIndicatorsAPI
+        
+        session = fake_session([{'page': 1}, [{'value': 1.0}]])
+        results = EconomicIndicatorsAPI(session=session).get_indicator_many(
+            ['US', 'BR', 'MX'], 'NY.GDP.MKTP.CD')
+        
+        assert list(results) == ['US', 'BR', 'MX']
+        assert all(r['success'] for r in results.values())
+
+
+class TestRateLimiter:
+    """Tests for the per-host token-bucket rate limiter"""
+    
+    def test_burst_then_sustained_rate(self):
+        """A full bucket allows a burst, then calls are spaced at the refill rate"""
+        from src.api.rate_limiter import TokenBucket
+        
+        bucket = TokenBucket(rate=10, capacity=3)
+        waits = [bucket.reserve() for _ in range(5)]
+        
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(0.1, abs=0.02)
+        assert waits[4] == pytest.approx(0.2, abs=0.02)
+    
+    def test_hosts_are_independent(self):
+        """Exhausting one host does not delay another"""
+        from src.api.rate_limiter import RateLimiter
+        
+        limiter = RateLimiter(rate_limit=2, period=60)
+        limiter.bucket('https://api.a.com/x').reserve()
+        limiter.bucket('https://api.a.com/y').reserve()
+        
+        assert limiter.bucket('https://api.a.com/z').reserve() > 0
+        assert limiter.acquire('https://api.b.com/x') == 0.0
+        assert limiter.get_statistics()['hosts'] == 2
+    
+    def test_host_limits(self):
+        """Per-host quotas override the default"""
+        from src.api.rate_limiter import RateLimiter
+        
+        limiter = RateLimiter(rate_limit=100, period=60, host_limits={'slow.example.com': 6})
+        assert limiter.bucket('https://slow.example.com/a').rate == pytest.approx(0.1)
+        assert limiter.bucket('https://fast.example.com/a').rate == pytest.approx(100 / 60)
+    
+    def test_concurrent_reservations_are_spaced(self):
+        """Threads reserving together get distinct, evenly spaced slots"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.api.rate_limiter import TokenBucket
+        
+        bucket = TokenBucket(rate=100, capacity=1)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            waits = sorted(executor.map(lambda _: bucket.reserve(), range(20)))
+        
+        assert waits[0] == 0.0
+        assert waits[-1] == pytest.approx(0.19, abs=0.02)
+    
+    def test_async_acquire_does_not_block_loop(self):
+        """Waiting coroutines let other tasks run"""
+        import asyncio
+        from src.api.rate_limiter import RateLimiter
+        
+        limiter = RateLimiter(rate_limit=20, period=1, burst=1)
+        ticks = []
+        
+        async def ticker():
+            for _ in range(5):
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+        
+        async def main():
+            await asyncio.gather(ticker(), *(limiter.acquire_async('h') for _ in range(3)))
+        
+        asyncio.run(main())
+        assert len(ticks) == 5
+        assert limiter.get_statistics()['delayed'] == 2
+    
+    def test_retry_after(self):
+        """Retry-After seconds and HTTP dates pause the host"""
+        from email.utils import format_datetime
+        from datetime import datetime, timedelta, timezone
+        from src.api.rate_limiter import RateLimiter, parse_retry_after
+        
+        assert parse_retry_after('120') == 120.0
+        assert parse_retry_after('soon') is None
+        future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        assert 25 < parse_retry_after(future) <= 30
+        
+        limiter = RateLimiter(rate_limit=100, period=1)
+        limiter.defer('https://api.example.com/a', 2.0)
+        assert limiter.bucket('api.example.com').reserve() == pytest.approx(2.0, abs=0.05)
+    
+    def test_manager_honours_retry_after(self):
+        """A 429 with Retry-After defers later calls to that host only"""
+        import requests
+        from src.api.api_manager import APIManager
+        
+        session = MagicMock()
+        session.get.return_value = Mock(
+            status_code=429, headers={'Retry-After': '5'},
+            raise_for_status=Mock(side_effect=requests.exceptions.HTTPError('429'))
+        )
+        manager = APIManager({'cache_path': None, 'session': session})
+        
+        assert 'error' in manager.make_request('https://api.example.com/rates')
+        assert manager.rate_limiter.bucket('api.example.com').reserve() > 4
+        assert manager.rate_limiter.bucket('other.example.com').reserve() == 0.0
+    
+    def test_manager_no_longer_sleeps_a_minute(self):
+        """Going over the old fixed counter only waits for the next token"""
+        import time
+        from src.api.api_manager import APIManager
+        
+        manager = APIManager({'cache_path': None, 'session': fake_session(), 'rate_limit': 3, 'rate_period': 0.3})
+        start = time.perf_counter()
+        for i in range(5):
+            manager.make_request(f'http://api.example.com/{i}')
+        
+        assert time.perf_counter() - start < 1.0
+        assert manager.get_statistics()['rate_limiter']['delayed'] == 2
+    
+    def test_make_request_async(self):
+        """The asyncio entry point returns the same responses"""
+        import asyncio
+        from src.api.api_manager import APIManager
+        
+        manager = APIManager({'cache_path': None, 'session': fake_session()})
+        
+        async def main():
+            return await asyncio.gather(*(manager.make_request_async(f'http://x/{i}') for i in range(4)))
+        
+        results = asyncio.run(main())
+        assert [r['url'] for r in results] == [f'http://x/{i}' for i in range(4)]
+
+
+class TestResponseCache:
+    """Tests for the bounded, TTL-aware, SQLite-backed response cache"""
+    
+    def test_endpoint_ttls(self):
+        """The longest matching endpoint prefix sets the TTL"""
+        from src.api.response_cache import ResponseCache
+        
+        cache = ResponseCache(path=None, default_ttl=60,
+                              endpoint_ttls={'api.example.com': 10, 'api.example.com/slow': 99})
+        
+        assert cache.ttl_for('https://api.example.com/fast?q=1') == 10
+        assert cache.ttl_for('https://api.example.com/slow/x') == 99
+        assert cache.ttl_for('https://other.example.com/') == 60
+    
+    def test_expired_entries_are_misses(self):
+        """Entries past their TTL are not served"""
+        import time
+        from src.api.response_cache import ResponseCache
+        
+        cache = ResponseCache(path=None)
+        cache.set('k', 'http://x/k', {'v': 1}, ttl=0.05)
+        assert cache.get('k') == {'v': 1}
+        time.sleep(0.1)
+        
+        assert cache.get('k') is None
+        stats = cache.get_statistics()
+        assert (stats['hits'], stats['misses'], stats['expired']) == (1, 1, 1)
+    
+    def test_lru_bound(self, tmp_path):
+        """The least recently used entries are evicted in memory and on disk"""
+        from src.api.response_cache import ResponseCache
+        
+        cache = ResponseCache(path=tmp_path / 'c.sqlite', max_entries=3)
+        for key in 'abc':
+            cache.set(key, 'http://x', key)
+        cache.get('a')
+        cache.set('d', 'http://x', 'd')
+        
+        assert len(cache) == 3
+        assert cache.get_statistics()['evictions'] == 1
+        assert ResponseCache(path=tmp_path / 'c.sqlite').get('b') is None
+        assert cache.get('a') == 'a'
+    
+    def test_shared_across_instances(self, tmp_path):
+        """A new process (here: a new instance) reads the warm cache from disk"""
+        from src.api.response_cache import ResponseCache
+        
+        ResponseCache(path=tmp_path / 'c.sqlite').set('k', 'http://x', {'rates': {'EUR': 0.9}})
+        warm = ResponseCache(path=tmp_path / 'c.sqlite')
+        
+        assert warm.get('k') == {'rates': {'EUR': 0.9}}
+        assert warm.get_statistics()['disk_hits'] == 1
+    
+    def test_warm_restart_skips_upstream(self, tmp_path):
+        """A restarted manager answers from the persistent cache"""
+        from src.api.api_manager import APIManager
+        
+        config = {'cache_path': str(tmp_path / 'api.sqlite')}
+        first = APIManager({**config, 'session': fake_session()})
+        first.make_request('https://api.worldbank.org/v2/country/US', params={'format': 'json'})
+        
+        session = fake_session()
+        restarted = APIManager({**config, 'session': session})
+        data = restarted.make_request('https://api.worldbank.org/v2/country/US', params={'format': 'json'})
+        
+        assert data == {'url': 'https://api.worldbank.org/v2/country/US'}
+        session.get.assert_not_called()
+        stats = restarted.get_statistics()['cache']
+        assert stats['hits'] == 1 and stats['disk_hits'] == 1
+    
+    def test_ttl_from_performance_settings(self):
+        """performance.cache_ttl_seconds sets the default TTL"""
+        from src.api.api_manager import APIManager
+        
+        manager = APIManager({'cache_path': None, 'session': fake_session(),
+                              'performance': {'cache_ttl_seconds': 120}})
+        assert manager.cache.default_ttl == 120
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent identical requests"""
+    
+    def test_concurrent_identical_calls_share_one_request(self):
+        """Callers for the same url:params wait for the in-flight request"""
+        from src.api.api_manager import APIManager
+        
+        session = fake_session(delay=0.2)
+        manager = APIManager({'cache_path': None, 'session': session})
+        requests_list = [{'url': 'https://api.exchangerate-api.com/v4/latest/USD'}] * 10
+        results = manager.fetch_many(requests_list, max_workers=10)
+        
+        assert session.get.call_count == 1
+        assert all(r == results[0] for r in results)
+        stats = manager.get_statistics()
+        assert stats['coalesced_calls'] + stats['cache']['hits'] == 9
+        assert stats['single_flight']['in_flight'] == 0
+    
+    def test_distinct_params_are_not_coalesced(self):
+        """Different params are different resources"""
+        from src.api.api_manager import APIManager
+        
+        session = fake_session(delay=0.05)
+        manager = APIManager({'cache_path': None, 'session': session})
+        manager.fetch_many([{'url': 'http://x/weather', 'params': {'q': city}}
+                            for city in ['Lima', 'Quito', 'Lima', 'Bogota']], max_workers=4)
+        
+        assert session.get.call_count == 3
+    
+    def test_no_coalescing_without_cache(self):
+        """use_cache=False always goes upstream"""
+        from src.api.api_manager import APIManager
+        
+        session = fake_session(delay=0.05)
+        manager = APIManager({'cache_path': None, 'session': session})
+        manager.fetch_many([{'url': 'http://x/a', 'use_cache': False}] * 4, max_workers=4)
+        
+        assert session.get.call_count == 4
+        assert manager.get_statistics()['coalesced_calls'] == 0
+    
+    def test_errors_are_shared_and_released(self):
+        """A failing leader propagates its exception and frees the key"""
+        import threading
+        from src.api.single_flight import SingleFlight
+        
+        flights = SingleFlight()
+        started = threading.Event()
+        
+        def fail():
+            started.set()
+            threading.Event().wait(0.1)
+            raise ValueError('upstream down')
+        
+        errors = []
+        
+        def follower():
+            started.wait()
+            try:
+                flights.do('k', lambda: 'not called')
+            except ValueError as e:
+                errors.append(e)
+        
+        thread = threading.Thread(target=follower)
+        thread.start()
+        with pytest.raises(ValueError):
+            flights.do('k', fail)
+        thread.join()
+        
+        assert len(errors) == 1
+        assert flights.do('k', lambda: 'fresh') == 'fresh'
+    
+    def test_async_callers_are_coalesced(self):
+        """Coroutines for the same resource share one request"""
+        import asyncio
+        from src.api.api_manager import APIManager
+        
+        session = fake_session(delay=0.1)
+        manager = APIManager({'cache_path': None, 'session': session})
+        
+        async def main():
+            return await asyncio.gather(*(manager.make_request_async('http://x/rates')
+                                          for _ in range(5)))
+        
+        results = asyncio.run(main())
+        assert session.get.call_count == 1
+        assert results == [{'url': 'http://x/rates'}] * 5
+        assert manager.get_statistics()['coalesced_calls'] == 4
+
+
+def http_response(status_code, headers=None):
+    """Minimal requests.Response with a JSON body"""
+    import requests
+    
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b'{"ok": true}'
+    response._content_consumed = True
+    return response
+
+
+class TestResilience:
+    """Tests for retries with backoff and per-host circuit breakers"""
+    
+    def test_backoff_is_jittered_and_bounded(self):
+        """Delays grow exponentially, stay within the cap and honour Retry-After"""
+        from src.api.resilience import RetryPolicy
+        
+        policy = RetryPolicy(attempts=5, backoff_base=1.0, backoff_max=4.0)
+        delays = [policy.delay(3) for _ in range(200)]
+        
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 100
+        assert policy.delay(0, retry_after=2.5) >= 2.5
+    
+    def test_get_is_retried_until_success(self):
+        """Transient 5xx and connection errors are retried for GET"""
+        import requests
+        from src.api.http_session import create_session
+        from src.api.resilience import Resilience, RetryPolicy
+        
+        session = create_session(resilience=Resilience(RetryPolicy(attempts=3, backoff_base=0.001)))
+        outcomes = [requests.exceptions.ConnectionError('reset'), http_response(503), http_response(200)]
+        with patch('requests.Session.request', side_effect=outcomes) as send:
+            response = session.get('https://api.example.com/rates')
+        
+        assert response.status_code == 200
+        assert send.call_count == 3
+        assert session.resilience.get_statistics()['retries'] == 2
+    
+    def test_post_is_not_retried(self):
+        """Non-idempotent methods get a single attempt"""
+        from src.api.http_session import create_session
+        from src.api.resilience import Resilience, RetryPolicy
+        
+        session = create_session(resilience=Resilience(RetryPolicy(attempts=3, backoff_base=0.001)))
+        with patch('requests.Session.request', return_value=http_response(503)) as send:
+            response = session.post('https://api.example.com/predict')
+        
+        assert response.status_code == 503
+        assert send.call_count == 1
+    
+    def test_circuit_opens_and_fails_fast(self):
+        """After repeated failures a host is rejected without a network call"""
+        import requests
+        from src.api.http_session import create_session
+        from src.api.resilience import Resilience, RetryPolicy, CircuitOpenError
+        
+        resilience = Resilience(RetryPolicy(attempts=1), failure_threshold=2, reset_timeout=60)
+        session = create_session(resilience=resilience)
+        with patch('requests.Session.request', side_effect=requests.exceptions.Timeout('slow')) as send:
+            for _ in range(2):
+                with pytest.raises(requests.exceptions.Timeout):
+                    session.get('https://down.example.com/a')
+            with pytest.raises(CircuitOpenError):
+                session.get('https://down.example.com/b')
+        
+        assert send.call_count == 2
+        stats = resilience.get_statistics()
+        assert stats['open_circuits'] == ['down.example.com'] and stats['rejected'] == 1
+        with patch('requests.Session.request', return_value=http_response(200)):
+            assert session.get('https://up.example.com/').status_code == 200
+    
+    def test_half_open_trial_closes_circuit(self):
+        """After reset_timeout one trial call is let through and closes the circuit"""
+        import time
+        from src.api.resilience import CircuitBreaker
+        
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        assert not breaker.allow()
+        time.sleep(0.06)
+        
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    
+    def test_any_request_error_ends_half_open_trial(self):
+        """A non-network RequestException on the trial re-opens, then the next trial passes"""
+        import requests
+        from src.api.http_session import create_session
+        from src.api.resilience import Resilience, RetryPolicy
+        
+        resilience = Resilience(RetryPolicy(attempts=1), failure_threshold=1, reset_timeout=0)
+        session = create_session(resilience=resilience)
+        resilience.breaker('https://flaky.example.com').record_failure()
+        with patch('requests.Session.request',
+                   side_effect=requests.exceptions.ChunkedEncodingError('cut')):
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                session.get('https://flaky.example.com/a')
+        
+        with patch('requests.Session.request', return_value=http_response(200)) as send:
+            for _ in range(3):
+                assert session.get('https://flaky.example.com/a').status_code == 200
+        assert send.call_count == 3
+        assert resilience.get_statistics()['open_circuits'] == []
+    
+    def test_long_retry_after_is_not_retried_in_session(self):
+        """A Retry-After beyond backoff_max is returned so the rate limiter defers the host"""
+        from src.api.api_manager import APIManager
+        from src.api.resilience import RetryPolicy
+        
+        assert RetryPolicy().delay(0, 120) == 120
+        manager = APIManager({'cache_path': None, 'retry_attempts': 3})
+        with patch('requests.Session.request',
+                   return_value=http_response(429, {'Retry-After': '120'})) as send, \
+                patch.object(manager.rate_limiter, 'defer') as defer:
+            result = manager.make_request('https://busy.example.com/x', use_cache=False)
+        
+        assert 'error' in result
+        assert send.call_count == 1
+        defer.assert_called_once_with('https://busy.example.com/x', 120.0)
+    
+    def test_retries_take_rate_limiter_tokens(self):
+        """Every attempt, not only the first, waits for a token of the host"""
+        from src.api.api_manager import APIManager
+        
+        manager = APIManager({'cache_path': None, 'retry_attempts': 3, 'retry_backoff': 0.001})
+        with patch('requests.Session.request',
+                   side_effect=[http_response(503), http_response(502), http_response(200)]) as send, \
+                patch.object(manager.rate_limiter, 'acquire', return_value=0.0) as acquire:
+            manager.make_request('https://api.example.com/rates', use_cache=False)
+        
+        assert send.call_count == 3
+        assert acquire.call_count == 3
+    
+    def test_manager_reads_retry_attempts_setting(self):
+        """etl.retry_attempts configures the manager's session"""
+        from src.api.api_manager import APIManager
+        from src.api.resilience import CircuitOpenError
+        
+        manager = APIManager({'cache_path': None, 'etl': {'retry_attempts': 4},
+                              'retry_backoff': 0.001, 'breaker_failures': 4})
+        assert manager.session.resilience.retry_policy.attempts == 4
+        
+        with patch('requests.Session.request', return_value=http_response(502)) as send:
+            first = manager.make_request('https://flaky.example.com/x', use_cache=False)
+            second = manager.make_request('https://flaky.example.com/x', use_cache=False)
+        
+        assert 'error' in first and 'Circuito abierto' in second['error']
+        assert send.call_count == 4
+        assert manager.get_statistics()['resilience']['open_circuits'] == ['flaky.example.com']
+    
+    def test_wrappers_return_error_when_circuit_open(self):
+        """API wrappers keep their error dict contract on a fast failure"""
+        from src.api.http_session import create_session
+        from src.api.resilience import Resilience
+        from src.api.news_api import NewsAPI
+        
+        resilience = Resilience()
+        for _ in range(resilience.failure_threshold):
+            resilience.breaker('https://newsapi.org').record_failure()
+        
+        with patch('requests.Session.request') as send:
+            result = NewsAPI(session=create_session(resilience=resilience)).get_news('5G')
+        
+        assert 'Circuito abierto' in result['error']
+        send.assert_not_called()
+
+
+class TestExchangeRates:
+    """Tests for cached rate tables and vectorized currency conversion"""
+    
+    RATES = {'base': 'USD', 'date': '2025-01-15', 'rates': {'EUR': 0.5, 'DOP': 60.0, 'USD': 1.0}}
+    
+    def test_rate_table_fetched_once_per_base(self):
+        """Repeated conversions reuse one rate table per base currency"""
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        session = fake_session(self.RATES)
+        api = ExchangeRatesAPI(session=session, snapshot_path=None)
+        
+        assert api.convert(10, 'USD', 'EUR') == pytest.approx(5.0)
+        assert api.convert(30, 'USD', 'DOP') == pytest.approx(1800.0)
+        assert session.get.call_count == 1
+    
+    def test_expired_table_is_refetched(self):
+        """A table older than the TTL triggers a new download"""
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        session = fake_session(self.RATES)
+        api = ExchangeRatesAPI(session=session, ttl=0, snapshot_path=None)
+        api.get_rate_table('USD')
+        api.get_rate_table('USD')
+        
+        assert session.get.call_count == 2
+    
+    def test_snapshot_fallback_rebases(self, tmp_path):
+        """When the API fails the local snapshot is used with cross rates"""
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        snapshot = tmp_path / 'exchange_rates.json'
+        snapshot.write_text(json.dumps(self.RATES))
+        session = MagicMock()
+        session.get.side_effect = ConnectionError('offline')
+        api = ExchangeRatesAPI(session=session, snapshot_path=str(snapshot))
+        
+        table = api.get_rate_table('EUR')
+        
+        assert table.source == 'snapshot' and table.base == 'EUR'
+        assert table.rate('EUR', 'USD') == pytest.approx(2.0)
+        assert api.convert(1, 'EUR', 'DOP') == pytest.approx(120.0)
+    
+    def test_fallback_served_until_offline_retry(self, tmp_path):
+        """After a failed refresh the fallback table is reused instead of calling the API again"""
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        snapshot = tmp_path / 'exchange_rates.json'
+        snapshot.write_text(json.dumps(self.RATES))
+        api = ExchangeRatesAPI(session=MagicMock(), snapshot_path=str(snapshot))
+        with patch.object(api, 'get_rates', return_value={'error': 'offline'}) as get_rates:
+            for _ in range(5):
+                assert api.convert(10, 'USD', 'EUR') == pytest.approx(5.0)
+        assert get_rates.call_count == 1
+        
+        stale = ExchangeRatesAPI(session=fake_session(self.RATES), ttl=60, snapshot_path=None)
+        stale.get_rate_table('USD').fetched_at -= 120
+        with patch.object(stale, 'get_rates', return_value={'error': 'offline'}) as get_rates:
+            for _ in range(3):
+                assert stale.get_rate_table('USD').source == 'api'
+        assert get_rates.call_count == 1
+    
+    def test_repo_snapshot_is_loadable(self):
+        """The bundled snapshot parses into a USD table"""
+        from src.api.exchange_rates import ExchangeRatesAPI, DEFAULT_SNAPSHOT_PATH
+        
+        path = os.path.join(os.path.dirname(__file__), '..', DEFAULT_SNAPSHOT_PATH)
+        table = ExchangeRatesAPI(session=MagicMock(), snapshot_path=path).load_snapshot('USD')
+        
+        assert table is not None and 'EUR' in table.rates
+    
+    def test_slow_download_does_not_block_other_bases(self):
+        """Concurrent requests for one base share a download; other bases proceed"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        def respond(url, **kwargs):
+            time.sleep(0.3 if url.endswith('/USD') else 0.0)
+            return Mock(json=lambda: self.RATES, raise_for_status=lambda: None)
+        
+        session = MagicMock()
+        session.get.side_effect = respond
+        api = ExchangeRatesAPI(session=session, snapshot_path=None)
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            slow = [pool.submit(api.get_rate_table, 'USD') for _ in range(3)]
+            time.sleep(0.05)
+            start = time.monotonic()
+            assert pool.submit(api.get_rate_table, 'EUR').result() is not None
+            assert time.monotonic() - start < 0.2
+            assert len({id(future.result()) for future in slow}) == 1
+        assert session.get.call_count == 2
+    
+    def test_convert_series_mixed_currencies(self):
+        """Mixed source currencies convert in one pass; unknown codes give NaN"""
+        import numpy as np
+        import pandas as pd
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        session = fake_session({'base': 'EUR', 'rates': {'USD': 2.0, 'DOP': 120.0}})
+        api = ExchangeRatesAPI(session=session, snapshot_path=None)
+        amounts = pd.Series([10.0, 120.0, 5.0, 7.0], index=[3, 4, 5, 6], name='MonthlyCharges')
+        currencies = pd.Series(['USD', 'DOP', 'EUR', 'XXX'], index=amounts.index)
+        
+        result = api.convert_series(amounts, currencies, 'EUR')
+        
+        assert list(result.index) == [3, 4, 5, 6] and result.name == 'MonthlyCharges'
+        np.testing.assert_allclose(result.iloc[:3], [5.0, 1.0, 5.0])
+        assert np.isnan(result.iloc[3])
+        assert session.get.call_count == 1
+    
+    def test_convert_frame(self):
+        """convert_frame adds converted columns from a currency column or code"""
+        import pandas as pd
+        from src.api.exchange_rates import ExchangeRatesAPI
+        
+        api = ExchangeRatesAPI(session=fake_session(self.RATES), snapshot_path=None)
+        df = pd.DataFrame({'MonthlyCharges': [10.0, 1.0], 'TotalCharges': ['20', ' '],
+                           'currency': ['USD', 'EUR']})
+        
+        by_column = api.convert_frame(df, ['MonthlyCharges', 'TotalCharges'], 'currency', 'EUR')
+        by_code = api.convert_frame(df, ['MonthlyCharges'], 'USD', 'DOP', suffix='')
+        
+        assert by_column['MonthlyCharges_EUR'].tolist() == pytest.approx([5.0, 1.0])
+        assert by_column['TotalCharges_EUR'].iloc[0] == pytest.approx(10.0)
+        assert pd.isna(by_column['TotalCharges_EUR'].iloc[1])
+        assert by_code['MonthlyCharges'].tolist() == pytest.approx([600.0, 60.0])
+        assert 'MonthlyCharges_EUR' not in df.columns
+
+
+def nominatim_session():
+    """Session double answering Nominatim search/reverse from the request params"""
+    def respond(url, params=None, **kwargs):
+        if url.endswith('/search'):
+            if params['q'].startswith('Nowhere'):
+                body = []
+            else:
+                body = [{'lat': '18.4861', 'lon': '-69.9312', 'display_name': params['q'].strip()}]
+        else:
+            body = {'display_name': f"Near {params['lat']},{params['lon']}"}
+        return Mock(json=lambda: body, raise_for_status=lambda: None)
+    
+    session = MagicMock()
+    session.get.side_effect = respond
+    return session
+
+
+class TestGeolocation:
+    """Tests for batch geocoding, its persistent cache and the spatial index"""
+    
+    def test_geocode_many_deduplicates(self):
+        """Each distinct address is requested once; order and misses are kept"""
+        from src.api.geolocation import GeolocationAPI
+        
+        session = nominatim_session()
+        api = GeolocationAPI(session=session, cache_path=None, rate_limit=1000)
+        
+        results = api.geocode_many(['Santo Domingo', 'santo  domingo ', 'Nowhere', 'Santo Domingo'])
+        
+        assert results[0] == results[1] == results[3] == (18.4861, -69.9312)
+        assert results[2] is None
+        assert session.get.call_count == 2
+        assert api.get_statistics()['deduplicated'] == 2
+    
+    def test_persistent_cache_survives_restart(self, tmp_path):
+        """A new instance on the same cache file geocodes without requests"""
+        from src.api.geolocation import GeolocationAPI
+        
+        path = str(tmp_path / 'api.sqlite')
+        GeolocationAPI(session=nominatim_session(), cache_path=path, rate_limit=1000).geocode_many(
+            ['Santo Domingo', 'Nowhere'])
+        
+        session = nominatim_session()
+        api = GeolocationAPI(session=session, cache_path=path, rate_limit=1000)
+        
+        assert api.geocode_many(['Santo Domingo', 'Nowhere']) == [(18.4861, -69.9312), None]
+        assert api.reverse_geocode(18.4862, -69.9312) == 'Santo Domingo'
+        session.get.assert_not_called()
+    
+    def test_reverse_geocode_uses_spatial_index(self):
+        """Coordinates near a known point resolve locally; far ones hit the API once"""
+        from src.api.geolocation import GeolocationAPI
+        
+        session = nominatim_session()
+        api = GeolocationAPI(session=session, cache_path=None, rate_limit=1000, index_radius_km=0.5)
+        api.geocode('Santo Domingo')
+        
+        results = api.reverse_geocode_many([(18.488, -69.931), (40.7128, -74.006), (40.7129, -74.006)])
+        
+        assert results[0] == 'Santo Domingo'
+        assert results[1] == results[2] == 'Near 40.7128,-74.006'
+        assert session.get.call_count == 2
+        assert api.get_statistics()['index_hits'] == 2
+    
+    def test_spatial_index_radius(self):
+        """The index only answers within the configured great-circle distance"""
+        from src.api.geolocation import SpatialIndex
+        
+        index = SpatialIndex()
+        assert index.nearest(0.0, 0.0) is None
+        index.add(0.0, 179.9999, 'antimeridian')
+        index.add(45.0, 10.0, 'north')
+        
+        # 0.0002 degrees of longitude at the equator ~ 22 m across the antimeridian
+        assert index.nearest(0.0, -179.9999, max_km=0.05) == 'antimeridian'
+        assert index.nearest(45.01, 10.0, max_km=0.5) is None
+        assert index.nearest(45.01, 10.0, max_km=2.0) == 'north'
+    
+    def test_geocode_is_throttled(self):
+        """Requests to the provider are spaced by the rate limit"""
+        import time
+        from src.api.geolocation import GeolocationAPI
+        
+        api = GeolocationAPI(session=nominatim_session(), cache_path=None, rate_limit=20)
+        start = time.monotonic()
+        api.geocode_many(['A', 'B', 'C'])
+        
+        assert time.monotonic() - start >= 0.09
+        assert api.get_statistics()['requests'] == 3
+
+
+def weather_session(delay=0.0, failing=()):
+    """Session double answering OpenWeatherMap /weather and /forecast by city"""
+    import time
+    
+    def respond(url, params=None, **kwargs):
+        time.sleep(delay)
+        city = params['q']
+        if city in failing:
+            raise ConnectionError(f'{city} unavailable')
+        if url.endswith('/forecast'):
+            body = {'city': {'name': city}, 'list': [{}] * params['cnt']}
+        else:
+            body = {'name': city, 'dt': 1736951400, 'main': {'temp': 28.5, 'humidity': 72},
+                    'weather': [{'main': 'Clouds', 'description': 'scattered clouds'}],
+                    'wind': {'speed': 4.3}}
+        return Mock(json=lambda: body, raise_for_status=lambda: None)
+    
+    session = MagicMock()
+    session.get.side_effect = respond
+    return session
+
+
+class TestWeather:
+    """Tests for time-bucketed weather caching and multi-city enrichment"""
+    
+    def test_current_weather_cached_within_bucket(self):
+        """Repeated calls in the same bucket reuse one response"""
+        from src.api.weather_data import WeatherAPI
+        
+        session = weather_session()
+        api = WeatherAPI(session=session)
+        api.get_weather('Lima')
+        api.get_weather('Lima')
+        api.get_weather('Lima', units='imperial')
+        
+        assert session.get.call_count == 2
+    
+    def test_new_bucket_refetches(self):
+        """Crossing a bucket boundary triggers a new request"""
+        from src.api.weather_data import WeatherAPI
+        
+        session = weather_session()
+        api = WeatherAPI(session=session, forecast_bucket=600)
+        with patch('src.api.weather_data.time.time', return_value=1200.0):
+            api.get_forecast('Lima')
+            api.get_forecast('Lima')
+        with patch('src.api.weather_data.time.time', return_value=1800.0):
+            api.get_forecast('Lima')
+        
+        assert session.get.call_count == 2
+    
+    def test_errors_are_not_cached(self):
+        """A failed city is retried on the next call"""
+        from src.api.weather_data import WeatherAPI
+        
+        session = weather_session(failing=('Atlantis',))
+        api = WeatherAPI(session=session)
+        
+        assert 'error' in api.get_weather('Atlantis')
+        assert 'error' in api.get_weather('Atlantis')
+        assert session.get.call_count == 2
+    
+    def test_get_weather_many_runs_concurrently(self):
+        """Cities are fetched in parallel and deduplicated"""
+        import time
+        from src.api.weather_data import WeatherAPI
+        
+        session = weather_session(delay=0.1)
+        api = WeatherAPI(session=session, max_workers=4)
+        start = time.monotonic()
+        weather = api.get_weather_many(['Lima', 'Quito', 'Bogotá', 'Lima', 'Caracas'])
+        
+        assert time.monotonic() - start < 0.3
+        assert weather['region'].tolist() == ['Lima', 'Quito', 'Bogotá', 'Caracas']
+        assert session.get.call_count == 4
+    
+    def test_get_weather_many_merges_onto_customers(self):
+        """The tidy frame joins onto customers by region in one merge"""
+        import pandas as pd
+        from src.api.weather_data import WeatherAPI, WEATHER_COLUMNS
+        
+        customers = pd.DataFrame({'customerID': ['C1', 'C2', 'C3'],
+                                  'region': ['Lima', 'Atlantis', 'Lima']})
+        api = WeatherAPI(session=weather_session(failing=('Atlantis',)))
+        
+        weather = api.get_weather_many(customers['region'].unique())
+        enriched = customers.merge(weather, on='region', how='left')
+        
+        assert list(weather.columns) == ['region'] + WEATHER_COLUMNS
+        assert len(enriched) == 3
+        assert enriched.loc[[0, 2], 'temp'].tolist() == [28.5, 28.5]
+        assert enriched.loc[0, 'weather'] == 'Clouds'
+        assert enriched.loc[0, 'observed_at'] == pd.Timestamp(1736951400, unit='s', tz='UTC')
+        assert pd.isna(enriched.loc[1, 'temp']) and 'unavailable' in enriched.loc[1, 'error']
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
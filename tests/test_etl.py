@@ -7,12 +7,26 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import json
 import sys
 import os
+from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.etl.extractor import DataExtractor
+from src.etl.transformer import DataTransformer
+from src.etl.validator import DataValidator
+from src.etl.loader import DataLoader
+from src.etl import loader as loader_module
+from src.etl.pipeline import ETLPipeline
+from src.etl.cache import PipelineCache
+from src.etl.checkpoint import CheckpointStore
+from src.etl.metrics import MetricsCollector
+from src.etl.mock_data import MockDataGenerator
+from src.etl.validation_profile import ValidationProfile, QuantileSketch, DistinctHashSet
+
 
 class TestExtractor:
     """Tests for data extraction module"""
@@ -59,6 +73,61 @@ class TestExtractor:
         assert 'customerID' not in result.columns
 
 
+class TestSchema:
+    """Tests for the declared Telecom X schema applied on extraction"""
+    
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        """Write a mock dataset with plain object columns to CSV"""
+        df = DataExtractor({'schema': False}).generate_mock_data(200)
+        path = tmp_path / "raw.csv"
+        df.to_csv(path, index=False)
+        return path
+    
+    def test_compact_dtypes_on_read(self, raw_csv):
+        """Low-cardinality strings become category and integers are downcast"""
+        df = DataExtractor().extract_from_csv(raw_csv)
+        
+        assert isinstance(df['Contract'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['Churn'].dtype, pd.CategoricalDtype)
+        assert df['SeniorCitizen'].dtype == np.int8
+        assert df['tenure'].dtype == np.int16
+        assert df['MonthlyCharges'].dtype == np.float64
+        assert (df['Churn'] == 'Yes').sum() > 0
+    
+    def test_optional_float32_and_bool_flags(self, raw_csv):
+        """float32 charges and bool flags are opt-in"""
+        extractor = DataExtractor({'float_dtype': 'float32', 'flag_dtype': 'bool'})
+        df = extractor.extract_from_csv(raw_csv)
+        
+        assert df['TotalCharges'].dtype == np.float32
+        assert df['Partner'].dtype == bool
+    
+    def test_bytes_saved_reported(self, raw_csv):
+        """get_data_info reports the memory saved by the schema"""
+        extractor = DataExtractor()
+        extractor.extract_from_csv(raw_csv)
+        info = extractor.get_data_info()
+        
+        plain = pd.read_csv(raw_csv).memory_usage(deep=True).sum()
+        assert info['schema_bytes_saved'] > plain / 2
+        assert info['schema_dtypes']['Gender'] == 'category'
+    
+    def test_unknown_categories_are_kept(self, tmp_path):
+        """Values outside the declared categories are not turned into NaN"""
+        path = tmp_path / "other.csv"
+        pd.DataFrame({'Contract': ['Month-to-month', 'Three year']}).to_csv(path, index=False)
+        
+        df = DataExtractor().extract_from_csv(path)
+        assert df['Contract'].isnull().sum() == 0
+        assert 'Three year' in df['Contract'].cat.categories
+    
+    def test_schema_can_be_disabled(self, raw_csv):
+        """schema=False keeps pandas' default inference"""
+        df = DataExtractor({'schema': False}).extract_from_csv(raw_csv)
+        assert df['Contract'].dtype == object
+
+
 class TestTransformer:
     """Tests for data transformation module"""
     
@@ -133,6 +202,253 @@ class TestTransformer:
         assert sample_data['MonthlyCharges'].min() >= 0, "Charges should be non-negative"
 
 
+class TestFusedTransformations:
+    """Tests for the fused execution of apply_all_transformations"""
+    
+    @pytest.fixture
+    def dirty_data(self):
+        """Mock data with a null value and duplicated rows"""
+        df = DataExtractor().generate_mock_data(300)
+        df.loc[3, 'TotalCharges'] = np.nan
+        return pd.concat([df, df.iloc[:5]], ignore_index=True)
+    
+    def test_fused_matches_sequential(self, dirty_data):
+        """Both execution modes produce the same frame"""
+        sequential = DataTransformer().apply_all_transformations(dirty_data, fused=False)
+        fused = DataTransformer().apply_all_transformations(dirty_data, fused=True)
+        
+        pd.testing.assert_frame_equal(
+            sequential.drop(columns='ProcessedAt'),
+            fused.drop(columns='ProcessedAt')
+        )
+        assert len(fused) == 299
+    
+    def test_fused_logs_same_steps(self, dirty_data):
+        """The transformation log is identical in both modes"""
+        sequential, fused = DataTransformer(), DataTransformer()
+        sequential.apply_all_transformations(dirty_data, fused=False)
+        fused.apply_all_transformations(dirty_data, fused=True)
+        
+        assert fused.get_transformation_log() == sequential.get_transformation_log()
+    
+    def test_fused_does_not_modify_input(self, dirty_data):
+        """The input frame is left untouched"""
+        before = dirty_data.copy()
+        DataTransformer().apply_all_transformations(dirty_data)
+        pd.testing.assert_frame_equal(dirty_data, before)
+
+
+class TestServiceMask:
+    """Tests for the packed service bitmask"""
+    
+    SERVICES = [
+        'PhoneService', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+        'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies'
+    ]
+    
+    @pytest.mark.parametrize('schema', [False, True])
+    def test_total_services_matches_string_count(self, schema):
+        """Bitmask popcount equals the per-column 'Yes' count"""
+        df = DataExtractor({'schema': schema}).generate_mock_data(500)
+        expected = sum((df[col].astype(str) == 'Yes').astype(int) for col in self.SERVICES)
+        
+        result = DataTransformer().calculate_total_services(df)
+        assert (result['TotalServices'].values == expected.values).all()
+    
+    def test_matrix_columns_follow_service_order(self):
+        """Unpacked matrix has one uint8 column per service"""
+        df = DataExtractor().generate_mock_data(50)
+        matrix = DataTransformer.service_matrix(df)
+        
+        assert matrix.shape == (50, len(self.SERVICES))
+        assert matrix.dtype == np.uint8
+        assert (matrix[:, 6] == (df['StreamingTV'] == 'Yes').values).all()
+    
+    def test_bundles_reuse_mask(self):
+        """Bundles are computed from ServiceMask when the column exists"""
+        transformer = DataTransformer()
+        df = transformer.create_service_mask(DataExtractor().generate_mock_data(200))
+        df = transformer.create_service_bundles(df.drop(columns=self.SERVICES))
+        
+        assert df['HasStreaming'].dtype == bool
+        assert df['HasStreaming'].sum() > df['HasProtectionBundle'].sum()
+    
+    def test_unknown_service(self):
+        """Unknown service names are rejected"""
+        df = DataExtractor().generate_mock_data(10)
+        with pytest.raises(ValueError):
+            DataTransformer.has_services(df, ['Satellite'])
+
+
+class TestFittedState:
+    """Tests for the fit/transform split of encoders and scalers"""
+    
+    @pytest.fixture
+    def data(self):
+        """Mock Telecom X data"""
+        return DataExtractor().generate_mock_data(400)
+    
+    def test_label_codes_match_label_encoder(self, data):
+        """Unfitted label encoding keeps LabelEncoder's class order"""
+        from sklearn.preprocessing import LabelEncoder
+        
+        encoded = DataTransformer().encode_categorical(data, ['PaymentMethod'])
+        expected = LabelEncoder().fit_transform(data['PaymentMethod'].astype(str))
+        assert (encoded['PaymentMethod_Encoded'].values == expected).all()
+    
+    def test_fitted_codes_are_stable_across_batches(self, data):
+        """A batch missing a category still gets the fitted codes"""
+        transformer = DataTransformer()
+        transformer.fit(data, categorical_columns=['Contract'], numeric_columns=['tenure'])
+        
+        batch = data[data['Contract'] != 'Month-to-month'].head(20)
+        encoded = transformer.encode_categorical(batch, ['Contract'])
+        codes = dict(zip(batch['Contract'].astype(str), encoded['Contract_Encoded']))
+        
+        assert codes['Two year'] == 2
+        assert codes['One year'] == 1
+    
+    def test_unseen_values_get_minus_one(self, data):
+        """Values not in the fitted vocabulary are encoded as -1"""
+        transformer = DataTransformer()
+        transformer.fit(data, categorical_columns=['Contract'], numeric_columns=[])
+        
+        batch = pd.DataFrame({'Contract': ['Three year', 'One year']})
+        encoded = transformer.encode_categorical(batch, ['Contract'])
+        assert list(encoded['Contract_Encoded']) == [-1, 1]
+    
+    def test_scaling_uses_fitted_statistics(self, data):
+        """Normalization of a batch uses the fitted min/max and mean/std"""
+        transformer = DataTransformer()
+        transformer.fit(data, categorical_columns=[], numeric_columns=['tenure'])
+        stats = transformer.fitted_state['numeric']['tenure']
+        
+        batch = pd.DataFrame({'tenure': [stats['min'], stats['max']]})
+        assert list(transformer.normalize_numeric(batch, ['tenure'])['tenure_Normalized']) == [0.0, 1.0]
+        
+        scaled = transformer.normalize_numeric(batch, ['tenure'], method='standard')['tenure_Scaled']
+        assert scaled.iloc[0] == pytest.approx((stats['min'] - stats['mean']) / stats['std'])
+    
+    def test_state_round_trip(self, data, tmp_path):
+        """Saved state is loaded by a new transformer via config"""
+        fitted = DataTransformer()
+        fitted.fit(data)
+        path = fitted.save_fitted_state(str(tmp_path / 'state.json'))
+        
+        restored = DataTransformer({'fitted_state_path': path})
+        assert restored.fitted_state['categorical'] == fitted.fitted_state['categorical']
+        
+        onehot = restored.encode_categorical(data.head(3), ['Contract'], method='onehot')
+        assert {'Contract_Month-to-month', 'Contract_One year', 'Contract_Two year'} <= set(onehot.columns)
+
+
+class TestValidationProfile:
+    """Tests for the shared single-pass validation profile"""
+    
+    @pytest.fixture
+    def data(self):
+        """Transformed mock data with a few rule violations"""
+        df = DataTransformer().apply_all_transformations(DataExtractor().generate_mock_data(500))
+        df.loc[df.index[:3], 'tenure'] = 0
+        df.loc[df.index[5], 'MonthlyCharges'] = -1.0
+        return df
+    
+    def test_profile_outliers_match_per_column_check(self, data):
+        """Batched IQR bounds give the same counts as detect_outliers_iqr"""
+        profile = DataValidator.numeric_profile(data)
+        validator = DataValidator()
+        
+        for col, stats in profile.items():
+            assert validator.detect_outliers_iqr(data, col)[1] == stats['outliers']
+        assert profile['tenure']['min'] == 0
+    
+    def test_full_validation_reads_profile(self, data):
+        """run_full_validation results agree with the individual checks"""
+        validator = DataValidator()
+        results = validator.run_full_validation(data)
+        
+        assert validator.profile['null_count'] == results['null_count'] == 0
+        assert results['unique_ids'] is True
+        assert results['business_rules_valid'] is False
+        assert 'MonthlyCharges <= 0: 1 registros' in results['errors']
+        assert 'tenure: 3 valores fuera de rango [1, 72]' in results['warnings']
+
+
+class TestMergeableProfile:
+    """Tests for the mergeable streaming validation profile"""
+    
+    @pytest.fixture
+    def data(self):
+        """Transformed mock data with rule violations and a repeated ID"""
+        df = DataTransformer().apply_all_transformations(DataExtractor().generate_mock_data(600))
+        df.loc[df.index[:3], 'tenure'] = 0
+        df.loc[df.index[5], 'MonthlyCharges'] = -1.0
+        df.loc[df.index[10], 'CustomerID'] = df.loc[df.index[400], 'CustomerID']
+        return df
+    
+    def test_chunked_profile_matches_full_validation(self, data):
+        """Small inputs stay exact: merged chunks equal run_full_validation"""
+        expected = DataValidator().run_full_validation(data)
+        
+        profile = ValidationProfile()
+        for start in range(0, len(data), 250):
+            profile.merge(ValidationProfile().update(data.iloc[start:start + 250]))
+        results = DataValidator().run_profile_validation(profile)
+        
+        assert results == expected
+    
+    def test_cross_chunk_duplicates_are_counted(self, data):
+        """Row and ID hashes are global, not local to each chunk"""
+        profile = ValidationProfile()
+        profile.update(data.iloc[:300]).update(data.iloc[250:])
+        profile_dict = profile.as_dict()
+        
+        assert profile_dict['duplicate_count'] == 50
+        assert profile_dict['unique_ids']['CustomerID'] == len(data) - 1
+    
+    def test_sketch_error_within_bound(self):
+        """Compacted quantiles stay within the documented rank error"""
+        values = np.random.default_rng(0).lognormal(size=200_000)
+        sketch = QuantileSketch(size=256)
+        for part in np.array_split(values, 7):
+            other = QuantileSketch(size=256)
+            other.update(part)
+            sketch.merge(other)
+        
+        assert not sketch.is_exact
+        assert sketch.count == len(values)
+        epsilon = np.log2(len(values) / 256) / 256
+        for q, estimate in zip([0.25, 0.75], sketch.quantile([0.25, 0.75])):
+            rank = (values < estimate).mean()
+            assert abs(rank - q) <= epsilon
+        
+        lower, upper = np.quantile(values, [0.01, 0.99])
+        exact = int(((values < lower) | (values > upper)).sum())
+        assert abs(sketch.count_outside(lower, upper) - exact) <= 2 * epsilon * len(values)
+    
+    def test_merged_profile_is_independent(self, data):
+        """Merging copies sketches: later merges leave the source profile intact"""
+        partial = ValidationProfile().update(data.iloc[:200])
+        before = {col: sketch.count for col, sketch in partial.sketches.items()}
+        
+        merged = ValidationProfile().merge(partial)
+        merged.merge(ValidationProfile().update(data.iloc[200:]))
+        
+        assert {col: sketch.count for col, sketch in partial.sketches.items()} == before
+        assert all(merged.sketches[col] is not sketch for col, sketch in partial.sketches.items())
+    
+    def test_hash_set_merge(self):
+        """Distinct counts survive merges across workers"""
+        left, right = DistinctHashSet(), DistinctHashSet()
+        left.add(np.arange(100, dtype=np.uint64))
+        right.add(np.arange(50, 150, dtype=np.uint64))
+        right.add(np.arange(50, 60, dtype=np.uint64))
+        left.merge(right)
+        
+        assert left.distinct() == 150
+        assert left.duplicates() == 60
+
+
 class TestLoader:
     """Tests for data loading module"""
     
@@ -171,6 +487,174 @@ class TestLoader:
         
         with pytest.raises(Exception):
             df.to_csv("/invalid/path/file.csv")
+    
+    def test_save_all_formats_reports_timings(self, tmp_path):
+        """Formats are written concurrently, with per-format timings"""
+        loader = DataLoader(output_dir=str(tmp_path))
+        df = DataExtractor().generate_mock_data(50)
+        paths = loader.save_all_formats(df, 'out', skip=['excel'], defer=['parquet'])
+        
+        assert set(paths) == {'csv', 'metadata'}
+        assert set(loader.last_timings) == {'csv', 'metadata'}
+        assert loader.last_deferred == ['parquet']
+        
+        deferred = loader.wait_deferred()
+        assert set(deferred) == {'parquet'}
+        assert set(loader.last_timings) == {'parquet'}
+        assert len(pd.read_parquet(deferred['parquet'])) == 50
+        assert not loader.deferred
+    
+    def test_failed_format_waits_for_other_writers(self, tmp_path, monkeypatch):
+        """A writer error is raised only after the other writers have finished"""
+        import time
+        loader = DataLoader(output_dir=str(tmp_path))
+        df = DataExtractor().generate_mock_data(20)
+        save_to_csv = loader.save_to_csv
+        
+        def slow_csv(*args, **kwargs):
+            time.sleep(0.3)
+            return save_to_csv(*args, **kwargs)
+        
+        def broken_parquet(*args, **kwargs):
+            raise OSError('disk full')
+        
+        monkeypatch.setattr(loader, 'save_to_csv', slow_csv)
+        monkeypatch.setattr(loader, 'save_to_parquet', broken_parquet)
+        with pytest.raises(OSError):
+            loader.save_all_formats(df, 'out', formats=['parquet', 'csv', 'metadata'],
+                                    defer=['metadata'])
+        
+        assert (tmp_path / 'out.csv').exists()
+        assert set(loader.deferred) == {'metadata'}
+        loader.wait_deferred()
+    
+    def test_excel_written_with_stream_writer(self, tmp_path, monkeypatch):
+        """Excel is written in its writer thread with the streaming writer"""
+        calls = []
+        write_excel_chunks = loader_module.write_excel_chunks
+        monkeypatch.setattr(loader_module, 'write_excel_chunks',
+                            lambda *args, **kwargs: calls.append(args) or write_excel_chunks(*args, **kwargs))
+        loader = DataLoader(output_dir=str(tmp_path))
+        df = DataExtractor().generate_mock_data(20)
+        paths = loader.save_all_formats(df, 'out', formats=['excel'])
+        
+        assert len(pd.read_excel(paths['excel'])) == 20
+        assert paths['excel'] in loader.get_loaded_files()
+        assert len(calls) == 1
+    
+    def test_excel_stream_splits_sheets(self, tmp_path):
+        """Rows beyond the per-sheet limit continue on a new sheet"""
+        df = DataExtractor().generate_mock_data(25)
+        path = tmp_path / 'split.xlsx'
+        result = loader_module.write_excel_chunks(
+            loader_module.iter_frame_chunks(df, chunksize=7), str(path), max_rows=11
+        )
+        
+        assert result['sheets'] == ['Data', 'Data_2', 'Data_3']
+        sheets = pd.read_excel(path, sheet_name=None)
+        assert [len(sheet) for sheet in sheets.values()] == [10, 10, 5]
+        assert list(sheets['Data_3'].columns) == list(df.columns)
+    
+    def test_streaming_excel_matches_to_excel(self, tmp_path):
+        """The streaming writer produces the same cells as to_excel"""
+        df = DataExtractor().generate_mock_data(30)
+        df.loc[df.index[0], 'TotalCharges'] = np.nan
+        loader = DataLoader(output_dir=str(tmp_path))
+        
+        streamed = pd.read_excel(loader.save_to_excel(df, 'stream.xlsx', streaming=True))
+        regular = pd.read_excel(loader.save_to_excel(df, 'regular.xlsx', streaming=False))
+        pd.testing.assert_frame_equal(streamed, regular)
+    
+    def test_failed_stream_discards_excel(self, tmp_path):
+        """A failing chunk discards the write-only workbook and leaves no .xlsx"""
+        df = DataExtractor().generate_mock_data(20)
+        
+        def chunks():
+            yield df.iloc[:10]
+            raise RuntimeError('source failed')
+        
+        with pytest.raises(RuntimeError):
+            DataLoader(output_dir=str(tmp_path)).save_chunks(chunks(), 'out', formats=['csv', 'excel'])
+        
+        assert not (tmp_path / 'out.xlsx').exists()
+    
+    def test_unknown_format(self, tmp_path):
+        """Unsupported formats are rejected"""
+        with pytest.raises(ValueError):
+            DataLoader(output_dir=str(tmp_path)).save_all_formats(pd.DataFrame(), 'out', formats=['xml'])
+
+
+class TestParquetDataset:
+    """Tests for the Hive-partitioned Parquet dataset writer and reader"""
+    
+    @pytest.fixture
+    def dataset(self, tmp_path):
+        """Write transformed mock data as a partitioned dataset"""
+        df = DataTransformer().apply_all_transformations(DataExtractor().generate_mock_data(2000))
+        loader = DataLoader(output_dir=str(tmp_path))
+        path = loader.save_parquet_dataset(df, 'churn', processing_date='2025-01-15',
+                                           row_group_size=100, sort_by=['tenure'])
+        return df, path
+    
+    def test_hive_layout(self, dataset):
+        """Partition keys become key=value directories"""
+        df, path = dataset
+        files = list(Path(path).rglob('*.parquet'))
+        
+        assert all('ProcessingDate=2025-01-15' in str(f) for f in files)
+        assert any('Contract=Month-to-month' in str(f) for f in files)
+        assert len({f.parent for f in files}) <= df.groupby(
+            ['Contract', 'InternetService', 'TenureGroup'], observed=True).ngroups
+    
+    def test_filters_prune_partitions(self, dataset):
+        """Filtered reads only open matching partitions and return matching rows"""
+        df, path = dataset
+        extractor = DataExtractor()
+        result = extractor.extract_from_parquet_dataset(
+            path,
+            columns=['CustomerID', 'tenure', 'Contract'],
+            filters=[('Contract', '==', 'Month-to-month'),
+                     ('InternetService', '==', 'Fiber optic'),
+                     ('tenure', '>', 48)]
+        )
+        expected = df[(df['Contract'] == 'Month-to-month') &
+                      (df['InternetService'] == 'Fiber optic') & (df['tenure'] > 48)]
+        
+        assert list(result.columns) == ['CustomerID', 'tenure', 'Contract']
+        assert sorted(result['CustomerID']) == sorted(expected['CustomerID'])
+        stats = extractor.dataset_stats
+        assert stats['files_read'] < stats['files_total']
+    
+    def test_round_trip(self, dataset):
+        """Unfiltered reads return every row and partition column"""
+        df, path = dataset
+        result = DataExtractor().extract_from_parquet_dataset(path)
+        
+        assert len(result) == len(df)
+        assert (result['ProcessingDate'] == '2025-01-15').all()
+        assert result['MonthlyCharges'].sum() == pytest.approx(df['MonthlyCharges'].sum())
+    
+    def test_rerun_replaces_whole_date(self, dataset, tmp_path):
+        """A same-day re-run drops partitions missing from the new data; other dates stay"""
+        df, path = dataset
+        loader = DataLoader(output_dir=str(tmp_path))
+        loader.save_parquet_dataset(df.head(50), 'churn', processing_date='2025-01-16')
+        
+        subset = df[df['Contract'] == 'Two year']
+        loader.save_parquet_dataset(subset, 'churn', processing_date='2025-01-15')
+        result = DataExtractor().extract_from_parquet_dataset(path)
+        
+        today = result[result['ProcessingDate'] == '2025-01-15']
+        assert len(today) == len(subset)
+        assert set(today['Contract']) == {'Two year'}
+        assert (result['ProcessingDate'] == '2025-01-16').sum() == 50
+        assert not any(Path(path, 'Contract=Month-to-month').rglob('ProcessingDate=2025-01-15'))
+    
+    def test_missing_partition_column(self, tmp_path):
+        """Unknown partition keys are rejected"""
+        loader = DataLoader(output_dir=str(tmp_path))
+        with pytest.raises(ValueError):
+            loader.save_parquet_dataset(pd.DataFrame({'a': [1]}), 'bad', partition_cols=['Region'])
 
 
 class TestPipeline:
@@ -218,6 +702,369 @@ class TestPipeline:
         assert (df['MonthlyCharges'] < 0).any(), "Should detect negative charges"
 
 
+class TestPipelineCache:
+    """Tests for the content-hash pipeline result cache"""
+    
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        """Write a mock dataset to CSV"""
+        path = tmp_path / "raw.csv"
+        DataExtractor().generate_mock_data(150).to_csv(path, index=False)
+        return path
+    
+    def make_pipeline(self, tmp_path, **transformer_config):
+        """Pipeline with the cache enabled under tmp_path"""
+        return ETLPipeline({
+            'output_dir': str(tmp_path / 'out'),
+            'cache_dir': str(tmp_path / 'cache'),
+            'transformer': transformer_config,
+            'etl': {'cache_enabled': True, 'output_formats': ['csv', 'parquet', 'metadata']},
+        })
+    
+    @staticmethod
+    def restored_steps(results):
+        return [entry['step'] for entry in results['execution_log']
+                if entry['origin'] == 'cache']
+    
+    def test_unchanged_input_short_circuits(self, raw_csv, tmp_path):
+        """A second run reuses every stage and leaves the outputs untouched"""
+        first = self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        csv_mtime = Path(first['output_files']['csv']).stat().st_mtime_ns
+        
+        second = self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        
+        assert self.restored_steps(first) == []
+        assert self.restored_steps(second) == ['Extracción', 'Transformación', 'Validación', 'Carga']
+        assert second['validation_results'] == first['validation_results']
+        assert second['records_loaded'] == first['records_loaded']
+        assert Path(second['output_files']['csv']).stat().st_mtime_ns == csv_mtime
+    
+    def test_config_change_recomputes_downstream(self, raw_csv, tmp_path):
+        """Changing the transformer config reuses the extraction only"""
+        self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        results = self.make_pipeline(tmp_path, fused=False).run_full_pipeline(
+            'csv', filepath=str(raw_csv))
+        
+        assert self.restored_steps(results) == ['Extracción']
+    
+    def test_changed_input_misses(self, raw_csv, tmp_path):
+        """New file contents produce new keys"""
+        self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        DataExtractor().generate_mock_data(120).to_csv(raw_csv, index=False)
+        results = self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        
+        assert self.restored_steps(results) == []
+        assert results['records_extracted'] == 120
+    
+    def test_overwritten_outputs_rerun_load(self, raw_csv, tmp_path):
+        """A cache hit whose files were rewritten by another run reloads them"""
+        DataExtractor().generate_mock_data(300).to_csv(tmp_path / 'other.csv', index=False)
+        self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(tmp_path / 'other.csv'))
+        
+        results = self.make_pipeline(tmp_path).run_full_pipeline('csv', filepath=str(raw_csv))
+        
+        assert 'Carga' not in self.restored_steps(results)
+        assert 'Transformación' in self.restored_steps(results)
+        assert len(pd.read_csv(results['output_files']['csv'])) == results['records_loaded'] == 150
+    
+    def test_lru_eviction(self, tmp_path):
+        """The cache never holds more than max_entries entries"""
+        cache = PipelineCache(str(tmp_path / 'cache'), max_entries=2)
+        for i in range(3):
+            cache.put_json(f'key{i}', 'validate', {'i': i})
+        cache.get_json('key1')
+        cache.put_json('key3', 'validate', {'i': 3})
+        
+        assert cache.get_json('key0') is None
+        assert cache.get_json('key2') is None
+        assert cache.get_json('key1') == {'i': 1}
+        assert cache.get_statistics()['evictions'] == 2
+
+
+class TestCheckpoints:
+    """Tests for per-stage checkpoints and resume"""
+    
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        """Write a mock dataset to CSV"""
+        path = tmp_path / "raw.csv"
+        DataExtractor().generate_mock_data(150).to_csv(path, index=False)
+        return path
+    
+    def make_pipeline(self, tmp_path, **etl_settings):
+        """Pipeline with checkpoints under tmp_path"""
+        return ETLPipeline({
+            'output_dir': str(tmp_path / 'out'),
+            'checkpoint_dir': str(tmp_path / 'checkpoints'),
+            'etl': {'checkpoint_enabled': True, 'output_formats': ['csv'], **etl_settings},
+        })
+    
+    def failing_load(self, tmp_path, raw_csv, monkeypatch):
+        """Run a pipeline whose load step crashes"""
+        pipeline = self.make_pipeline(tmp_path)
+        def crash(*args, **kwargs):
+            raise OSError("disk full")
+        monkeypatch.setattr(pipeline.loader, 'save_all_formats', crash)
+        return pipeline.run_full_pipeline('csv', filepath=str(raw_csv))
+    
+    def test_resume_after_failed_load(self, tmp_path, raw_csv, monkeypatch):
+        """Completed stages are restored from Arrow checkpoints"""
+        failed = self.failing_load(tmp_path, raw_csv, monkeypatch)
+        assert failed['success'] is False
+        assert (tmp_path / 'checkpoints' / 'telecom_churn_processed' / 'transform.arrow').exists()
+        
+        results = self.make_pipeline(tmp_path).run_full_pipeline(
+            'csv', filepath=str(raw_csv), resume=True)
+        origins = {entry['step']: entry['origin'] for entry in results['execution_log']}
+        
+        assert results['success'] is True
+        assert origins == {'Extracción': 'skipped', 'Transformación': 'checkpoint',
+                           'Validación': 'checkpoint', 'Carga': 'computed'}
+        assert results['records_extracted'] == 150
+        assert not (tmp_path / 'checkpoints' / 'telecom_churn_processed').exists()
+    
+    def test_changed_input_is_not_resumed(self, tmp_path, raw_csv, monkeypatch):
+        """Checkpoints from another input are ignored"""
+        self.failing_load(tmp_path, raw_csv, monkeypatch)
+        DataExtractor().generate_mock_data(90).to_csv(raw_csv, index=False)
+        
+        results = self.make_pipeline(tmp_path).run_full_pipeline(
+            'csv', filepath=str(raw_csv), resume=True)
+        
+        assert {entry['origin'] for entry in results['execution_log']} == {'computed'}
+        assert results['records_extracted'] == 90
+    
+    def test_checkpoint_round_trip(self, tmp_path):
+        """Feather checkpoints keep dtypes and metadata"""
+        df = DataTransformer().apply_all_transformations(DataExtractor().generate_mock_data(40))
+        store = CheckpointStore('run', 'sig', str(tmp_path))
+        store.save_frame('transform', df, {'records_extracted': 40})
+        
+        restored, meta = CheckpointStore('run', 'sig', str(tmp_path)).load_frame('transform')
+        pd.testing.assert_frame_equal(restored, df)
+        assert meta == {'records_extracted': 40}
+        assert CheckpointStore('run', 'other', str(tmp_path)).load_frame('transform') is None
+
+
+class TestMetrics:
+    """Tests for stage and method metrics"""
+    
+    def test_pipeline_records_stage_and_method_metrics(self, tmp_path):
+        """Each stage and transformer step gets a structured record"""
+        pipeline = ETLPipeline({
+            'output_dir': str(tmp_path),
+            'etl': {'output_formats': ['csv'], 'prometheus_textfile': str(tmp_path / 'etl.prom')},
+        })
+        results = pipeline.run_full_pipeline('mock', n_records=100, base_filename='m')
+        
+        stages = {r['name']: r for r in results['metrics'] if r['kind'] == 'stage'}
+        assert list(stages) == ['extract', 'transform', 'validate', 'load']
+        assert stages['transform']['rows_in'] == 100
+        assert stages['transform']['rows_out'] == results['records_loaded']
+        assert stages['transform']['bytes_out'] > 0
+        assert stages['extract']['cpu_seconds'] >= 0
+        assert stages['extract']['traced_peak_bytes'] is None
+        assert 'method:fused_materialize' in results['metrics_summary']
+        
+        summary = pipeline.get_execution_summary()
+        assert summary['metrics'] == results['metrics']
+        
+        logged = json.loads((tmp_path / 'm_pipeline_log.json').read_text(encoding='utf-8'))
+        assert len(logged['metrics']) == len(results['metrics'])
+        
+        prom = (tmp_path / 'etl.prom').read_text(encoding='utf-8')
+        assert '# TYPE etl_wall_seconds gauge' in prom
+        assert 'etl_rows_out{kind="stage",name="transform",pipeline="m"}' in prom
+    
+    def test_sequential_methods_are_measured(self):
+        """The sequential chain records one entry per public method"""
+        transformer = DataTransformer({'fused': False})
+        transformer.metrics = MetricsCollector()
+        transformer.apply_all_transformations(DataExtractor().generate_mock_data(50))
+        
+        names = [r['name'] for r in transformer.metrics.records]
+        assert names[:3] == ['clean_column_names', 'handle_missing_values', 'remove_duplicates']
+        assert names[-1] == 'add_timestamp'
+    
+    def test_traced_peak_includes_nested_blocks(self):
+        """An outer block's traced peak covers allocations in inner blocks"""
+        metrics = MetricsCollector(trace_memory=True)
+        with metrics.measure('outer'):
+            with metrics.measure('inner', 'method'):
+                buffer = bytearray(5_000_000)
+                del buffer
+        
+        inner, outer = metrics.records
+        assert inner['traced_peak_bytes'] >= 5_000_000
+        assert outer['traced_peak_bytes'] >= inner['traced_peak_bytes']
+
+
+class TestStreaming:
+    """Tests for chunked (streaming) extraction and pipeline"""
+    
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        """Write a mock Telecom X dataset to CSV"""
+        df = DataExtractor().generate_mock_data(250)
+        path = tmp_path / "raw.csv"
+        df.to_csv(path, index=False)
+        return path
+    
+    def test_chunks_respect_chunksize(self, raw_csv):
+        """Chunks never exceed chunksize and nothing is kept in memory"""
+        extractor = DataExtractor({'batch_size': 100})
+        sizes = [len(chunk) for chunk in extractor.extract_from_csv_chunks(raw_csv)]
+        
+        assert sizes == [100, 100, 50]
+        assert extractor.data is None
+        assert extractor.get_data_info()['rows'] == 250
+    
+    def test_chunks_share_first_chunk_dtypes(self, tmp_path):
+        """Later chunks are cast to the dtypes of the first chunk"""
+        path = tmp_path / "mixed.csv"
+        pd.DataFrame({'x': [1.5, 2.5, 3, 4]}).to_csv(path, index=False)
+        
+        chunks = list(DataExtractor().extract_from_csv_chunks(path, chunksize=2))
+        assert all(chunk['x'].dtype == np.float64 for chunk in chunks)
+    
+    def test_invalid_chunksize(self, raw_csv):
+        """A non-positive chunksize is rejected"""
+        with pytest.raises(ValueError):
+            next(DataExtractor().extract_from_csv_chunks(raw_csv, chunksize=0))
+    
+    def test_streaming_pipeline_matches_row_count(self, raw_csv, tmp_path):
+        """Streaming pipeline writes every row across all chunks"""
+        pipeline = ETLPipeline({'output_dir': str(tmp_path / 'out'), 'etl': {'batch_size': 80}})
+        results = pipeline.run_streaming_pipeline(raw_csv, base_filename='stream')
+        
+        assert results['success'], results.get('error')
+        assert results['chunks_processed'] == 4
+        assert results['records_extracted'] == 250
+        assert results['validation_results']['total_records'] == results['records_loaded']
+        
+        written = pd.read_csv(results['output_files']['csv'])
+        assert len(written) == results['records_loaded']
+        assert len(pd.read_parquet(results['output_files']['parquet'])) == len(written)
+    
+    def test_streaming_writes_excel(self, raw_csv, tmp_path):
+        """Excel is written chunk by chunk with write-only sheets"""
+        pipeline = ETLPipeline({'output_dir': str(tmp_path / 'out')})
+        results = pipeline.run_streaming_pipeline(raw_csv, chunksize=64, formats=['excel'])
+        
+        assert results['success'] is True
+        assert len(pd.read_excel(results['output_files']['excel'])) == results['records_loaded']
+    
+    def test_streaming_rejects_unknown_format(self, raw_csv, tmp_path):
+        """Unsupported streaming formats fail the run"""
+        pipeline = ETLPipeline({'output_dir': str(tmp_path / 'out')})
+        results = pipeline.run_streaming_pipeline(raw_csv, formats=['xml'])
+        assert results['success'] is False
+
+
+class TestPartitionedPipeline:
+    """Tests for process-pool partitioned execution"""
+    
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        """Mock data with duplicates spread across partitions"""
+        df = DataExtractor().generate_mock_data(600)
+        df = pd.concat([df, df.iloc[[5, 450]]], ignore_index=True)
+        path = tmp_path / "raw.csv"
+        df.to_csv(path, index=False)
+        return path
+    
+    def _read_output(self, results):
+        return pd.read_csv(results['output_files']['csv']).drop(columns='ProcessedAt')
+    
+    def test_row_partitions_match_serial_run(self, raw_csv, tmp_path):
+        """Row-range partitions give the same output and validation as the serial run"""
+        serial = ETLPipeline({'output_dir': str(tmp_path / 'serial')}).run_full_pipeline(
+            'csv', filepath=str(raw_csv))
+        partitioned = ETLPipeline({'output_dir': str(tmp_path / 'part')}).run_partitioned_pipeline(
+            'csv', filepath=str(raw_csv), n_partitions=3, max_workers=2)
+        
+        assert partitioned['success'], partitioned.get('error')
+        assert partitioned['records_loaded'] == serial['records_loaded'] == 600
+        pd.testing.assert_frame_equal(self._read_output(serial), self._read_output(partitioned))
+        
+        expected = dict(serial['validation_results'])
+        actual = dict(partitioned['validation_results'])
+        assert actual.pop('partitions') == 3
+        assert actual == expected
+    
+    def test_file_shards(self, raw_csv, tmp_path):
+        """Each file is one partition, extracted inside its worker"""
+        df = pd.read_csv(raw_csv)
+        shards = []
+        for i, part in enumerate([df.iloc[:300], df.iloc[300:]]):
+            shards.append(str(tmp_path / f'shard_{i}.csv'))
+            part.to_csv(shards[-1], index=False)
+        
+        results = ETLPipeline({'output_dir': str(tmp_path / 'out')}).run_partitioned_pipeline(
+            'csv', filepath=shards, max_workers=2)
+        
+        assert results['success'], results.get('error')
+        assert results['partitions'] == 2
+        assert results['records_extracted'] == 602
+        assert results['records_loaded'] == 600
+
+
+class TestMockDataGenerator:
+    """Tests for the sharded, seeded mock data generator"""
+    
+    def test_same_seed_same_data_for_any_worker_count(self):
+        """Shards are seeded by index, so the worker count does not change the data"""
+        generator = MockDataGenerator(seed=7, shard_size=300)
+        serial = generator.generate(1000, workers=1)
+        parallel = generator.generate(1000, workers=3)
+        
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert not serial.equals(MockDataGenerator(seed=8, shard_size=300).generate(1000))
+    
+    def test_emits_schema_dtypes(self):
+        """Categorical columns come out as codes with the declared categories"""
+        df = MockDataGenerator(shard_size=250).generate(1000)
+        
+        assert list(df.index) == list(range(1000))
+        assert df['CustomerID'].iloc[0] == 'CUST00001'
+        assert df['CustomerID'].is_unique
+        assert list(df['Contract'].cat.categories) == ['Month-to-month', 'One year', 'Two year']
+        assert df['Contract'].cat.codes.dtype == np.int8
+        assert df['tenure'].dtype == np.int16
+        assert df['tenure'].between(1, 72).all()
+    
+    def test_extractor_does_not_touch_global_state(self):
+        """generate_mock_data is reproducible without np.random.seed"""
+        np.random.seed(0)
+        state = np.random.get_state()[1].copy()
+        first = DataExtractor().generate_mock_data(200)
+        
+        assert (np.random.get_state()[1] == state).all()
+        pd.testing.assert_frame_equal(first, DataExtractor().generate_mock_data(200))
+    
+    def test_plain_types_without_schema(self):
+        """schema=False keeps the object/int64 columns of a CSV read without schema"""
+        df = DataExtractor({'schema': False}).generate_mock_data(100)
+        
+        assert df['Churn'].dtype == object
+        assert df['tenure'].dtype == np.int64
+    
+    def test_write_parquet_dataset(self, tmp_path):
+        """Workers write their shards straight into a Hive-partitioned dataset"""
+        generator = MockDataGenerator(seed=3, shard_size=400, workers=2)
+        summary = generator.write_parquet_dataset(1000, tmp_path / 'mock', row_group_size=100)
+        
+        assert summary['rows'] == 1000
+        assert summary['shards'] == 3
+        assert any('Contract=Month-to-month' in str(f) for f in (tmp_path / 'mock').rglob('*.parquet'))
+        
+        df = DataExtractor().extract_from_parquet_dataset(str(tmp_path / 'mock'))
+        expected = generator.generate(1000)
+        assert sorted(df['CustomerID']) == sorted(expected['CustomerID'])
+        assert df['TotalCharges'].sum() == pytest.approx(expected['TotalCharges'].sum())
+
+
 # Pytest fixtures
 @pytest.fixture
 def mock_customer_data():
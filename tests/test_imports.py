@@ -0,0 +1,86 @@
+"""
+Import-time tests for the src package
+Leaf modules must not pull in the heavy dependencies of other subpackages
+"""
+
+import pytest
+import subprocess
+import sys
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly', 'requests', 'openpyxl', 'reportlab', 'sklearn']
+
+SUBPACKAGES = ['etl', 'api', 'analysis', 'visualization', 'reports', 'ml', 'i18n', 'utils']
+
+# Límite holgado para importar un módulo hoja de solo stdlib (segundos)
+LEAF_IMPORT_BUDGET = 1.0
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter rooted at the repository"""
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def loaded_heavy_modules(statement: str) -> list:
+    """Heavy modules present in sys.modules after running statement"""
+    code = (f"import sys\n{statement}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    output = run_python(code).stdout.strip()
+    return [m for m in output.split(',') if m]
+
+
+class TestLazyImports:
+    """Tests for PEP 562 lazy attributes in src and its subpackages"""
+
+    @pytest.mark.parametrize('statement', [
+        'import src',
+        'import src.utils.helpers',
+        'import src.utils.config',
+        'import src.i18n.translator',
+    ] + [f'import src.{name}' for name in SUBPACKAGES])
+    def test_no_heavy_dependencies(self, statement):
+        """Importing a package or a stdlib-only leaf loads none of the heavy libraries"""
+        assert loaded_heavy_modules(statement) == []
+
+    def test_leaf_import_time(self):
+        """Cumulative import time of src.utils.helpers stays within budget"""
+        result = run_python('import src.utils.helpers', '-X', 'importtime')
+
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 3 and parts[1].isdigit():
+                cumulative[parts[2]] = int(parts[1])
+
+        assert cumulative['src.utils.helpers'] / 1e6 < LEAF_IMPORT_BUDGET
+
+    @pytest.mark.parametrize('package', ['src'] + [f'src.{name}' for name in SUBPACKAGES])
+    def test_lazy_attributes_listed(self, package):
+        """Lazy components stay in __all__ and dir() before being imported"""
+        code = (f"import {package} as p\n"
+                f"assert set(p.__all__) - {{'__version__', '__author__'}} <= set(dir(p))\n"
+                f"assert 'ETLPipeline' not in vars(p)")
+        run_python(code)
+
+    def test_unknown_attribute(self):
+        """Unknown names still raise AttributeError"""
+        import src
+        with pytest.raises(AttributeError):
+            src.NotAComponent
+
+    def test_lazy_attribute_resolves(self):
+        """First access imports the component and caches it on the package"""
+        import src
+        from src.etl.pipeline import ETLPipeline
+
+        assert src.ETLPipeline is ETLPipeline
+        assert vars(src)['ETLPipeline'] is ETLPipeline
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
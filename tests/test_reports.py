@@ -138,6 +138,18 @@ class TestReportExport:
         assert len(sheets) == 3
         assert all('name' in s for s in sheets)
     
+    def test_export_excel_streaming(self, tmp_path):
+        """Chunked Excel export writes every row"""
+        import pandas as pd
+        from src.reports.excel_exporter import ExcelExporter
+        
+        df = pd.DataFrame({'CustomerID': [f'C{i:03d}' for i in range(40)], 'tenure': range(40)})
+        exporter = ExcelExporter(output_dir=str(tmp_path))
+        path = exporter.export_chunks((df.iloc[i:i + 15] for i in range(0, 40, 15)), 'stream.xlsx')
+        
+        pd.testing.assert_frame_equal(pd.read_excel(path), df)
+        assert pd.read_excel(exporter.export(df, 'auto.xlsx', streaming=True)).equals(df)
+    
     def test_export_with_compression(self):
         """Test export with file compression"""
         export_config = {